@@ -0,0 +1,290 @@
+import argparse
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+from backend import budget, cache, categories, database, user
+from backend.database import read, transaction
+
+# Reproducible benchmarks for the backend and the dashboard refresh path.
+#
+#   python -m backend.bench generate --users 100000 --db bench.db
+#   python -m backend.bench run --db bench.db -o results.json --baseline baseline.json
+#
+# Synthetic accounts are named "<prefix><n>" (password "pw<n>") and generated
+# from a seeded RNG, so the same --users/--seed always produce the same data.
+# Generating again only adds the accounts that are missing.
+
+PREFIX = "bench_"
+DEFAULT_ITERATIONS = 200
+DEFAULT_THRESHOLD = 0.25     # flag a case whose median is >25% slower than baseline
+
+INCOME_STREAMS = ["Salary", "Side Hustle", "Rental Income", "Dividends"]
+
+def synthetic_budget(rng):
+    """(incomes, expenses, profile) shaped like what the setup wizard saves."""
+    n_streams = rng.choices([1, 2, 3, 4], weights=[60, 25, 10, 5])[0]
+    incomes = {INCOME_STREAMS[i]: round(rng.uniform(3000, 60000), 2) for i in range(n_streams)}
+    total = sum(incomes.values())
+    expenses = {cat: round(total * rng.uniform(0.0, 0.25), 2)
+                for cat in categories.in_group("essentials") + categories.in_group("lifestyle")
+                if rng.random() < 0.85}
+    dependents = rng.choices([0, 1, 2, 3, 4], weights=[40, 25, 20, 10, 5])[0]
+    savings_percent = rng.choice([0, 5, 10, 15, 20, 30])
+    if savings_percent:
+        expenses[budget.SAVINGS_CAT] = round(total * savings_percent / 100.0, 2)
+    return incomes, expenses, {"dependents": dependents, "savings_percent": savings_percent}
+
+def generate(n_users, seed=0, batch_size=10000, progress=None):
+    """
+    Ensure the first n_users synthetic accounts exist in database.DB_NAME, each
+    with a saved budget. progress(done, total) is optional. Returns the seconds taken.
+    """
+    start = time.perf_counter()
+    existing = set(_bench_names())
+    for lo in range(0, n_users, batch_size):
+        hi = min(lo + batch_size, n_users)
+        names = [f"{PREFIX}{i}" for i in range(lo, hi) if f"{PREFIX}{i}" not in existing]
+        if names:
+            with transaction() as cur:
+                cur.executemany("INSERT INTO users (username, password) VALUES (?,?)",
+                                [(name, "pw" + name[len(PREFIX):]) for name in names])
+            ids = _bench_ids(names)
+            # Seeded per account, so a budget doesn't depend on which batch wrote it
+            budget.save_budgets(
+                (ids[name], *synthetic_budget(random.Random(f"{seed}:{name}"))) for name in names)
+        if progress:
+            progress(hi, n_users)
+    return time.perf_counter() - start
+
+def _bench_names():
+    with read() as cur:
+        cur.execute("SELECT username FROM users WHERE username LIKE ?", (PREFIX + "%",))
+        return [row[0] for row in cur.fetchall()]
+
+def _bench_ids(names):
+    with read() as cur:
+        cur.execute("SELECT username, id FROM users WHERE username IN "
+                    "(SELECT value FROM json_each(?))", (json.dumps(names),))
+        return dict(cur.fetchall())
+
+def bench_users():
+    """[(username, user_id)] of every synthetic account in the database."""
+    with read() as cur:
+        cur.execute("SELECT username, id FROM users WHERE username LIKE ? ORDER BY id",
+                    (PREFIX + "%",))
+        return cur.fetchall()
+
+# ---------- Timing ----------
+def _time(fn, args_list, setup=None, warmup=None):
+    # One untimed call first (with `warmup` args, default the first sample's),
+    # so lazy imports and statement compilation don't land in the samples
+    if setup:
+        setup()
+    fn(*(warmup or args_list[0]))
+    samples = []
+    for args in args_list:
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    mean = statistics.fmean(samples)
+    return {
+        "n": len(samples),
+        "mean_ms": mean * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "max_ms": samples[-1] * 1000,
+        "ops_per_sec": 1 / mean if mean else 0.0,
+    }
+
+def _time_warm(fn, args_list, lru):
+    """
+    _time() with everything already in `lru`: one untimed pass over args_list
+    fills it, then the timed pass must hit it every time. Adds "hit_rate".
+    """
+    for args in args_list:
+        fn(*args)
+    lru.reset_stats()
+    stats = _time(fn, args_list)
+    stats["hit_rate"] = lru.stats()["hit_rate"]
+    if stats["hit_rate"] < 1.0:
+        raise RuntimeError(f"warm run of {fn.__name__} missed the cache "
+                           f"(hit rate {stats['hit_rate']:.1%})")
+    return stats
+
+def _fits(args_list, lru):
+    # A sample with more distinct accounts than the cache holds would evict as
+    # it goes; keep the first maxsize accounts so "warm" stays warm
+    keep = set(list(dict.fromkeys(args_list))[:lru.maxsize])
+    return [args for args in args_list if args in keep]
+
+def _resaves(sample, seed):
+    # Each account's own budget, with its salary raised by 1 per save, so every
+    # save writes a real one-item diff and a new version (an identical budget
+    # is a no-op). Reading the stored salary first keeps that true across runs.
+    args, bumps = [], {}
+    for name, uid in sample:
+        incomes, expenses, profile = synthetic_budget(random.Random(f"{seed}:{name}"))
+        base = bumps.setdefault(uid, budget.get_income(uid).get("Salary", 0.0))
+        bumps[uid] = incomes["Salary"] = round(base + 1, 2)
+        args.append((uid, incomes, expenses, profile))
+    return args
+
+def _headless_refresh():
+    """A withdrawn Tk root for the refresh case, or None when there is no display."""
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+    return root
+
+def run(iterations=DEFAULT_ITERATIONS, seed=0, gui=True):
+    """
+    Time the backend entry points over a random sample of synthetic accounts.
+    Read cases run twice: "cold" clears the snapshot cache before every call,
+    "warm" fills it first and then must hit it on every call. Saves change one
+    amount each, so they measure a real write. Returns {"meta": {...},
+    "results": {case: stats}}.
+    """
+    accounts = bench_users()
+    if not accounts:
+        raise RuntimeError("no synthetic accounts; run 'python -m backend.bench generate' first")
+    rng = random.Random(seed)
+    sample = [rng.choice(accounts) for _ in range(iterations)]
+    uids = [(uid,) for _, uid in sample]
+
+    results = {}
+    results["validate_login"] = _time(
+        user.validate_login, [(name, "pw" + name[len(PREFIX):]) for name, _ in sample])
+    for name, fn, lru in [("get_income", budget.get_income, cache.snapshots),
+                          ("get_expenses", budget.get_expenses, cache.snapshots),
+                          ("calculate_totals", budget.calculate_totals, cache.snapshots),
+                          ("recommendations", budget.recommendations, cache.snapshots),
+                          ("budget_view", budget.budget_view, cache.views)]:
+        results[name + ".cold"] = _time(fn, uids, setup=cache.clear)
+        results[name + ".warm"] = _time_warm(fn, _fits(uids, lru), lru)
+    saves = _resaves(sample[:1] + sample, seed)
+    results["save_budget"] = _time(budget.save_budget, saves[1:], warmup=saves[0])
+
+    root = _headless_refresh() if gui else None
+    if root is not None:
+        results.update(_time_refresh(root, sample))
+        root.destroy()
+
+    meta = _meta(len(accounts), iterations, seed)
+    meta["gui"] = root is not None
+    return {"meta": meta, "results": results}
+
+def _time_refresh(root, sample):
+    from gui.welcome_window import WelcomeWindow
+
+    name, uid = sample[0]
+    win = WelcomeWindow(root, name, uid)
+    root.update()
+
+    def refresh(uid):
+        # refresh() loads on a worker; time the same work synchronously, up to
+        # the point Tk has laid out the updated widgets
+        win.user_id = uid
+        win._apply_view(budget.budget_view(uid, *win._filter_flags()))
+        root.update_idletasks()
+
+    uids = [(uid,) for _, uid in sample]
+    return {
+        "refresh.cold": _time(refresh, uids, setup=cache.clear),
+        "refresh.warm": _time_warm(refresh, _fits(uids, cache.views), cache.views),
+    }
+
+def _meta(n_accounts, iterations, seed):
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "accounts": n_accounts,
+        "iterations": iterations,
+        "seed": seed,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "db": database.DB_NAME,
+        "settings": dict(database.SETTINGS),
+    }
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    [(case, baseline_ms, current_ms, change)] for cases whose median got more
+    than `threshold` slower (0.25 = 25%). Cases missing from either side are skipped.
+    """
+    regressions = []
+    for case, stats in results["results"].items():
+        old = baseline["results"].get(case)
+        if not old or not old["median_ms"]:
+            continue
+        change = stats["median_ms"] / old["median_ms"] - 1
+        if change > threshold:
+            regressions.append((case, old["median_ms"], stats["median_ms"], change))
+    return regressions
+
+def main(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=database.DB_NAME, help="database file (default: %(default)s)")
+    parser = argparse.ArgumentParser(description="Benchmark Smart Budgets against synthetic data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", parents=[common], help="add synthetic accounts")
+    gen.add_argument("--users", type=int, default=1000, help="number of accounts (1k to 1M)")
+    gen.add_argument("--seed", type=int, default=0)
+
+    bench = sub.add_parser("run", parents=[common], help="time the backend and refresh path")
+    bench.add_argument("-o", "--output", help="write results JSON here")
+    bench.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--no-gui", action="store_true", help="skip the dashboard refresh case")
+    bench.add_argument("--baseline", help="results JSON to compare against")
+    bench.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                       help="allowed median slowdown before flagging (default: %(default)s)")
+    bench.add_argument("--save-baseline", action="store_true", help="also write results to --baseline")
+    args = parser.parse_args(argv)
+
+    database.DB_NAME = args.db
+    if args.command == "generate":
+        def progress(done, total):
+            print(f"\r{done:,}/{total:,} accounts", end="", file=sys.stderr)
+        seconds = generate(args.users, seed=args.seed, progress=progress)
+        print(f"\nGenerated {args.users:,} accounts in {seconds:.1f}s", file=sys.stderr)
+        database.close_all()
+        return 0
+
+    results = run(args.iterations, seed=args.seed, gui=not args.no_gui)
+    database.close_all()
+    if not args.no_gui and not results["meta"]["gui"]:
+        print("No display available; skipped the refresh case", file=sys.stderr)
+    for case, stats in results["results"].items():
+        print(f"{case:24} median {stats['median_ms']:8.3f} ms   p95 {stats['p95_ms']:8.3f} ms"
+              f"   {stats['ops_per_sec']:10,.0f} ops/s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    status = 0
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for case, old, new, change in regressions:
+            print(f"REGRESSION {case}: {old:.3f} ms -> {new:.3f} ms (+{change:.0%})", file=sys.stderr)
+        status = 1 if regressions else 0
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,137 +1,364 @@
-from backend.database import get_connection
-
-# Category groups for UX
-ESSENTIALS = [
-    "Groceries",
-    "Rent/Mortgage",
-    "Utilities (Electric/Water)",
-    "Transportation (Fuel+Maint+Insur+Instal.)",
-    "Education/Tuition",
-]
-LIFESTYLE = [
-    "Entertainment & Subscriptions",
-    "Dining Out",
-    "Shopping/Leisure",
-]
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from backend import cache, categories, instrument, ledger, versions
+from backend.database import read, transaction
+
+# Which categories are essentials or lifestyle is stored in the categories
+# table (categories.in_group); the wizard writes savings under this one
 SAVINGS_CAT = "Savings/Investments"
 
+# Recommendation rules, evaluated in order by backend.recommend (see Rule there).
+# Ratios are category amount / total income.
+#   (metric,   category,                                     op,  base, per_dep, floor_to_target, message)
+RECOMMENDATION_RULES = [
+    ("ratio",   "Rent/Mortgage",                              ">", 0.30, 0.00, False,
+     "Housing exceeds 30% of income. Consider downsizing or negotiating."),
+    ("ratio",   "Groceries",                                  ">", 0.15, 0.03, False,
+     "Groceries look high; try weekly planning and bulk buys."),
+    ("ratio",   "Transportation (Fuel+Maint+Insur+Instal.)",  ">", 0.15, 0.00, False,
+     "Transport is high; consider carpooling or optimizing trips."),
+    ("ratio",   "Entertainment & Subscriptions",              ">", 0.10, 0.00, False,
+     "Entertainment over 10%; audit your subscriptions."),
+    ("ratio",   SAVINGS_CAT,                                  "<", 0.10, 0.00, True,
+     "Try saving at least {savings_floor_pct}% of income monthly."),
+    ("balance", None,                                         "<", 0.00, 0.00, False,
+     "You're overspending. Reduce non-essentials first."),
+    ("balance", None,                                         ">", 0.00, 0.00, False,
+     "You can still allocate R{balance:.2f} to savings or debt repayment."),
+]
+FALLBACK_TIP = "Your budget looks balanced. Keep tracking monthly to stay on target."
+
+# ---------- Writes ----------
+# Every save goes through _save_batch, for any number of users at once. It
+# compares the new budget with the stored one and writes only the difference:
+# changed rows are updated in place in the allocation tables (income, expenses,
+# profile, which always hold the latest budget) and appended to the version
+# history as one new version per user (backend.versions). Saving an unchanged
+# budget writes nothing.
+
+_INSERT_INCOME = "INSERT INTO income (user_id, stream_name, amount) VALUES (?,?,?)"
+_UPDATE_INCOME = "UPDATE income SET amount=? WHERE user_id=? AND stream_name=?"
+_DELETE_INCOME = "DELETE FROM income WHERE user_id=? AND stream_name=?"
+_INSERT_EXPENSE = "INSERT INTO expenses (user_id, category_id, amount) VALUES (?,?,?)"
+_UPDATE_EXPENSE = "UPDATE expenses SET amount=? WHERE user_id=? AND category_id=?"
+_DELETE_EXPENSE = "DELETE FROM expenses WHERE user_id=? AND category_id=?"
+_UPSERT_PROFILE = """
+    INSERT INTO profile (user_id, dependents, savings_percent) VALUES (?,?,?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        dependents=excluded.dependents,
+        savings_percent=excluded.savings_percent
+"""
+
+def _profile_state(profile):
+    return {"dependents": int(profile.get("dependents", 0)),
+            "savings_percent": float(profile.get("savings_percent", 0.0))}
+
+def _stored_states(cur, user_ids):
+    """{user_id: versions-style state} read from the allocation tables."""
+    states = {uid: versions.empty_state() for uid in user_ids}
+    ids = json.dumps(list(states))
+    cur.execute("SELECT user_id, stream_name, amount FROM income "
+                "WHERE user_id IN (SELECT value FROM json_each(?)) ORDER BY id", (ids,))
+    for uid, name, amount in cur.fetchall():
+        states[uid]["income"][name] = amount
+    cur.execute("SELECT user_id, category_id, amount FROM expenses "
+                "WHERE user_id IN (SELECT value FROM json_each(?)) ORDER BY id", (ids,))
+    name_of = categories.name_of
+    for uid, cid, amount in cur.fetchall():
+        states[uid]["expense"][name_of(cid)] = amount
+    cur.execute("SELECT user_id, dependents, savings_percent FROM profile "
+                "WHERE user_id IN (SELECT value FROM json_each(?))", (ids,))
+    for uid, dependents, savings_percent in cur.fetchall():
+        states[uid]["profile"] = {"dependents": dependents, "savings_percent": savings_percent}
+    return states
+
+def _apply_changes(cur, changes, states, cat_ids):
+    """Bring the allocation tables in line with {user_id: diff_states(...)} and the new states."""
+    rows = {stmt: [] for stmt in (_INSERT_INCOME, _UPDATE_INCOME, _DELETE_INCOME,
+                                  _INSERT_EXPENSE, _UPDATE_EXPENSE, _DELETE_EXPENSE)}
+    profiles = set()
+    for uid, diff in changes.items():
+        for kind, name, old, new in diff:
+            if kind == "income":
+                if new is None:
+                    rows[_DELETE_INCOME].append((uid, name))
+                elif old is None:
+                    rows[_INSERT_INCOME].append((uid, name, new))
+                else:
+                    rows[_UPDATE_INCOME].append((new, uid, name))
+            elif kind == "expense":
+                if new is None:
+                    rows[_DELETE_EXPENSE].append((uid, categories.id_of(name)))
+                elif old is None:
+                    rows[_INSERT_EXPENSE].append((uid, cat_ids[name], new))
+                else:
+                    rows[_UPDATE_EXPENSE].append((new, uid, cat_ids[name]))
+            else:
+                profiles.add(uid)
+    for stmt, params in rows.items():
+        if params:
+            cur.executemany(stmt, params)
+    cur.executemany(_UPSERT_PROFILE, [(uid, states[uid]["profile"]["dependents"],
+                                       states[uid]["profile"]["savings_percent"])
+                                      for uid in profiles])
+
 def replace_income(user_id, incomes_dict):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM income WHERE user_id=?", (user_id,))
-    for name, amt in incomes_dict.items():
-        cur.execute("INSERT INTO income (user_id, stream_name, amount) VALUES (?,?,?)",
-                    (user_id, name, float(amt)))
-    conn.commit()
-    conn.close()
+    _save_batch([(user_id, incomes_dict, None, None)])
 
 def replace_expenses(user_id, expenses_dict):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM expenses WHERE user_id=?", (user_id,))
-    for cat, amt in expenses_dict.items():
-        cur.execute("INSERT INTO expenses (user_id, category, amount) VALUES (?,?,?)",
-                    (user_id, cat, float(amt)))
-    conn.commit()
-    conn.close()
+    _save_batch([(user_id, None, expenses_dict, None)])
 
 def upsert_profile(user_id, dependents=0, savings_percent=0.0):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT user_id FROM profile WHERE user_id=?", (user_id,))
-    exists = cur.fetchone()
-    if exists:
-        cur.execute("UPDATE profile SET dependents=?, savings_percent=? WHERE user_id=?",
-                    (int(dependents), float(savings_percent), user_id))
-    else:
-        cur.execute("INSERT INTO profile (user_id, dependents, savings_percent) VALUES (?,?,?)",
-                    (user_id, int(dependents), float(savings_percent)))
-    conn.commit()
-    conn.close()
+    _save_batch([(user_id, None, None, {"dependents": dependents, "savings_percent": savings_percent})])
+
+@instrument.timed("budget.save_budget")
+def save_budget(user_id, incomes, expenses, profile):
+    """Replace a user's income, expenses and profile atomically (one commit, one version)."""
+    save_budgets([(user_id, incomes, expenses, profile)])
+
+@instrument.timed("budget.save_budgets")
+def save_budgets(budgets, batch_size=1000):
+    """
+    Bulk variant of save_budget for re-import jobs.
+    budgets: iterable of (user_id, incomes, expenses, profile) tuples.
+    Each batch of `batch_size` users is written in one transaction; returns the user count.
+    """
+    count = 0
+    batch = []
+    for item in budgets:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            count += _save_batch(batch)
+            batch = []
+    if batch:
+        count += _save_batch(batch)
+    return count
+
+def _save_batch(batch):
+    """batch: [(user_id, incomes, expenses, profile)]; a None part is left as stored."""
+    cat_ids = categories.ensure(cat for (_, _, expenses, _) in batch if expenses
+                                for cat in expenses)
+    saved_at = versions.now()
+    with transaction() as cur:
+        stored = _stored_states(cur, [uid for (uid, _, _, _) in batch])
+        # A user saved twice in one batch ends up with one version: the last save
+        latest = {}
+        for uid, incomes, expenses, profile in batch:
+            old = latest.get(uid, stored[uid])
+            latest[uid] = {
+                "income": old["income"] if incomes is None else
+                          {name: float(amt) for name, amt in incomes.items()},
+                "expense": old["expense"] if expenses is None else
+                           {cat: float(amt) for cat, amt in expenses.items()},
+                "profile": old["profile"] if profile is None else _profile_state(profile),
+            }
+        changes = {}
+        for uid, new in latest.items():
+            diff = versions.diff_states(stored[uid], new)
+            if diff:
+                changes[uid] = diff
+        _apply_changes(cur, changes, latest, cat_ids)
+        versions.record(cur, changes, saved_at)
+    for uid in changes:
+        cache.invalidate(uid)
+    return len(batch)
+
+# ---------- Reads ----------
+# All reads go through load_snapshot(), which is cached per user (backend.cache)
+# and invalidated by the write paths above.
 
 def get_profile(user_id):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT dependents, savings_percent FROM profile WHERE user_id=?", (user_id,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
-        return {"dependents": 0, "savings_percent": 0.0}
-    return {"dependents": row[0], "savings_percent": row[1]}
+    return dict(load_snapshot(user_id).profile)
 
 def get_income(user_id):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT stream_name, amount FROM income WHERE user_id=?", (user_id,))
-    rows = cur.fetchall()
-    conn.close()
-    return {name: amt for (name, amt) in rows}
+    return dict(load_snapshot(user_id).income)
 
 def get_expenses(user_id):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT category, amount FROM expenses WHERE user_id=?", (user_id,))
-    rows = cur.fetchall()
-    conn.close()
-    return {cat: amt for (cat, amt) in rows}
+    return dict(load_snapshot(user_id).expenses)
 
-def user_has_setup(user_id):
-    return bool(get_income(user_id)) or bool(get_expenses(user_id))
+@dataclass(frozen=True)
+class BudgetSnapshot:
+    """Read-only view of one user's budget, loaded in a single read transaction."""
+    user_id: int
+    income: MappingProxyType
+    expenses: MappingProxyType
+    profile: MappingProxyType
+    total_income: float
+    total_expense: float
+    balance: float
+    # Actual ledger figures for `month`, read from the monthly rollup
+    month: str
+    month_income: float
+    month_expense: float
+
+@instrument.timed("budget.load_snapshot")
+def load_snapshot(user_id, month=None):
+    month = ledger.month_key(month)
+    snap = cache.snapshots.get(user_id)
+    if snap is not None and snap.month == month:
+        return snap
+    version = cache.data_version(user_id)
+    snap = _read_snapshot(user_id, month)
+    # A write that landed while we were reading makes this snapshot stale; don't keep it
+    cache.put_if_current(cache.snapshots, user_id, snap, user_id, version)
+    return snap
 
-def calculate_totals(user_id):
-    income = get_income(user_id)
-    expenses = get_expenses(user_id)
+def cache_stats():
+    """Hit/miss counters and size of the snapshot cache."""
+    return cache.snapshots.stats()
+
+@instrument.timed("budget._read_snapshot")
+def _read_snapshot(user_id, month):
+    with read() as cur:
+        cur.execute("SELECT stream_name, amount FROM income WHERE user_id=? ORDER BY id", (user_id,))
+        income = {name: amt for (name, amt) in cur.fetchall()}
+        cur.execute("SELECT category_id, amount FROM expenses WHERE user_id=? ORDER BY id", (user_id,))
+        rows = cur.fetchall()
+        cur.execute("SELECT dependents, savings_percent FROM profile WHERE user_id=?", (user_id,))
+        row = cur.fetchone()
+        month_income, month_expense = ledger.rollup_totals(cur, user_id, month)
+    name_of = categories.name_of
+    expenses = {name_of(cid): amt for (cid, amt) in rows}
+    profile = {"dependents": row[0], "savings_percent": row[1]} if row else \
+              {"dependents": 0, "savings_percent": 0.0}
     total_income = sum(income.values())
     total_expense = sum(expenses.values())
-    balance = total_income - total_expense
-    return total_income, total_expense, balance
+    return BudgetSnapshot(
+        user_id=user_id,
+        income=MappingProxyType(income),
+        expenses=MappingProxyType(expenses),
+        profile=MappingProxyType(profile),
+        total_income=total_income,
+        total_expense=total_expense,
+        balance=total_income - total_expense,
+        month=month,
+        month_income=month_income,
+        month_expense=month_expense,
+    )
+
+def _snapshot(user_or_snapshot):
+    if isinstance(user_or_snapshot, BudgetSnapshot):
+        return user_or_snapshot
+    return load_snapshot(user_or_snapshot)
+
+def user_has_setup(user_id):
+    return bool(get_income(user_id)) or bool(get_expenses(user_id))
+
+@instrument.timed("budget.calculate_totals")
+def calculate_totals(user_id, month=None):
+    """
+    Accepts a user id or a BudgetSnapshot. With `month` (YYYY-MM), returns the
+    actual ledger totals for that month from the rollup instead of the allocation.
+    """
+    if month is not None:
+        uid = user_id.user_id if isinstance(user_id, BudgetSnapshot) else user_id
+        with read() as cur:
+            income, expense = ledger.rollup_totals(cur, uid, ledger.month_key(month))
+        return income, expense, income - expense
+    snap = _snapshot(user_id)
+    return snap.total_income, snap.total_expense, snap.balance
 
-def split_expenses(expenses: dict):
-    essentials = {k: v for k, v in expenses.items() if k in ESSENTIALS}
-    lifestyle  = {k: v for k, v in expenses.items() if k in LIFESTYLE}
-    savings    = {k: v for k, v in expenses.items() if k == SAVINGS_CAT}
-    other      = {k: v for k, v in expenses.items() if k not in ESSENTIALS + LIFESTYLE + [SAVINGS_CAT]}
-    return essentials, lifestyle, savings, other
+def split_expenses(expenses):
+    """Accepts an expenses mapping or a BudgetSnapshot."""
+    if isinstance(expenses, BudgetSnapshot):
+        expenses = expenses.expenses
+    split = {group: {} for group in categories.GROUPS}
+    group_of_name = categories.group_of_name
+    for k, v in expenses.items():
+        split[group_of_name(k)][k] = v
+    return split["essentials"], split["lifestyle"], split["savings"], split["other"]
 
+def group_totals(user_id):
+    """{group: allocated amount} for a user, summed per category by the expenses index."""
+    with read() as cur:
+        cur.execute("SELECT category_id, SUM(amount) FROM expenses WHERE user_id=? GROUP BY category_id",
+                    (user_id,))
+        rows = cur.fetchall()
+    totals = dict.fromkeys(categories.GROUPS, 0.0)
+    groups = categories.group_map()
+    for cid, amount in rows:
+        totals[groups.get(cid, "other")] += amount
+    return totals
+
+@instrument.timed("budget.recommendations")
 def recommendations(user_id):
-    tips = []
-    profile = get_profile(user_id)
-    dependents = profile.get("dependents", 0)
-    target_savings_pct = profile.get("savings_percent", 0.0)
-
-    income = get_income(user_id)
-    expenses = get_expenses(user_id)
-    total_income = sum(income.values()) or 1  # avoid zero division
-
-    rent = expenses.get("Rent/Mortgage", 0)
-    groceries = expenses.get("Groceries", 0)
-    transport = expenses.get("Transportation (Fuel+Maint+Insur+Instal.)", 0)
-    entertainment = expenses.get("Entertainment & Subscriptions", 0)
-    savings_amt = expenses.get(SAVINGS_CAT, 0)
-
-    rent_ratio = rent / total_income
-    groceries_ratio = groceries / total_income
-    transport_ratio = transport / total_income
-    ent_ratio = entertainment / total_income
-    savings_ratio = savings_amt / total_income
-
-    if rent_ratio > 0.30:
-        tips.append("Housing exceeds 30% of income. Consider downsizing or negotiating.")
-    if groceries_ratio > 0.15 + 0.03*dependents:
-        tips.append("Groceries look high; try weekly planning and bulk buys.")
-    if transport_ratio > 0.15:
-        tips.append("Transport is high; consider carpooling or optimizing trips.")
-    if ent_ratio > 0.10:
-        tips.append("Entertainment over 10%; audit your subscriptions.")
-    if savings_ratio < max(0.10, target_savings_pct/100.0):
-        tips.append(f"Try saving at least {max(10,int(target_savings_pct))}% of income monthly.")
-
-    balance = sum(income.values()) - sum(expenses.values())
-    if balance < 0:
-        tips.append("You're overspending. Reduce non-essentials first.")
-    elif balance > 0:
-        tips.append(f"You can still allocate R{balance:.2f} to savings or debt repayment.")
-
-    if not tips:
-        tips.append("Your budget looks balanced. Keep tracking monthly to stay on target.")
-    return tips
+    """Accepts a user id or a BudgetSnapshot."""
+    from backend import recommend
+    snap = _snapshot(user_id)
+    inputs = recommend.inputs_from_snapshot(snap, recommend.rule_categories(RECOMMENDATION_RULES))
+    return recommend.tips(RECOMMENDATION_RULES, inputs, FALLBACK_TIP)[0]
+
+@instrument.timed("budget.recommendations_all")
+def recommendations_all(user_ids=None):
+    """{user_id: tips} for every user (or just user_ids), scored in one vectorized pass."""
+    from backend import recommend
+    inputs = recommend.load_inputs(recommend.rule_categories(RECOMMENDATION_RULES), user_ids)
+    all_tips = recommend.tips(RECOMMENDATION_RULES, inputs, FALLBACK_TIP)
+    return dict(zip(inputs.user_ids.tolist(), all_tips))
+
+@dataclass(frozen=True)
+class FilteredBudgetView:
+    """
+    What the dashboard, CSV export and PDF report show for one user under one
+    set of expense filters. Shared between callers, so every field is read-only.
+    """
+    snap: BudgetSnapshot
+    flags: tuple                       # (show_essentials, show_lifestyle, show_savings)
+    groups: MappingProxyType           # "essentials"/"lifestyle"/"savings"/"other" -> {category: amount}
+    incomes: MappingProxyType
+    filtered_expenses: MappingProxyType
+    total_income: float
+    total_expense: float
+    balance: float
+    total_savings: float
+    recommendations: tuple
+
+@instrument.timed("budget.budget_view")
+def budget_view(user_id, show_essentials=True, show_lifestyle=True, show_savings=True):
+    """
+    FilteredBudgetView for a user id or a BudgetSnapshot. Views by user id are
+    memoized until the user's data changes, so a refresh followed by an
+    export computes (and queries) once.
+    """
+    flags = (bool(show_essentials), bool(show_lifestyle), bool(show_savings))
+    if isinstance(user_id, BudgetSnapshot):
+        return _filtered_view(user_id, flags)
+    version = cache.data_version(user_id)
+    key = (user_id, version, ledger.month_key(), flags)
+    view = cache.views.get(key)
+    if view is None:
+        view = _filtered_view(load_snapshot(user_id), flags)
+        cache.put_if_current(cache.views, key, view, user_id, version)
+    return view
+
+def _filtered_view(snap, flags):
+    show_essentials, show_lifestyle, show_savings = flags
+    exp_ess, exp_life, exp_save, exp_other = split_expenses(snap)
+
+    # Apply filters
+    filtered_expenses = {}
+    if show_essentials:
+        filtered_expenses.update(exp_ess)
+    if show_lifestyle:
+        filtered_expenses.update(exp_life)
+    if show_savings:
+        filtered_expenses.update(exp_save)
+    filtered_expenses.update(exp_other)
+
+    total_income = sum(snap.income.values())
+    total_expense = sum(filtered_expenses.values())
+    groups = {"essentials": exp_ess, "lifestyle": exp_life, "savings": exp_save, "other": exp_other}
+    return FilteredBudgetView(
+        snap=snap,
+        flags=flags,
+        groups=MappingProxyType({g: MappingProxyType(d) for g, d in groups.items()}),
+        incomes=snap.income,
+        filtered_expenses=MappingProxyType(filtered_expenses),
+        total_income=total_income,
+        total_expense=total_expense,
+        balance=total_income - total_expense,
+        total_savings=snap.expenses.get(SAVINGS_CAT, 0.0),
+        recommendations=tuple(recommendations(snap)),
+    )
@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+# In-process caches for budget reads. Writers call invalidate(user_id), which
+# also bumps that user's data version so derived caches can key on it.
+# Only writes made through this process are seen; other processes writing the
+# same database file (e.g. a nightly import) require clear() afterwards.
+
+_MISSING = object()
+
+class LRUCache:
+    """Size-bounded, thread-safe LRU mapping with hit/miss counters."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+# BudgetSnapshot per user_id (see budget.load_snapshot)
+snapshots = LRUCache(maxsize=256)
+
+# FilteredBudgetView per (user_id, data version, month, filter flags) (see
+# budget.budget_view); a write changes the version, so stale views are never hit
+views = LRUCache(maxsize=512)
+
+_versions = {}
+_epoch = 0                # bumped by clear(), so every user's version changes at once
+_versions_lock = threading.Lock()
+
+def data_version(user_id):
+    """Token that changes whenever the user's budget data is written."""
+    return (_epoch, _versions.get(user_id, 0))
+
+def put_if_current(lru, key, value, user_id, version):
+    """
+    lru.put(key, value) unless user_id's data has changed since data_version()
+    returned `version`. The check and the put hold the versions lock, so a
+    concurrent invalidate() either fails the check or discards the new entry.
+    Returns whether the value was stored.
+    """
+    with _versions_lock:
+        if data_version(user_id) != version:
+            return False
+        lru.put(key, value)
+    return True
+
+def invalidate(user_id):
+    with _versions_lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+    snapshots.discard(user_id)
+
+def clear():
+    """Drop everything, e.g. after another process has written to the database."""
+    global _epoch
+    with _versions_lock:
+        _epoch += 1
+    snapshots.clear()
+    views.clear()
@@ -0,0 +1,85 @@
+import threading
+
+from backend import database
+from backend.database import read, transaction
+
+# Expense category dimension. Expense rows store an integer category_id; the
+# names and group memberships live once in the `categories` table and are
+# mirrored here as plain dicts, so classifying a category is one dict lookup.
+# Categories are only ever added (never renamed or removed), which keeps the
+# in-process maps safe to share between threads without re-reading.
+
+GROUPS = ("essentials", "lifestyle", "savings", "other")
+
+_lock = threading.Lock()
+_loaded_for = None      # (database, connection generation) the maps were read from
+_ids = {}               # name -> id
+_names = {}             # id -> name
+_groups = {}            # id -> group
+
+def _maps():
+    global _loaded_for, _ids, _names, _groups
+    key = (database.DB_NAME, database._generation)
+    if _loaded_for != key:
+        with read() as cur:
+            cur.execute("SELECT id, name, category_group FROM categories")
+            rows = cur.fetchall()
+        # Swap in fresh dicts so readers on other threads never see a half-filled map
+        with _lock:
+            _ids = {name: cid for cid, name, _ in rows}
+            _names = {cid: name for cid, name, _ in rows}
+            _groups = {cid: group for cid, _, group in rows}
+            _loaded_for = key
+    return _ids, _names, _groups
+
+def group_map():
+    """{category_id: group} for every known category."""
+    return _maps()[2]
+
+def group_of(category_id):
+    return _maps()[2].get(category_id, "other")
+
+def group_of_name(name):
+    ids, _, groups = _maps()
+    return groups.get(ids.get(name), "other")
+
+def in_group(group):
+    """Names of the categories in `group`, in the order they were added."""
+    _, names, groups = _maps()
+    return [names[cid] for cid in sorted(groups) if groups[cid] == group]
+
+def id_of(name):
+    """The category's id, or None if it has never been stored."""
+    return _maps()[0].get(name)
+
+def name_of(category_id):
+    names = _maps()[1]
+    if category_id not in names:
+        # Added by another process since we loaded; re-read once
+        global _loaded_for
+        _loaded_for = None
+        names = _maps()[1]
+    return names[category_id]
+
+def ensure(names, group="other"):
+    """
+    {name: id} for `names`, adding any new categories to `group` first.
+    Call it before opening the write transaction: new rows then commit on their
+    own, so the maps never hold an id that a rollback took away.
+    """
+    names = set(names)
+    ids, names_by_id, groups = _maps()
+    missing = [n for n in names if n not in ids]
+    if missing:
+        with transaction() as cur:
+            cur.executemany("INSERT OR IGNORE INTO categories (name, category_group) VALUES (?,?)",
+                            [(n, group) for n in missing])
+            cur.execute("SELECT id, name, category_group FROM categories WHERE name IN "
+                        f"({','.join('?' * len(missing))})", missing)
+            rows = cur.fetchall()
+        with _lock:
+            for cid, name, grp in rows:
+                ids[name] = cid
+                names_by_id[cid] = name
+                groups[cid] = grp
+    return {n: ids[n] for n in names}
@@ -0,0 +1,161 @@
+import io
+import math
+import threading
+
+from backend import render_cache
+
+# Chart drawing shared by the dashboard, exports and PDF reports. Chart classes
+# take an existing matplotlib Axes, so callers decide on the figure/canvas and
+# backend.
+
+PIE_KW = dict(autopct="%1.1f%%", startangle=90, labeldistance=1.1, pctdistance=0.85)
+BAR_LABELS = ["Income", "Expenses", "Savings"]
+BAR_COLORS = ['green', 'red', 'blue']
+
+class PieChart:
+    """Expense pie that can be re-pointed at new amounts without recreating artists."""
+
+    def __init__(self, ax, title="Expense Distribution"):
+        self.ax = ax
+        self.title = title
+        self.labels = None
+        self.wedges = []
+        self.texts = []
+        self.autotexts = []
+
+    def update(self, labels, amounts):
+        labels = list(labels)
+        amounts = [float(a) for a in amounts]
+        if labels == self.labels:
+            self._move_wedges(amounts)
+            return
+        # Category set changed: the wedge/text artists must be rebuilt
+        self.ax.clear()
+        # Adjusted labeldistance to place labels further out, reducing overlap
+        self.wedges, self.texts, self.autotexts = self.ax.pie(amounts, labels=labels, **PIE_KW)
+        self.ax.axis('equal')
+        self.ax.set_title(self.title)
+        self.labels = labels
+
+    def _move_wedges(self, amounts):
+        # Same geometry as Axes.pie(): counter-clockwise from startangle, radius 1
+        total = sum(amounts)
+        theta = PIE_KW["startangle"] / 360.0
+        for i, amt in enumerate(amounts):
+            frac = amt / total
+            t1, t2 = theta, theta + frac
+            wedge = self.wedges[i]
+            wedge.set_theta1(360 * t1)
+            wedge.set_theta2(360 * t2)
+            mid = math.pi * (t1 + t2)
+            x, y = math.cos(mid), math.sin(mid)
+            ld, pd = PIE_KW["labeldistance"], PIE_KW["pctdistance"]
+            self.texts[i].set_position((ld * x, ld * y))
+            self.texts[i].set_horizontalalignment('left' if x > 0 else 'right')
+            self.autotexts[i].set_position((pd * x, pd * y))
+            self.autotexts[i].set_text(PIE_KW["autopct"] % (100 * frac))
+            theta = t2
+
+class BarChart:
+    """Income / Expenses / Savings bars, updated by changing bar heights."""
+
+    def __init__(self, ax, title="Income vs Expenses vs Savings"):
+        self.ax = ax
+        self.bars = ax.bar(BAR_LABELS, [0, 0, 0], color=BAR_COLORS)
+        ax.set_title(title)
+        ax.set_ylabel("Amount")
+
+    def update(self, values):
+        for bar, v in zip(self.bars, values):
+            bar.set_height(float(v))
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+class HistoryChart:
+    """Each expense category's allocation per saved budget version, as step lines."""
+
+    def __init__(self, ax, title="Allocation Changes Over Time"):
+        self.ax = ax
+        self.title = title
+
+    def update(self, saved_at, series):
+        # Redrawn from scratch: it only changes when the budget is saved.
+        # x is the save number, so saves minutes or months apart get equal room
+        self.ax.clear()
+        x = list(range(len(saved_at) + 1))
+        for name, amounts in series:
+            # Repeat the last amount so the current allocation gets a step too
+            self.ax.step(x, list(amounts) + list(amounts[-1:]), where="post", label=name)
+        step = max(1, len(saved_at) // 8)
+        ticks = list(range(0, len(saved_at), step))
+        self.ax.set_xticks(ticks)
+        self.ax.set_xticklabels([saved_at[i][:10] for i in ticks], rotation=30, ha="right")
+        self.ax.set_xlim(0, len(saved_at))
+        self.ax.set_title(self.title)
+        self.ax.set_ylabel("Amount")
+        self.ax.legend(fontsize="small", loc="best")
+
+# ---------- Cached PNG rendering ----------
+# The dashboard shows charts as PNGs from the render cache; matplotlib only runs
+# on a cache miss, and then re-uses one off-screen figure per chart kind.
+
+CHART_SIZE = (9, 6)
+CHART_DPI = 100          # Figure's default, so PNGs match the old on-screen canvas
+HISTORY_VERSIONS = 50    # saves shown on the allocation history chart
+
+CHART_CLASSES = {"pie": PieChart, "bar": BarChart, "history": HistoryChart}
+
+_templates = {}
+_render_lock = threading.Lock()
+
+def _template(kind, size, dpi):
+    key = (kind, tuple(size), dpi)
+    if key not in _templates:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=size, dpi=dpi)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        _templates[key] = (fig, CHART_CLASSES[kind](ax))
+    return _templates[key]
+
+def chart_key(kind, data, size=CHART_SIZE, dpi=CHART_DPI, fmt="png"):
+    return render_cache.RenderCache.key("chart", kind, data, list(size), dpi, fmt)
+
+def pie_data(filtered_expenses):
+    return [list(filtered_expenses.keys()), [float(v) for v in filtered_expenses.values()]]
+
+def bar_data(total_income, total_expense, total_savings):
+    return [float(total_income), float(total_expense), float(total_savings)]
+
+def history_data(saved_at, series, max_versions=HISTORY_VERSIONS):
+    """From versions.allocation_history(); keeps the last max_versions saves."""
+    return [list(saved_at[-max_versions:]),
+            [[name, [float(v) for v in amounts[-max_versions:]]] for name, amounts in series.items()]]
+
+def cached_chart(kind, data, size=CHART_SIZE, dpi=CHART_DPI, cache=None):
+    """Cached PNG path for a chart if present, else None. Cheap: one stat call."""
+    cache = cache or render_cache.default()
+    return cache.lookup(chart_key(kind, data, size, dpi), ".png")
+
+def render_chart(kind, data, size=CHART_SIZE, dpi=CHART_DPI, cache=None):
+    """
+    PNG path for a "pie" (data=pie_data(...)), "bar" (data=bar_data(...)) or
+    "history" (data=history_data(...)) chart, rendering and caching it on a
+    miss. Safe to call from worker threads.
+    """
+    cache = cache or render_cache.default()
+    key = chart_key(kind, data, size, dpi)
+    path = cache.lookup(key, ".png")
+    if path:
+        return path
+    with _render_lock:
+        fig, chart = _template(kind, size, dpi)
+        if kind in ("pie", "history"):
+            chart.update(*data)
+        else:
+            chart.update(data)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=dpi)
+    return cache.store(key, ".png", buf.getvalue())
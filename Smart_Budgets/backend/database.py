@@ -1,10 +1,31 @@
 import sqlite3
-import os
+import threading
+from contextlib import contextmanager
 
 DB_NAME = "accounting_tool.db"
 
-def _init_schema(conn):
-    cur = conn.cursor()
+# Pragmas applied to every pooled connection. Change with configure().
+SETTINGS = {
+    "journal_mode": "WAL",       # readers don't block the writer
+    "synchronous": "NORMAL",     # safe with WAL, one fsync per checkpoint
+    "cache_size": -8000,         # negative = KiB, so ~8 MB page cache
+    "mmap_size": 64 * 1024 * 1024,
+    "timeout": 5.0,              # seconds to wait on a locked database
+}
+
+_local = threading.local()
+_lock = threading.Lock()
+_open_conns = {}        # every pooled connection -> the thread that owns it
+_ready_dbs = set()      # database paths already migrated this process
+_generation = 0         # bumped by close_all(); threads holding an older connection reopen
+_trace = None           # sqlite3 trace callback on every pooled connection (backend.instrument)
+_on_block_end = None    # called as each read()/transaction() block finishes, while tracing
+
+# ---------- Schema migrations ----------
+# Each migration upgrades the schema by one version; PRAGMA user_version records
+# the last one applied. Append new steps to MIGRATIONS, never edit old ones.
+
+def _m001_base_schema(cur):
     # Users
     cur.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -42,12 +63,331 @@ def _init_schema(conn):
             FOREIGN KEY(user_id) REFERENCES users(id)
         )
     """)
+
+def _m002_user_indexes(cur):
+    # Covering indexes: per-user lookups are answered from the index alone
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_income_user ON income (user_id, stream_name, amount)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_expenses_user ON expenses (user_id, category, amount)")
+    cur.execute("ANALYZE")
+
+def _m003_ledger(cur):
+    # Dated transaction ledger (history), alongside the current allocation tables
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            occurred_on TEXT NOT NULL,                 -- YYYY-MM-DD
+            kind TEXT NOT NULL CHECK (kind IN ('income', 'expense')),
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT NOT NULL DEFAULT '',
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, occurred_on)")
+    # Per-user, per-month, per-category totals kept in step with the ledger by triggers
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_rollup (
+            user_id INTEGER NOT NULL,
+            month TEXT NOT NULL,                       -- YYYY-MM
+            kind TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, month, kind, category)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_ai AFTER INSERT ON transactions BEGIN
+            INSERT INTO monthly_rollup (user_id, month, kind, category, total, tx_count)
+            VALUES (NEW.user_id, substr(NEW.occurred_on, 1, 7), NEW.kind, NEW.category, NEW.amount, 1)
+            ON CONFLICT(user_id, month, kind, category) DO UPDATE SET
+                total = total + excluded.total,
+                tx_count = tx_count + 1;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_ad AFTER DELETE ON transactions BEGIN
+            UPDATE monthly_rollup SET total = total - OLD.amount, tx_count = tx_count - 1
+            WHERE user_id = OLD.user_id AND month = substr(OLD.occurred_on, 1, 7)
+              AND kind = OLD.kind AND category = OLD.category;
+            DELETE FROM monthly_rollup
+            WHERE user_id = OLD.user_id AND month = substr(OLD.occurred_on, 1, 7)
+              AND kind = OLD.kind AND category = OLD.category AND tx_count <= 0;
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_au AFTER UPDATE ON transactions BEGIN
+            UPDATE monthly_rollup SET total = total - OLD.amount, tx_count = tx_count - 1
+            WHERE user_id = OLD.user_id AND month = substr(OLD.occurred_on, 1, 7)
+              AND kind = OLD.kind AND category = OLD.category;
+            DELETE FROM monthly_rollup
+            WHERE user_id = OLD.user_id AND month = substr(OLD.occurred_on, 1, 7)
+              AND kind = OLD.kind AND category = OLD.category AND tx_count <= 0;
+            INSERT INTO monthly_rollup (user_id, month, kind, category, total, tx_count)
+            VALUES (NEW.user_id, substr(NEW.occurred_on, 1, 7), NEW.kind, NEW.category, NEW.amount, 1)
+            ON CONFLICT(user_id, month, kind, category) DO UPDATE SET
+                total = total + excluded.total,
+                tx_count = tx_count + 1;
+        END
+    """)
+
+# Categories as they shipped before the categories table existed
+_SEED_CATEGORIES = [
+    (1, "Groceries", "essentials"),
+    (2, "Rent/Mortgage", "essentials"),
+    (3, "Utilities (Electric/Water)", "essentials"),
+    (4, "Transportation (Fuel+Maint+Insur+Instal.)", "essentials"),
+    (5, "Education/Tuition", "essentials"),
+    (6, "Entertainment & Subscriptions", "lifestyle"),
+    (7, "Dining Out", "lifestyle"),
+    (8, "Shopping/Leisure", "lifestyle"),
+    (9, "Savings/Investments", "savings"),
+]
+
+def _m004_categories(cur):
+    # Category dimension: expenses reference a small integer id instead of
+    # repeating the category name on every row (see backend.categories)
+    cur.execute("""
+        CREATE TABLE categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            category_group TEXT NOT NULL DEFAULT 'other'
+                CHECK (category_group IN ('essentials', 'lifestyle', 'savings', 'other'))
+        )
+    """)
+    cur.executemany("INSERT INTO categories (id, name, category_group) VALUES (?,?,?)", _SEED_CATEGORIES)
+    cur.execute("""
+        INSERT OR IGNORE INTO categories (name)
+        SELECT DISTINCT category FROM expenses ORDER BY category
+    """)
+    cur.execute("""
+        CREATE TABLE expenses_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id),
+            FOREIGN KEY(category_id) REFERENCES categories(id)
+        )
+    """)
+    cur.execute("""
+        INSERT INTO expenses_new (id, user_id, category_id, amount)
+        SELECT e.id, e.user_id, c.id, e.amount
+        FROM expenses e JOIN categories c ON c.name = e.category
+    """)
+    cur.execute("DROP TABLE expenses")
+    cur.execute("ALTER TABLE expenses_new RENAME TO expenses")
+    cur.execute("CREATE INDEX idx_expenses_user ON expenses (user_id, category_id, amount)")
+    cur.execute("ANALYZE")
+
+def _m005_import_hashes(cur):
+    # Statement imports tag each transaction with a 64-bit content hash; the
+    # unique index turns a re-imported line into a no-op (see backend.importer).
+    # Rows added any other way keep it NULL and stay out of the index.
+    cur.execute("ALTER TABLE transactions ADD COLUMN import_hash INTEGER")
+    cur.execute("""
+        CREATE UNIQUE INDEX idx_transactions_import ON transactions (user_id, import_hash)
+        WHERE import_hash IS NOT NULL
+    """)
+
+def _m006_budget_versions(cur):
+    # Append-only budget history (see backend.versions). Each save is a numbered
+    # version per user; budget_changes holds only the items a version changed.
+    # Its (item_id, version) key makes "value as of version v" one index seek.
+    cur.execute("""
+        CREATE TABLE budget_versions (
+            user_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            saved_at TEXT NOT NULL,                    -- local time, YYYY-MM-DDTHH:MM:SS
+            PRIMARY KEY (user_id, version),
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX idx_budget_versions_saved ON budget_versions (user_id, saved_at, version)")
+    cur.execute("""
+        CREATE TABLE budget_items (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('income', 'expense', 'profile')),
+            name TEXT NOT NULL,                        -- stream, category or profile field
+            UNIQUE (user_id, kind, name),
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE budget_changes (
+            item_id INTEGER NOT NULL,
+            version INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            amount REAL,                               -- NULL: removed in this version
+            PRIMARY KEY (item_id, version),
+            FOREIGN KEY(item_id) REFERENCES budget_items(id)
+        ) WITHOUT ROWID
+    """)
+    # Which items a range of versions touched, for diffs and the history chart
+    cur.execute("CREATE INDEX idx_budget_changes_version ON budget_changes (user_id, version, item_id)")
+
+    # Existing budgets become version 1
+    current = """
+        SELECT user_id, 'income' AS kind, stream_name AS name, amount FROM income
+        UNION ALL
+        SELECT e.user_id, 'expense', c.name, e.amount
+        FROM expenses e JOIN categories c ON c.id = e.category_id
+        UNION ALL
+        SELECT user_id, 'profile', 'dependents', dependents FROM profile
+        UNION ALL
+        SELECT user_id, 'profile', 'savings_percent', savings_percent FROM profile
+    """
+    cur.execute(f"""
+        INSERT OR IGNORE INTO budget_items (user_id, kind, name)
+        SELECT user_id, kind, name FROM ({current}) ORDER BY user_id
+    """)
+    cur.execute(f"""
+        INSERT OR IGNORE INTO budget_changes (item_id, version, user_id, amount)
+        SELECT i.id, 1, v.user_id, v.amount
+        FROM ({current}) v
+        JOIN budget_items i ON i.user_id = v.user_id AND i.kind = v.kind AND i.name = v.name
+    """)
+    cur.execute("""
+        INSERT INTO budget_versions (user_id, version, saved_at)
+        SELECT DISTINCT user_id, 1, strftime('%Y-%m-%dT%H:%M:%S', 'now', 'localtime')
+        FROM budget_items
+    """)
+    cur.execute("ANALYZE")
+
+MIGRATIONS = [
+    _m001_base_schema,
+    _m002_user_indexes,
+    _m003_ledger,
+    _m004_categories,
+    _m005_import_hashes,
+    _m006_budget_versions,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """Apply any pending migrations to conn's database. Returns the resulting version."""
+    if schema_version(conn) == SCHEMA_VERSION:
+        return SCHEMA_VERSION
+    cur = conn.cursor()
+    # IMMEDIATE takes the write lock, so two processes can't migrate at once
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        version = schema_version(conn)
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"{DB_NAME} has schema v{version}, newer than this app (v{SCHEMA_VERSION})")
+        for step in MIGRATIONS[version:]:
+            step(cur)
+        cur.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    except BaseException:
+        conn.rollback()
+        raise
     conn.commit()
+    return SCHEMA_VERSION
+
+def configure(**settings):
+    """Update connection settings and drop pooled connections so they reopen with them."""
+    unknown = set(settings) - set(SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown database setting(s): {', '.join(sorted(unknown))}")
+    SETTINGS.update(settings)
+    close_all()
+
+def _open(db_name):
+    # isolation_level=None: we issue BEGIN/COMMIT ourselves in read()/transaction()
+    conn = sqlite3.connect(db_name, timeout=SETTINGS["timeout"], isolation_level=None,
+                           check_same_thread=False)
+    cur = conn.cursor()
+    cur.execute(f"PRAGMA journal_mode={SETTINGS['journal_mode']}")
+    cur.execute(f"PRAGMA synchronous={SETTINGS['synchronous']}")
+    cur.execute(f"PRAGMA cache_size={int(SETTINGS['cache_size'])}")
+    cur.execute(f"PRAGMA mmap_size={int(SETTINGS['mmap_size'])}")
+    with _lock:
+        if _trace is not None:
+            conn.set_trace_callback(_trace)
+        if db_name not in _ready_dbs:
+            migrate(conn)
+            _ready_dbs.add(db_name)
+        _open_conns[conn] = threading.current_thread()
+    return conn
 
 def get_connection():
-    needs_init = not os.path.exists(DB_NAME)
-    conn = sqlite3.connect(DB_NAME)
-    if needs_init:
-        _init_schema(conn)
+    """Return this thread's pooled connection, opening it on first use. Do not close it."""
+    conn = getattr(_local, "conn", None)
+    key = (DB_NAME, _generation)
+    if conn is not None and _local.key != key and not conn.in_transaction:
+        # Retired by close_all() or configure(); a block still running on it
+        # keeps it until it commits
+        _retire(conn)
+        conn = None
+    if conn is None:
+        conn = _open(DB_NAME)
+        _local.conn = conn
+        _local.key = key
     return conn
 
+def _retire(conn):
+    with _lock:
+        _open_conns.pop(conn, None)
+    conn.close()
+
+@contextmanager
+def _begin(mode):
+    conn = get_connection()
+    cur = conn.cursor()
+    if conn.in_transaction:
+        # Nested use joins the outer transaction
+        yield cur
+        return
+    cur.execute(f"BEGIN {mode}")
+    try:
+        yield cur
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        if _on_block_end is not None:
+            _on_block_end()
+
+def read():
+    """Context manager yielding a cursor inside one consistent read transaction."""
+    return _begin("DEFERRED")
+
+def transaction():
+    """Context manager yielding a cursor; commits on success, rolls back on error."""
+    return _begin("IMMEDIATE")
+
+def set_trace_callback(callback, on_block_end=None):
+    """Install (or with None, remove) a statement trace callback on all pooled connections."""
+    global _trace, _on_block_end
+    with _lock:
+        _trace = callback
+        _on_block_end = on_block_end if callback is not None else None
+        conns = list(_open_conns)
+    for conn in conns:
+        conn.set_trace_callback(callback)
+
+def close_all():
+    """
+    Retire every pooled connection. This thread's (unless it is inside a
+    read()/transaction() block) and those of threads that have exited are closed
+    now; other threads close and reopen theirs on their next call, so a query
+    running elsewhere is never cut off.
+    """
+    global _generation
+    with _lock:
+        _ready_dbs.clear()
+        _generation += 1
+        dead = [conn for conn, owner in _open_conns.items() if not owner.is_alive()]
+    for conn in dead:
+        _retire(conn)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and not conn.in_transaction:
+        _retire(conn)
+        _local.conn = None
@@ -0,0 +1,448 @@
+import argparse
+import csv
+import datetime
+import functools
+import gzip
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import sys
+import time
+from itertools import islice
+
+from backend import cache, database, instrument
+from backend.database import read, transaction
+
+# Bank-statement import (CSV, OFX/QFX, QIF) into the transactions ledger.
+#
+# Each stage is a generator: the file is read a line (or, for OFX, a chunk) at
+# a time, parsed, cleaned, categorized and hashed lazily, and written in
+# executemany batches, so memory stays at about one batch however large the
+# file. The whole file is one transaction: an import lands completely or not
+# at all.
+#
+# Every imported row carries a 64-bit hash of its content (or of the bank's own
+# transaction id, when the format has one). The unique (user_id, import_hash)
+# index from database._m005_import_hashes makes INSERT OR IGNORE skip lines that
+# are already in the ledger, so overlapping or repeated imports are harmless.
+
+BATCH_SIZE = 5000
+CHUNK_SIZE = 1 << 20            # bytes of OFX text scanned at a time
+IMPORT_CACHE_KIB = 64 * 1024    # page cache while importing (see import_statement)
+
+EXPENSE_FALLBACK = "Uncategorized"
+INCOME_FALLBACK = "Other Income"
+
+# (pattern, category) per kind, tried in order; the first pattern found in the
+# description (case-insensitively) picks the category, so list more specific
+# ones first ("UBER EATS" before "UBER").
+DEFAULT_RULES = {
+    "income": [
+        (r"salary|payroll|wages", "Salary"),
+        (r"dividend", "Dividends"),
+        (r"interest", "Interest"),
+        (r"rent(al)? (income|received)", "Rental Income"),
+    ],
+    "expense": [
+        (r"uber ?eats|mr ?d food|restaurant|nando|kfc|mcdonald|steers|wimpy|spur|cafe|coffee",
+         "Dining Out"),
+        (r"woolworths food|checkers|pick ?n ?pay|shoprite|spar\b|grocer|supermarket",
+         "Groceries"),
+        (r"\brent\b|bond payment|mortgage|landlord", "Rent/Mortgage"),
+        (r"eskom|electricity|municipal|water|city of|prepaid elec",
+         "Utilities (Electric/Water)"),
+        (r"engen|shell|sasol|\bbp\b|caltex|total ?energies|fuel|uber|bolt|toll|car insurance|vehicle",
+         "Transportation (Fuel+Maint+Insur+Instal.)"),
+        (r"school|university|college|tuition|unisa|course", "Education/Tuition"),
+        (r"netflix|showmax|spotify|dstv|apple\.com|google \*|disney|youtube|cinema|ster-?kinekor",
+         "Entertainment & Subscriptions"),
+        (r"takealot|amazon|mr ?price|edgars|woolworths|clicks|dis-?chem|game stores|makro",
+         "Shopping/Leisure"),
+        (r"invest|savings transfer|unit trust|easy ?equities|retirement|annuity",
+         "Savings/Investments"),
+    ],
+}
+
+CSV_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y/%m/%d", "%d-%m-%Y",
+                    "%d.%m.%Y", "%d %b %Y", "%d %B %Y", "%Y%m%d")
+OFX_DATE_FORMATS = ("%Y%m%d",)
+QIF_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%d/%m/%Y", "%d/%m/%y", "%Y-%m-%d")
+
+# Header names (lower case) recognised in CSV statements
+DATE_COLUMNS = ("date", "transaction date", "posting date", "posted date", "value date")
+AMOUNT_COLUMNS = ("amount", "transaction amount", "value")
+DEBIT_COLUMNS = ("debit", "debits", "withdrawal", "withdrawals", "money out", "paid out")
+CREDIT_COLUMNS = ("credit", "credits", "deposit", "deposits", "money in", "paid in")
+DESCRIPTION_COLUMNS = ("description", "transaction description", "details", "narrative",
+                       "payee", "memo", "reference")
+
+_INSERT = """
+    INSERT OR IGNORE INTO transactions
+        (user_id, occurred_on, kind, category, amount, description, import_hash)
+    VALUES (?,?,?,?,?,?,?)
+"""
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_NOT_NUMBER = re.compile(r"[^\d.,\-+]")
+_PLAIN_AMOUNT = re.compile(r"[+-]?\d+(?:\.\d{1,2})?")
+
+# ---------- Reading ----------
+def detect_format(path):
+    """"csv", "ofx" or "qif" from the file name, sniffing the first bytes if that doesn't say."""
+    name = str(path).lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    ext = os.path.splitext(name)[1]
+    if ext in (".ofx", ".qfx"):
+        return "ofx"
+    if ext == ".qif":
+        return "qif"
+    if ext == ".csv":
+        return "csv"
+    f, raw = _open(path)
+    with f, raw:
+        head = f.read(512).lstrip().upper()
+    if head.startswith("OFXHEADER") or "<OFX>" in head:
+        return "ofx"
+    if head.startswith("!TYPE"):
+        return "qif"
+    return "csv"
+
+def _open(path):
+    """(text file, raw file); raw.tell() is how many bytes of the file have been read."""
+    raw = open(path, "rb")
+    stream = gzip.GzipFile(fileobj=raw) if str(path).endswith(".gz") else raw
+    # Statements come in all encodings; a stray byte shouldn't abort the import
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline=""), raw
+
+def _cell(row, i):
+    return row[i].strip() if i is not None and i < len(row) else ""
+
+def iter_csv(f):
+    """(date text, amount text, description, None) per row of a CSV statement."""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [h.strip().lower() for h in header]
+
+    def find(names):
+        for name in names:
+            if name in columns:
+                return columns.index(name)
+        return None
+
+    date_col = find(DATE_COLUMNS)
+    amount_col = find(AMOUNT_COLUMNS)
+    debit_col, credit_col = find(DEBIT_COLUMNS), find(CREDIT_COLUMNS)
+    desc_col = find(DESCRIPTION_COLUMNS)
+    if date_col is None or (amount_col is None and debit_col is None and credit_col is None):
+        raise ValueError(f"CSV header needs a date column and an amount or debit/credit "
+                         f"column, got: {', '.join(header)}")
+    for row in reader:
+        if not row:
+            continue
+        if amount_col is not None:
+            amount = _cell(row, amount_col)
+        else:
+            # Separate debit/credit columns: debits leave the account
+            credit, debit = _cell(row, credit_col), _cell(row, debit_col)
+            amount = credit if credit else ("-" + debit.lstrip("-") if debit else "")
+        yield _cell(row, date_col), amount, _cell(row, desc_col), None
+
+def _ofx_tags(f, chunk_size=CHUNK_SIZE):
+    # OFX may be one enormous line, so scan fixed-size chunks instead of lines,
+    # holding back the text after the last "<" until the next chunk completes it
+    tail = ""
+    while True:
+        chunk = f.read(chunk_size)
+        buf = tail + chunk
+        end = buf.rfind("<") if chunk else len(buf)
+        if end > 0:
+            yield from _OFX_TAG.findall(buf, 0, end)
+            tail = buf[end:]
+        else:
+            tail = buf
+        if not chunk:
+            return
+
+def iter_ofx(f):
+    """(date text, amount text, description, FITID) per <STMTTRN> of an OFX/QFX file (SGML or XML)."""
+    tx = None
+    for closing, tag, value in _ofx_tags(f):
+        tag = tag.upper()
+        if tag == "STMTTRN":
+            if closing and tx is not None:
+                name = html.unescape(tx.get("NAME", ""))
+                memo = html.unescape(tx.get("MEMO", ""))
+                desc = f"{name} {memo}" if memo and memo != name else (name or memo)
+                yield tx.get("DTPOSTED", "")[:8], tx.get("TRNAMT", ""), desc, tx.get("FITID")
+                tx = None
+            elif not closing:
+                tx = {}
+        elif tx is not None and not closing:
+            tx[tag] = value.strip()
+
+def iter_qif(f):
+    """(date text, amount text, description, None) per record of a QIF file."""
+    record = {}
+    for line in f:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code == "^":
+            if record:
+                # Quicken writes dates like 1/15'24
+                date = record.get("D", "").replace("'", "/").replace(" ", "")
+                yield date, record.get("T", record.get("U", "")), record.get("P", record.get("M", "")), None
+            record = {}
+        else:
+            # Split lines (S/E/$) repeat codes; the first of each is the transaction's own
+            record.setdefault(code, value)
+
+FORMATS = {
+    "csv": (iter_csv, CSV_DATE_FORMATS),
+    "ofx": (iter_ofx, OFX_DATE_FORMATS),
+    "qif": (iter_qif, QIF_DATE_FORMATS),
+}
+
+# ---------- Cleaning ----------
+def _date_parser(formats):
+    # A statement sticks to one date format and rows arrive grouped by day, so
+    # try the last format (and the last value) that worked before the rest
+    state = {"format": formats[0], "text": None, "date": None}
+
+    def parse(text):
+        if text == state["text"]:
+            return state["date"]
+        for fmt in (state["format"],) + formats:
+            try:
+                value = datetime.datetime.strptime(text, fmt).date().isoformat()
+            except ValueError:
+                continue
+            state.update(format=fmt, text=text, date=value)
+            return value
+        return None
+    return parse
+
+def parse_amount(text):
+    """
+    Signed float from statement text such as "-1,234.56", "1.234,56", "(45.00)",
+    "45.00-" or "R 1 234,56". Whichever of "," and "." comes last is the decimal
+    point and the other groups thousands. Raises ValueError for unreadable text
+    and for a lone separator followed by exactly three digits ("1,234" or
+    "1.234"), which could be a thousands group or three decimals.
+    """
+    text = text.strip()
+    if _PLAIN_AMOUNT.fullmatch(text):
+        return float(text)          # most statements already write plain numbers
+    negative = (text.startswith("(") and text.endswith(")")) or text.endswith("-")
+    digits = _NOT_NUMBER.sub("", text).rstrip("-")
+    if digits[:1] in ("-", "+"):
+        negative = negative or digits[0] == "-"
+        digits = digits[1:]
+    if not digits or "-" in digits or "+" in digits:
+        raise ValueError(f"Unreadable amount {text!r}")
+
+    point = max(digits.rfind(","), digits.rfind("."))
+    if point == -1:
+        whole, fraction = digits, ""
+    else:
+        sep = digits[point]
+        other = "." if sep == "," else ","
+        if digits.count(sep) > 1:
+            # "1,234,567": every separator groups thousands, there is no decimal part
+            if other in digits or not _grouped(digits, sep):
+                raise ValueError(f"Unreadable amount {text!r}")
+            whole, fraction = digits, ""
+        else:
+            whole, fraction = digits[:point], digits[point + 1:]
+            if other not in whole and len(fraction) == 3:
+                raise ValueError(f"Ambiguous amount {text!r}: is {sep!r} a decimal point "
+                                 f"or a thousands separator?")
+            if other in whole and not _grouped(whole, other):
+                raise ValueError(f"Unreadable amount {text!r}")
+        whole = whole.replace(",", "").replace(".", "")
+    if not (whole or fraction):
+        raise ValueError(f"Unreadable amount {text!r}")
+    value = float(f"{whole or 0}.{fraction or 0}")
+    return -value if negative else value
+
+def _grouped(digits, sep):
+    return re.fullmatch(rf"\d{{1,3}}(?:{re.escape(sep)}\d{{3}})+", digits) is not None
+
+def _clean(raw, date_formats, counts):
+    parse_date = _date_parser(date_formats)
+    for date_text, amount_text, desc, ref in raw:
+        counts["read"] += 1
+        date = parse_date(date_text.strip())
+        try:
+            amount = parse_amount(amount_text)
+        except ValueError:
+            amount = None
+        if date is None or not amount:
+            counts["rejected"] += 1
+            continue
+        yield date, amount, " ".join(desc.split()), ref
+
+def _categorizer(rules):
+    compiled = {kind: [(re.compile(p, re.IGNORECASE), category) for p, category in pairs]
+                for kind, pairs in rules.items()}
+    fallback = {"income": INCOME_FALLBACK, "expense": EXPENSE_FALLBACK}
+
+    # Statements repeat the same merchants endlessly; remember recent answers
+    @functools.lru_cache(maxsize=4096)
+    def categorize(kind, description):
+        for regex, category in compiled.get(kind, ()):
+            if regex.search(description):
+                return category
+        return fallback[kind]
+    return categorize
+
+def _categorize(rows, rules):
+    categorize = _categorizer(rules)
+    for date, amount, desc, ref in rows:
+        kind = "expense" if amount < 0 else "income"
+        yield date, kind, categorize(kind, desc), abs(amount), desc, amount, ref
+
+def _hash(text):
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "big", signed=True)
+
+def _hash_batch(cur, rows, user_id):
+    """
+    Insert parameters for a batch of categorized rows. Without a bank id, a line
+    is its date, signed amount and description; identical lines (two coffees on
+    one day) are told apart by their occurrence number in the file, which is the
+    same on every import of the same statement wherever the lines sit in it.
+    The counts for the whole file live in the connection's temp.import_seen
+    table, so memory stays at one batch however large the file.
+    """
+    contents = [None if ref else f"{date}|{signed:.2f}|{desc.casefold()}"
+                for date, _, _, _, desc, signed, ref in rows]
+    content_hashes = [None if c is None else _hash(c) for c in contents]
+    wanted = [h for h in set(content_hashes) if h is not None]
+    seen = {}
+    if wanted:
+        cur.execute("SELECT h, n FROM temp.import_seen WHERE h IN (SELECT value FROM json_each(?))",
+                    (json.dumps(wanted),))
+        seen = dict(cur.fetchall())
+    params = []
+    for (date, kind, category, amount, desc, _, ref), content, h in zip(rows, contents, content_hashes):
+        if content is None:
+            key = f"id|{ref}"
+        else:
+            n = seen[h] = seen.get(h, 0) + 1
+            key = f"{content}|{n}"
+        params.append((user_id, date, kind, category, amount, desc, _hash(key)))
+    cur.executemany("INSERT INTO temp.import_seen (h, n) VALUES (?,?) "
+                    "ON CONFLICT(h) DO UPDATE SET n=excluded.n", list(seen.items()))
+    return params
+
+# ---------- Import ----------
+def _pipeline(f, fmt, rules, counts):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown statement format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    parser, date_formats = FORMATS[fmt]
+    return _categorize(_clean(parser(f), date_formats, counts), rules or DEFAULT_RULES)
+
+def iter_rows(path, fmt=None, rules=None, counts=None):
+    """
+    The statement's rows as (date, kind, category, amount, description, signed
+    amount, bank id) tuples, lazily. counts, if given, gets "read" and
+    "rejected" (unparseable or zero-amount lines) tallies.
+    """
+    counts = counts if counts is not None else {"read": 0, "rejected": 0}
+    fmt = fmt or detect_format(path)
+    f, raw = _open(path)
+    with f, raw:
+        yield from _pipeline(f, fmt, rules, counts)
+
+@instrument.timed("importer.import_statement")
+def import_statement(user_id, path, fmt=None, rules=None, batch_size=BATCH_SIZE, progress=None):
+    """
+    Import a statement file into user_id's ledger. fmt is "csv", "ofx" or "qif"
+    (default: from the file name or contents); rules maps kind to [(pattern,
+    category)] (default DEFAULT_RULES). progress(rows_read, bytes_read,
+    total_bytes) is called after each batch.
+
+    Returns {"read", "imported", "duplicates", "rejected", "seconds", "rows_per_sec"}.
+    """
+    start = time.perf_counter()
+    counts = {"read": 0, "rejected": 0}
+    fmt = fmt or detect_format(path)
+    total_bytes = os.path.getsize(path)
+    imported = 0
+    f, raw = _open(path)
+    with f, raw:
+        rows = _pipeline(f, fmt, rules, counts)
+        # One transaction for the whole file; other writers wait for it to commit
+        with transaction() as cur:
+            # Hashes land all over the import index, and the rollup rows for a
+            # long history add up; with the default cache SQLite spills pages
+            # mid-transaction and the import runs at half speed
+            cur.execute(f"PRAGMA cache_size={-IMPORT_CACHE_KIB}")
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS import_seen (h INTEGER PRIMARY KEY, n INTEGER NOT NULL)")
+            cur.execute("DELETE FROM temp.import_seen")
+            try:
+                for batch in iter(lambda: list(islice(rows, batch_size)), []):
+                    cur.executemany(_INSERT, _hash_batch(cur, batch, user_id))
+                    imported += cur.rowcount
+                    if progress:
+                        progress(counts["read"], raw.tell(), total_bytes)
+            finally:
+                cur.execute("DELETE FROM temp.import_seen")
+                cur.execute(f"PRAGMA cache_size={int(database.SETTINGS['cache_size'])}")
+    cache.invalidate(user_id)
+    seconds = time.perf_counter() - start
+    valid = counts["read"] - counts["rejected"]
+    return {
+        "read": counts["read"],
+        "imported": imported,
+        "duplicates": valid - imported,
+        "rejected": counts["rejected"],
+        "seconds": seconds,
+        "rows_per_sec": counts["read"] / seconds if seconds else 0.0,
+    }
+
+def _user_id(user):
+    with read() as cur:
+        # A username wins over a user id that happens to look the same
+        cur.execute("SELECT id FROM users WHERE username=? OR id=? ORDER BY username=? DESC",
+                    (user, user, user))
+        row = cur.fetchone()
+    if row is None:
+        raise ValueError(f"No such user: {user}")
+    return row[0]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import bank statements into a user's ledger.")
+    parser.add_argument("files", nargs="+", help="CSV, OFX/QFX or QIF statements (optionally .gz)")
+    parser.add_argument("--user", required=True, help="username or user id")
+    parser.add_argument("--format", choices=sorted(FORMATS), help="override format detection")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--db", default=database.DB_NAME, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    database.DB_NAME = args.db
+    try:
+        user_id = _user_id(args.user)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for path in args.files:
+        def progress(rows, done, total):
+            print(f"\r{path}: {rows:,} rows ({done / total if total else 1:.0%})", end="", file=sys.stderr)
+        result = import_statement(user_id, path, fmt=args.format,
+                                  batch_size=args.batch_size, progress=progress)
+        print(f"\r{path}: {result['imported']:,} imported, {result['duplicates']:,} already "
+              f"present, {result['rejected']:,} unreadable, in {result['seconds']:.1f}s "
+              f"({result['rows_per_sec']:,.0f} rows/s)", file=sys.stderr)
+    database.close_all()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Opt-in instrumentation: SQL statement counts, per-statement latency histograms
+# and a slow-query log (through sqlite3's trace callback on every pooled
+# connection), plus wall-clock timings for named phases and backend calls.
+# Off by default, and nearly free while off. Turn on with enable(), the
+# SMART_BUDGETS_INSTRUMENT environment variable or main.py --instrument.
+#
+# The trace callback only says when a statement starts, so a statement's latency
+# is the time until the next statement on the same connection, or until the
+# read()/transaction() block around it ends (see database._begin). That includes
+# fetching its rows, which is where most of a SELECT's time goes.
+
+# Histogram bucket upper bounds in milliseconds; the last bucket is open-ended
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+SLOW_MS = 50.0
+SLOW_LOG_SIZE = 200
+
+enabled = False
+
+_lock = threading.Lock()
+_local = threading.local()      # per thread: the statement still running, query count
+_statements = {}                # normalized SQL -> Stats
+_timings = {}                   # phase / function name -> Stats
+_slow = deque(maxlen=SLOW_LOG_SIZE)
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b")
+_LISTS = re.compile(r"\?(?:\s*,\s*\?)+")
+
+class Stats:
+    __slots__ = ("count", "total_ms", "max_ms", "buckets", "queries")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.queries = 0        # statements run inside a phase
+
+    def add(self, ms, queries=0):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.queries += queries
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "queries": self.queries,
+            "histogram": {(f"<={b}ms" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]}ms"): n
+                          for i, (b, n) in enumerate(zip(BUCKETS_MS + (None,), self.buckets)) if n},
+        }
+
+def normalize(sql):
+    """Statement text with literals replaced by ? so executions group together."""
+    sql = " ".join(sql.split())
+    return _LISTS.sub("?, ...", _LITERALS.sub("?", sql))
+
+# ---------- SQL tracing ----------
+def _trace(sql):
+    now = time.perf_counter()
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        if pending[0] == sql:
+            # Trigger programs re-report the statement that fired them
+            return
+        _record(pending, now)
+    _local.pending = (sql, now)
+    _local.queries = getattr(_local, "queries", 0) + 1
+
+def flush():
+    """Close the statement still timing on this thread (end of a read/transaction block)."""
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        _local.pending = None
+        _record(pending, time.perf_counter())
+
+def _record(pending, end):
+    sql, start = pending
+    ms = (end - start) * 1000
+    key = normalize(sql)
+    with _lock:
+        stats = _statements.get(key)
+        if stats is None:
+            stats = _statements[key] = Stats()
+        stats.add(ms)
+        if ms >= SLOW_MS:
+            # Normalized like the stats: the raw text can carry passwords and hashes
+            _slow.append((time.time(), ms, key))
+
+def query_count():
+    """Statements traced on this thread so far (diff two readings to cost an action)."""
+    return getattr(_local, "queries", 0)
+
+# ---------- Phases and functions ----------
+def record(name, ms, queries=0):
+    with _lock:
+        stats = _timings.get(name)
+        if stats is None:
+            stats = _timings[name] = Stats()
+        stats.add(ms, queries)
+
+@contextmanager
+def phase(name):
+    """Time a block under `name`, with the statements it ran on this thread."""
+    if not enabled:
+        yield
+        return
+    q0 = query_count()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, (time.perf_counter() - t0) * 1000, query_count() - q0)
+
+def timed(name):
+    """Decorator form of phase()."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            with phase(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+# ---------- Control ----------
+def enable():
+    global enabled
+    from backend import database
+    enabled = True
+    database.set_trace_callback(_trace, on_block_end=flush)
+
+def disable():
+    global enabled
+    from backend import database
+    enabled = False
+    database.set_trace_callback(None)
+
+def reset():
+    with _lock:
+        _statements.clear()
+        _timings.clear()
+        _slow.clear()
+
+def snapshot():
+    """Everything recorded so far as plain data."""
+    with _lock:
+        return {
+            "enabled": enabled,
+            "slow_ms": SLOW_MS,
+            "statements": {k: v.as_dict() for k, v in _statements.items()},
+            "timings": {k: v.as_dict() for k, v in _timings.items()},
+            "slow_queries": [{"at": time.strftime("%H:%M:%S", time.localtime(at)),
+                              "ms": ms, "sql": sql} for at, ms, sql in _slow],
+        }
+
+def report(top=15):
+    """Human-readable summary for the debug panel."""
+    snap = snapshot()
+    lines = [f"Instrumentation {'on' if snap['enabled'] else 'off'}", "", "Timings:"]
+    for name, s in sorted(snap["timings"].items()):
+        lines.append(f"  {name:28} n={s['count']:<6} mean {s['mean_ms']:8.2f} ms  "
+                     f"max {s['max_ms']:8.2f} ms  queries/call {s['queries'] / s['count']:.1f}")
+    stmts = sorted(snap["statements"].items(), key=lambda kv: -kv[1]["total_ms"])
+    total = sum(s["count"] for _, s in stmts)
+    lines += ["", f"Statements ({total} executed, top {top} by total time):"]
+    for sql, s in stmts[:top]:
+        lines.append(f"  {s['count']:>6}x  total {s['total_ms']:8.2f} ms  max {s['max_ms']:7.2f} ms  "
+                     f"{sql[:100]}")
+    lines += ["", f"Slow queries (>= {SLOW_MS:g} ms):"]
+    for q in snap["slow_queries"][-top:]:
+        lines.append(f"  {q['at']}  {q['ms']:8.2f} ms  {q['sql'][:100]}")
+    return "\n".join(lines)
+
+def dump(path):
+    """Write snapshot() as JSON."""
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+if os.environ.get("SMART_BUDGETS_INSTRUMENT"):
+    enable()
@@ -0,0 +1,107 @@
+import datetime
+
+from backend import cache
+from backend.database import read, transaction
+
+# Dated income/expense history. Every write goes through the transactions table;
+# SQLite triggers (see database._m003_ledger) keep monthly_rollup in step, so
+# totals below are read from pre-aggregated rows instead of summing the ledger.
+
+KINDS = ("income", "expense")
+
+_INSERT_TX = """
+    INSERT INTO transactions (user_id, occurred_on, kind, category, amount, description)
+    VALUES (?,?,?,?,?,?)
+"""
+
+def _iso_date(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return datetime.date.fromisoformat(str(value)).isoformat()
+
+def month_key(value=None):
+    if value is None:
+        return datetime.date.today().strftime("%Y-%m")
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m")
+    return str(value)[:7]
+
+def _tx_row(user_id, occurred_on, kind, category, amount, description=""):
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}, got {kind!r}")
+    return (user_id, _iso_date(occurred_on), kind, category, float(amount), description or "")
+
+def add_transaction(user_id, occurred_on, kind, category, amount, description=""):
+    with transaction() as cur:
+        cur.execute(_INSERT_TX, _tx_row(user_id, occurred_on, kind, category, amount, description))
+        tx_id = cur.lastrowid
+    cache.invalidate(user_id)
+    return tx_id
+
+def add_transactions(rows):
+    """rows: iterable of (user_id, occurred_on, kind, category, amount[, description])."""
+    data = [_tx_row(*r) for r in rows]
+    with transaction() as cur:
+        cur.executemany(_INSERT_TX, data)
+    for uid in {row[0] for row in data}:
+        cache.invalidate(uid)
+    return len(data)
+
+def delete_transaction(tx_id):
+    with transaction() as cur:
+        cur.execute("SELECT user_id FROM transactions WHERE id=?", (tx_id,))
+        row = cur.fetchone()
+        cur.execute("DELETE FROM transactions WHERE id=?", (tx_id,))
+    if row:
+        cache.invalidate(row[0])
+    return 1 if row else 0
+
+def get_transactions(user_id, start=None, end=None):
+    """Ledger rows for a user, oldest first; start/end are inclusive dates."""
+    sql = "SELECT id, occurred_on, kind, category, amount, description FROM transactions WHERE user_id=?"
+    args = [user_id]
+    if start is not None:
+        sql += " AND occurred_on >= ?"
+        args.append(_iso_date(start))
+    if end is not None:
+        sql += " AND occurred_on <= ?"
+        args.append(_iso_date(end))
+    sql += " ORDER BY occurred_on, id"
+    with read() as cur:
+        cur.execute(sql, args)
+        return cur.fetchall()
+
+def rollup_totals(cur, user_id, month):
+    """(income, expense) for one month from the rollup, using the caller's cursor."""
+    cur.execute("""
+        SELECT kind, SUM(total) FROM monthly_rollup
+        WHERE user_id=? AND month=? GROUP BY kind
+    """, (user_id, month))
+    totals = dict(cur.fetchall())
+    return totals.get("income", 0.0), totals.get("expense", 0.0)
+
+def monthly_totals(user_id, month=None):
+    """Per-category totals for a month: {"income": {cat: amt}, "expense": {cat: amt}}."""
+    with read() as cur:
+        cur.execute("""
+            SELECT kind, category, total FROM monthly_rollup
+            WHERE user_id=? AND month=?
+        """, (user_id, month_key(month)))
+        rows = cur.fetchall()
+    out = {kind: {} for kind in KINDS}
+    for kind, cat, total in rows:
+        out[kind][cat] = total
+    return out
+
+def monthly_history(user_id, months=12):
+    """Most recent `months` months as [(month, income, expense)], oldest first."""
+    with read() as cur:
+        cur.execute("""
+            SELECT month,
+                   SUM(CASE WHEN kind='income' THEN total ELSE 0.0 END),
+                   SUM(CASE WHEN kind='expense' THEN total ELSE 0.0 END)
+            FROM monthly_rollup WHERE user_id=?
+            GROUP BY month ORDER BY month DESC LIMIT ?
+        """, (user_id, int(months)))
+        rows = cur.fetchall()
+    return rows[::-1]
@@ -0,0 +1,113 @@
+import datetime
+
+import numpy as np
+
+from backend import budget, cache
+
+# Long-horizon savings projections. Balances use the closed-form future value of
+# a monthly annuity, broadcast over a (rates x contributions x years) grid, so a
+# whole 40-year fan of scenarios is a handful of array operations:
+#
+#   B(n) = P * (1 + i)^n + C * ((1 + i)^n - 1) / i      i = annual_rate / 12
+#
+# with P the starting balance, C the monthly contribution and n months.
+
+MAX_YEARS = 40
+DEFAULT_RATES = (0.0, 0.04, 0.06, 0.08, 0.10)
+DEFAULT_MULTIPLIERS = (0.5, 1.0, 1.5, 2.0)   # contribution levels relative to today's
+
+# (user_id, data version, args...) -> result; a write bumps the version, so old
+# entries are simply never hit again and age out
+_projections = cache.LRUCache(maxsize=128)
+
+def _growth(monthly_rate, months):
+    """((1 + i)^n, ((1 + i)^n - 1) / i) with the i == 0 limit handled."""
+    i = np.asarray(monthly_rate, dtype=float)
+    n = np.asarray(months, dtype=float)
+    log_growth = n * np.log1p(i)
+    compound = np.exp(log_growth)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        annuity = np.where(i == 0, n, np.expm1(log_growth) / np.where(i == 0, 1, i))
+    return compound, annuity
+
+def project(contributions, annual_rates=DEFAULT_RATES, years=MAX_YEARS, initial=0.0):
+    """
+    Year-end balances for every (rate, contribution) pair.
+    Returns an array of shape (len(annual_rates), len(contributions), years + 1);
+    index [..., y] is the balance after y years (y = 0 is `initial`).
+    """
+    if not 1 <= years <= MAX_YEARS:
+        raise ValueError(f"years must be between 1 and {MAX_YEARS}")
+    i = np.asarray(annual_rates, dtype=float)[:, None, None] / 12.0
+    c = np.asarray(contributions, dtype=float)[None, :, None]
+    months = (np.arange(years + 1) * 12.0)[None, None, :]
+    compound, annuity = _growth(i, months)
+    return initial * compound + c * annuity
+
+def months_to_goal(goal, contribution, annual_rate, initial=0.0):
+    """
+    Months until the balance first reaches `goal`, solved analytically.
+    Broadcasts over array arguments; unreachable goals give inf.
+    """
+    goal, c, p = (np.asarray(x, dtype=float) for x in (goal, contribution, initial))
+    i = np.asarray(annual_rate, dtype=float) / 12.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        safe_i = np.where(i == 0, 1.0, i)
+        # (1 + i)^n = (G + C/i) / (P + C/i)
+        ratio = (goal + c / safe_i) / (p + c / safe_i)
+        n_growth = np.log(ratio) / np.log1p(safe_i)
+        n_flat = (goal - p) / c
+        n = np.where(i == 0, n_flat, n_growth)
+    n = np.where(goal <= p, 0.0, n)
+    n = np.where(np.isfinite(n) & (n >= 0), np.maximum(np.ceil(n - 1e-9), 0.0), np.inf)
+    return n
+
+def goal_date(goal, contribution, annual_rate, initial=0.0, start=None):
+    """Calendar month the goal is reached ("when do I reach R1M?"), or None if never."""
+    months = float(months_to_goal(goal, contribution, annual_rate, initial))
+    if not np.isfinite(months):
+        return None
+    start = start or datetime.date.today()
+    total = start.year * 12 + (start.month - 1) + int(months)
+    return datetime.date(total // 12, total % 12 + 1, 1)
+
+def monthly_savings(snap):
+    """The monthly amount a saved budget puts towards savings."""
+    return float(snap.expenses.get(budget.SAVINGS_CAT, 0.0))
+
+def project_user(user_id, annual_rates=DEFAULT_RATES, multipliers=DEFAULT_MULTIPLIERS,
+                 years=MAX_YEARS, initial=0.0):
+    """
+    project() for a user's current savings contribution scaled by `multipliers`.
+    Returns (contributions, balances). Cached until the user's budget changes.
+    """
+    key = (user_id, cache.data_version(user_id), tuple(annual_rates), tuple(multipliers),
+           years, float(initial))
+    hit = _projections.get(key)
+    if hit is not None:
+        return hit
+    base = monthly_savings(budget.load_snapshot(user_id))
+    contributions = np.asarray(multipliers, dtype=float) * base
+    result = (contributions, project(contributions, annual_rates, years, initial))
+    # Callers share the cached arrays, so make them read-only
+    for arr in result:
+        arr.flags.writeable = False
+    _projections.put(key, result)
+    return result
+
+GOAL = 1_000_000
+OUTLOOK_RATE = 0.08
+OUTLOOK_YEARS = (10, 20, 40)
+
+def outlook(user_id, goal=GOAL, annual_rate=OUTLOOK_RATE):
+    """Short summary lines for the dashboard, at today's contribution."""
+    contributions, balances = project_user(user_id, annual_rates=(annual_rate,), multipliers=(1.0,))
+    monthly = float(contributions[0])
+    if monthly <= 0:
+        return ["No monthly savings set — adjust your budget to see a projection."]
+    lines = [f"Saving R{monthly:,.2f}/month at {annual_rate:.0%} a year:"]
+    lines += [f"  after {y} years: R{balances[0, 0, y]:,.0f}" for y in OUTLOOK_YEARS]
+    when = goal_date(goal, monthly, annual_rate)
+    lines.append(f"  R{goal:,.0f} reached by {when:%B %Y}" if when else
+                 f"  R{goal:,.0f} is out of reach at this rate")
+    return lines
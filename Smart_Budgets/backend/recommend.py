@@ -0,0 +1,120 @@
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from backend import categories
+from backend.database import read
+
+# Vectorized recommendation engine. Rules are data (see budget.RECOMMENDATION_RULES)
+# evaluated over NumPy columns, so one pass scores every user at once; a single
+# user is just a batch of one.
+
+# metric:          "ratio" (category amount / total income) or "balance" (income - expenses)
+# category:        expense category for "ratio" rules
+# op:              ">" or "<" against the threshold
+# base, per_dependent: threshold = base + per_dependent * dependents
+# floor_to_target: raise the threshold to the user's savings target (percent / 100)
+# message:         str.format template; fields: balance, savings_floor_pct
+Rule = namedtuple("Rule", "metric category op base per_dependent floor_to_target message")
+
+class Inputs(namedtuple("Inputs", "user_ids categories amounts total_income total_expense "
+                                  "dependents savings_percent")):
+    """Column arrays for n users; amounts is (n, len(categories))."""
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.user_ids)
+
+def as_rules(rules):
+    """Accept Rule instances or plain tuples in Rule field order."""
+    return [r if isinstance(r, Rule) else Rule(*r) for r in rules]
+
+def rule_categories(rules):
+    rules = as_rules(rules)
+    return sorted({r.category for r in rules if r.metric == "ratio"})
+
+def inputs_from_snapshot(snap, categories):
+    """Batch-of-one Inputs for a BudgetSnapshot (no database access)."""
+    expenses = snap.expenses
+    return Inputs(
+        user_ids=np.array([snap.user_id]),
+        categories=list(categories),
+        amounts=np.array([[expenses.get(c, 0) for c in categories]], dtype=float),
+        total_income=np.array([sum(snap.income.values())], dtype=float),
+        total_expense=np.array([sum(expenses.values())], dtype=float),
+        dependents=np.array([snap.profile.get("dependents", 0)], dtype=float),
+        savings_percent=np.array([snap.profile.get("savings_percent", 0.0)], dtype=float),
+    )
+
+def load_inputs(names, user_ids=None):
+    """Inputs for every user (or just user_ids) with one aggregate query; names are categories."""
+    names = list(names)
+    # Categories never stored get id -1, which matches no expense row
+    cat_ids = [categories.id_of(name) or -1 for name in names]
+    per_cat = "".join(f", SUM(CASE WHEN category_id=? THEN amount ELSE 0 END) AS c{i}"
+                      for i in range(len(cat_ids)))
+    cat_cols = "".join(f", COALESCE(e.c{i}, 0)" for i in range(len(cat_ids)))
+    where, args = "", cat_ids
+    if user_ids is not None:
+        where = "WHERE u.user_id IN (SELECT value FROM json_each(?))"
+        args.append(json.dumps([int(u) for u in user_ids]))
+    sql = f"""
+        SELECT u.user_id, COALESCE(i.total, 0), COALESCE(e.total, 0),
+               COALESCE(p.dependents, 0), COALESCE(p.savings_percent, 0){cat_cols}
+        FROM (SELECT user_id FROM income UNION SELECT user_id FROM expenses
+              UNION SELECT user_id FROM profile) u
+        LEFT JOIN (SELECT user_id, SUM(amount) AS total FROM income GROUP BY user_id) i
+               ON i.user_id = u.user_id
+        LEFT JOIN (SELECT user_id, SUM(amount) AS total{per_cat}
+                   FROM expenses GROUP BY user_id) e
+               ON e.user_id = u.user_id
+        LEFT JOIN profile p ON p.user_id = u.user_id
+        {where}
+        ORDER BY u.user_id
+    """
+    with read() as cur:
+        cur.execute(sql, args)
+        rows = cur.fetchall()
+    data = np.array(rows, dtype=float).reshape(len(rows), 5 + len(names))
+    return Inputs(
+        user_ids=data[:, 0].astype(np.int64),
+        categories=names,
+        amounts=data[:, 5:],
+        total_income=data[:, 1],
+        total_expense=data[:, 2],
+        dependents=data[:, 3],
+        savings_percent=data[:, 4],
+    )
+
+def evaluate(rules, inputs):
+    """Boolean (n_users, n_rules) matrix: which rules fire for which user."""
+    rules = as_rules(rules)
+    n = len(inputs)
+    fired = np.zeros((n, len(rules)), dtype=bool)
+    safe_income = np.where(inputs.total_income == 0, 1.0, inputs.total_income)  # avoid zero division
+    balance = inputs.total_income - inputs.total_expense
+    col = {c: i for i, c in enumerate(inputs.categories)}
+    for j, rule in enumerate(rules):
+        if rule.metric == "ratio":
+            value = inputs.amounts[:, col[rule.category]] / safe_income
+        else:
+            value = balance
+        threshold = rule.base + rule.per_dependent * inputs.dependents
+        if rule.floor_to_target:
+            threshold = np.maximum(threshold, inputs.savings_percent / 100.0)
+        fired[:, j] = value > threshold if rule.op == ">" else value < threshold
+    return fired
+
+def tips(rules, inputs, fallback):
+    """Recommendation strings per user, in rule order; `fallback` when none fire."""
+    rules = as_rules(rules)
+    fired = evaluate(rules, inputs)
+    balance = inputs.total_income - inputs.total_expense
+    floor_pct = np.maximum(10, inputs.savings_percent.astype(np.int64))
+    out = []
+    for i, row in enumerate(fired):
+        user_tips = [rules[j].message.format(balance=balance[i], savings_floor_pct=floor_pct[i])
+                     for j in np.flatnonzero(row)]
+        out.append(user_tips or [fallback])
+    return out
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+# Content-addressed, size-bounded disk cache for rendered charts and reports.
+# Entries are named by a hash of everything that affects the output (data,
+# dimensions, format, RENDER_VERSION), so a hit never needs validating and
+# several processes can share one directory. Least-recently-used files (by
+# mtime, refreshed on every hit) are evicted once the directory exceeds max_bytes.
+
+# Bump when chart or report layout changes so old renders are not served
+RENDER_VERSION = 1
+
+DEFAULT_DIR = os.environ.get(
+    "SMART_BUDGETS_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "smart_budgets", "renders"),
+)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+class RenderCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total = None      # bytes on disk; scanned lazily
+
+    @staticmethod
+    def key(*parts):
+        blob = json.dumps([RENDER_VERSION, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.directory, key[:2], key + ext)
+
+    def lookup(self, key, ext):
+        """Path of the cached file, or None. A hit marks the entry recently used."""
+        path = self._path(key, ext)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def store(self, key, ext, data):
+        """Store bytes atomically; returns the cached path."""
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._added(len(data))
+        return path
+
+    def store_file(self, key, ext, src):
+        """Copy an already-rendered file into the cache; returns the cached path."""
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, path)
+        self._added(os.path.getsize(path))
+        return path
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield st.st_mtime, st.st_size, path
+
+    def _added(self, size):
+        with self._lock:
+            if self._total is None:
+                self._total = sum(size for _, size, _ in self._entries())
+            else:
+                self._total += size
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Rescan: other processes may have added or removed entries
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9   # headroom so we don't evict on every store
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total = total
+
+    def clear(self):
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._total = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._total,
+                "max_bytes": self.max_bytes, "directory": self.directory}
+
+_default = None
+_default_lock = threading.Lock()
+
+def default():
+    """Process-wide cache in DEFAULT_DIR."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = RenderCache()
+        return _default
@@ -0,0 +1,206 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from backend import budget, charts, database, render_cache
+from backend.database import read
+
+# PDF budget reports: the page layout used by the dashboard's Export PDF, plus a
+# headless batch generator that fans out over a process pool.
+#
+#   python -m backend.reports --all -o reports/ --workers 8
+
+class ReportTemplates:
+    """
+    The three report figures, created once and re-pointed at each user's data.
+    Not thread-safe: use one instance per thread or process.
+    """
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+
+        # Page 1: Table & Recommendations
+        self.text_fig = Figure(figsize=(8, 10))
+        ax1 = self.text_fig.add_subplot(111)
+        ax1.axis("off")
+        self.text = ax1.text(0, 1, "", fontsize=12, va="top", ha="left")
+
+        # Page 2: Pie chart (figsize for PDF chart)
+        self.pie_fig = Figure(figsize=(9, 6))
+        self.pie = charts.PieChart(self.pie_fig.add_subplot(111))
+
+        # Page 3: Bar chart
+        self.bar_fig = Figure(figsize=(9, 6))
+        self.bar = charts.BarChart(self.bar_fig.add_subplot(111))
+
+def report_text(view):
+    text = "BUDGET REPORT\n\n— Income —\n"
+    for k, v in view.incomes.items():
+        text += f"{k}: R{v:,.2f}\n"
+    text += "\n— Expenses (Filtered) —\n"
+    for k, v in view.filtered_expenses.items():
+        text += f"{k}: R{v:,.2f}\n"
+    text += "\nRecommendations:\n"
+    recs = view.recommendations
+    if recs:
+        for r in recs:
+            text += f"• {r}\n"
+    else:
+        text += "No recommendations at this time.\n"
+    return text
+
+def report_key(view):
+    """Content hash of everything drawn in the report."""
+    return render_cache.RenderCache.key(
+        "report", report_text(view),
+        charts.pie_data(view.filtered_expenses),
+        charts.bar_data(view.total_income, view.total_expense, view.total_savings),
+        [8, 10], [9, 6],
+    )
+
+def write_report(file_path, view, templates=None, progress=None, cache=None):
+    """
+    Write the report for a budget_view() result. progress(step, total) is optional.
+    An identical report already in the render cache is copied instead of re-rendered.
+    """
+    cache = cache or render_cache.default()
+    key = report_key(view)
+    cached = cache.lookup(key, ".pdf")
+    if cached:
+        shutil.copyfile(cached, file_path)
+        return
+    _render_report(file_path, view, templates or ReportTemplates(), progress)
+    cache.store_file(key, ".pdf", file_path)
+
+def _render_report(file_path, view, t, progress):
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    filtered_expenses = view.filtered_expenses
+    with PdfPages(file_path) as pdf:
+        if progress:
+            progress(1, 3)
+        t.text.set_text(report_text(view))
+        pdf.savefig(t.text_fig)
+
+        if progress:
+            progress(2, 3)
+        if filtered_expenses and sum(filtered_expenses.values()) > 0:
+            t.pie.update(filtered_expenses.keys(), filtered_expenses.values())
+            pdf.savefig(t.pie_fig)
+
+        if progress:
+            progress(3, 3)
+        t.bar.update([view.total_income, view.total_expense, view.total_savings])
+        pdf.savefig(t.bar_fig)
+
+# ---------- Batch generation ----------
+_templates = None   # per worker process
+
+def _worker_init(db_name):
+    import matplotlib
+    matplotlib.use("Agg")   # headless; nothing here may touch Tk
+    database.DB_NAME = db_name
+
+def _render_user(user_id, out_dir):
+    global _templates
+    try:
+        if _templates is None:
+            _templates = ReportTemplates()
+        path = os.path.join(out_dir, f"budget_report_{user_id}.pdf")
+        write_report(path, budget.budget_view(user_id), _templates)
+        return user_id, path, None
+    except Exception as e:
+        # One bad user is reported, not fatal to the batch
+        return user_id, None, f"{type(e).__name__}: {e}"
+
+def _render_isolated(user_id, out_dir, ctx, initargs):
+    # A process of its own, so a user that crashes its worker only fails itself
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx, initializer=_worker_init,
+                             initargs=initargs) as pool:
+        try:
+            return pool.submit(_render_user, user_id, out_dir).result()
+        except BrokenProcessPool:
+            return user_id, None, "worker process crashed"
+
+def all_user_ids():
+    with read() as cur:
+        cur.execute("SELECT id FROM users ORDER BY id")
+        return [row[0] for row in cur.fetchall()]
+
+def generate_reports(user_ids, out_dir, workers=None, on_result=None):
+    """
+    Render one PDF per user into out_dir using a pool of `workers` processes.
+    on_result(user_id, path, error) is called as each report finishes.
+    Returns {"written": n, "failed": {user_id: error}, "seconds": s, "reports_per_sec": r}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    # spawn: children get fresh SQLite connections instead of forked copies of ours
+    ctx = multiprocessing.get_context("spawn")
+    pending = []
+    written = 0
+    failed = {}
+    start = time.perf_counter()
+
+    def record(uid, path, error):
+        nonlocal written
+        if error:
+            failed[uid] = error
+        else:
+            written += 1
+        if on_result:
+            on_result(uid, path, error)
+
+    initargs = (os.path.abspath(database.DB_NAME),)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_worker_init,
+                             initargs=initargs) as pool:
+        futures = {pool.submit(_render_user, uid, out_dir): uid for uid in user_ids}
+        for fut in as_completed(futures):
+            try:
+                record(*fut.result())
+            except BrokenProcessPool:
+                # A worker died outright (not a Python error) and took the pool
+                # with it; every unfinished user is retried on its own below
+                pending.append(futures[fut])
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            for result in threads.map(lambda uid: _render_isolated(uid, out_dir, ctx, initargs),
+                                      pending):
+                record(*result)
+
+    seconds = time.perf_counter() - start
+    return {
+        "written": written,
+        "failed": failed,
+        "seconds": seconds,
+        "reports_per_sec": written / seconds if seconds else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate PDF budget reports without the GUI.")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--all", action="store_true", help="one report per account")
+    who.add_argument("--user", type=int, action="append", help="user id (repeatable)")
+    parser.add_argument("-o", "--output-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--db", default=database.DB_NAME, help="database file (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    database.DB_NAME = args.db
+    user_ids = all_user_ids() if args.all else args.user
+    summary = generate_reports(user_ids, args.output_dir, workers=args.workers)
+    print(f"Wrote {summary['written']} reports in {summary['seconds']:.2f}s "
+          f"({summary['reports_per_sec']:.1f} reports/s)", file=sys.stderr)
+    for uid, error in sorted(summary["failed"].items()):
+        print(f"  user {uid}: {error}", file=sys.stderr)
+    database.close_all()
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from backend import budget
+
+# Monte Carlo "what if" for a monthly budget. All scenarios advance together as
+# (n_scenarios, months) arrays, so tens of thousands of runs take milliseconds.
+#
+# Per month and scenario:
+#   income   = base income * lognormal noise, times (1 - severity) in shock months
+#   expenses = each group (essentials / lifestyle / other) grown by its own
+#              sampled annual inflation rate, plus the cost of extra dependents
+#   savings  = savings_percent of that month's income, cut to whatever is left
+#   balance  = income - expenses - savings (month-end remainder)
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Annual inflation per expense group: (mean, standard deviation across scenarios)
+DEFAULT_INFLATION = {
+    "essentials": (0.06, 0.02),
+    "lifestyle": (0.05, 0.03),
+    "other": (0.05, 0.02),
+}
+
+@dataclass(frozen=True)
+class SimulationResult:
+    percentiles: tuple
+    months: int
+    n_scenarios: int
+    balance: np.ndarray          # (len(percentiles), months) month-end remainder
+    savings: np.ndarray          # (len(percentiles), months) cumulative savings
+    shortfall_probability: float # share of scenarios with at least one negative month
+
+    def band(self, p):
+        """(balance, savings) trajectories for one of the computed percentiles."""
+        i = self.percentiles.index(p)
+        return self.balance[i], self.savings[i]
+
+def simulate(incomes, expenses, savings_percent, dependents=0, *, months=12,
+             n_scenarios=20000, income_volatility=0.05, shock_probability=0.02,
+             shock_severity=(0.3, 1.0), inflation=None, dependent_probability=0.01,
+             cost_per_dependent=None, percentiles=PERCENTILES, seed=None):
+    """
+    incomes/expenses: the user's monthly allocation dicts (a Savings/Investments
+    entry in expenses is ignored; savings come from savings_percent instead).
+    shock_probability: chance per month of an income shock losing a
+    uniform(shock_severity) share of income that month.
+    dependent_probability: chance per month of gaining a dependent, each costing
+    cost_per_dependent (default: current groceries split per household member).
+    """
+    rng = np.random.default_rng(seed)
+    inflation = {**DEFAULT_INFLATION, **(inflation or {})}
+    shape = (n_scenarios, months)
+
+    ess, life, _, other = budget.split_expenses({k: v for k, v in expenses.items()
+                                                 if k != budget.SAVINGS_CAT})
+    base_income = float(sum(incomes.values()))
+    groups = {"essentials": sum(ess.values()), "lifestyle": sum(life.values()),
+              "other": sum(other.values())}
+    if cost_per_dependent is None:
+        cost_per_dependent = expenses.get("Groceries", 0.0) / (1 + dependents)
+
+    # Income: small monthly noise plus occasional shocks
+    income = base_income * rng.lognormal(0.0, income_volatility, shape)
+    shocks = rng.random(shape) < shock_probability
+    severity = rng.uniform(*shock_severity, shape)
+    income *= np.where(shocks, 1.0 - severity, 1.0)
+
+    # Expenses: per-scenario inflation rate per group, compounded monthly
+    month_idx = np.arange(1, months + 1) / 12.0
+    spend = np.zeros(shape)
+    for name, amount in groups.items():
+        if amount:
+            mean, sd = inflation[name]
+            rate = rng.normal(mean, sd, (n_scenarios, 1))
+            spend += amount * (1.0 + rate) ** month_idx
+
+    # Dependents: new ones stay for the rest of the horizon
+    new_dependents = np.cumsum(rng.random(shape) < dependent_probability, axis=1)
+    spend += new_dependents * cost_per_dependent
+
+    planned = income * (savings_percent / 100.0)
+    saved = np.clip(np.minimum(planned, income - spend), 0.0, None)
+    balance = income - spend - saved
+
+    pct = list(percentiles)
+    return SimulationResult(
+        percentiles=tuple(percentiles),
+        months=months,
+        n_scenarios=n_scenarios,
+        balance=np.percentile(balance, pct, axis=0),
+        savings=np.percentile(np.cumsum(saved, axis=1), pct, axis=0),
+        shortfall_probability=float(np.mean((balance < 0).any(axis=1))),
+    )
+
+def simulate_user(user_id, **kwargs):
+    """simulate() for a saved budget; accepts a user id or a BudgetSnapshot."""
+    snap = user_id if isinstance(user_id, budget.BudgetSnapshot) else budget.load_snapshot(user_id)
+    return simulate(snap.income, snap.expenses, snap.profile.get("savings_percent", 0.0),
+                    snap.profile.get("dependents", 0), **kwargs)
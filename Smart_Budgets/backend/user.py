@@ -1,23 +1,22 @@
-from backend.database import get_connection
+import sqlite3
 
+from backend import instrument
+from backend.database import read, transaction
+
+@instrument.timed("user.create_user")
 def create_user(username, password):
     if not username or not password:
         return None
-    conn = get_connection()
-    cur = conn.cursor()
     try:
-        cur.execute("INSERT INTO users (username, password) VALUES (?,?)", (username, password))
-        conn.commit()
-        return cur.lastrowid
-    except Exception:
+        with transaction() as cur:
+            cur.execute("INSERT INTO users (username, password) VALUES (?,?)", (username, password))
+            return cur.lastrowid
+    except sqlite3.Error:
         return None
-    finally:
-        conn.close()
 
+@instrument.timed("user.validate_login")
 def validate_login(username, password):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT id FROM users WHERE username=? AND password=?", (username, password))
-    row = cur.fetchone()
-    conn.close()
+    with read() as cur:
+        cur.execute("SELECT id FROM users WHERE username=? AND password=?", (username, password))
+        row = cur.fetchone()
     return row[0] if row else None
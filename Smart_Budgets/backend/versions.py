@@ -0,0 +1,184 @@
+import datetime
+import json
+
+from backend import cache
+from backend.database import read
+
+# Append-only budget history. Every save that changes something becomes the
+# user's next version (see budget._save_batch); budget_changes stores one row
+# per income stream, expense category or profile field that the version added,
+# changed (new amount) or removed (NULL), and nothing for the rest.
+#
+# A user's budget at version v is, per item, its latest change at or before v:
+# one seek on the (item_id, version) primary key, so point-in-time reads cost
+# O(items * log history) however many versions have piled up. Dates map to
+# versions through the (user_id, saved_at) index the same way.
+
+KINDS = ("income", "expense", "profile")
+
+# (user_id, data version, kind) -> allocation_history() result
+_histories = cache.LRUCache(maxsize=64)
+
+_AT_VERSION = """
+    (SELECT amount FROM budget_changes
+     WHERE item_id = i.id AND version <= ? ORDER BY version DESC LIMIT 1)
+"""
+
+def _value(kind, name, amount):
+    # History stores every amount as REAL; dependents is a count
+    if kind == "profile" and name == "dependents" and amount is not None:
+        return int(amount)
+    return amount
+
+def now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+def empty_state():
+    return {kind: {} for kind in KINDS}
+
+def diff_states(old, new):
+    """[(kind, name, old amount, new amount)] for items that differ; None = absent."""
+    out = []
+    for kind in KINDS:
+        before, after = old.get(kind, {}), new.get(kind, {})
+        for name, amount in after.items():
+            if before.get(name) != amount:
+                out.append((kind, name, before.get(name), amount))
+        for name, amount in before.items():
+            if name not in after:
+                out.append((kind, name, amount, None))
+    return out
+
+# ---------- Writes ----------
+def record(cur, changes, saved_at=None):
+    """
+    Append a version for each user in changes ({user_id: diff_states(...) list}),
+    inside the caller's transaction. Returns {user_id: new version}.
+    """
+    if not changes:
+        return {}
+    saved_at = saved_at or now()
+    ids = json.dumps(list(changes))
+    cur.execute("""
+        SELECT user_id, MAX(version) FROM budget_versions
+        WHERE user_id IN (SELECT value FROM json_each(?)) GROUP BY user_id
+    """, (ids,))
+    latest = dict(cur.fetchall())
+    new_versions = {uid: latest.get(uid, 0) + 1 for uid in changes}
+
+    cur.executemany("INSERT OR IGNORE INTO budget_items (user_id, kind, name) VALUES (?,?,?)",
+                    [(uid, kind, name) for uid, diff in changes.items() for kind, name, _, _ in diff])
+    cur.execute("""
+        SELECT user_id, kind, name, id FROM budget_items
+        WHERE user_id IN (SELECT value FROM json_each(?))
+    """, (ids,))
+    item_ids = {(uid, kind, name): iid for uid, kind, name, iid in cur.fetchall()}
+
+    cur.executemany("INSERT INTO budget_versions (user_id, version, saved_at) VALUES (?,?,?)",
+                    [(uid, v, saved_at) for uid, v in new_versions.items()])
+    cur.executemany("INSERT INTO budget_changes (item_id, version, user_id, amount) VALUES (?,?,?,?)",
+                    [(item_ids[uid, kind, name], new_versions[uid], uid, new)
+                     for uid, diff in changes.items() for kind, name, _, new in diff])
+    return new_versions
+
+# ---------- Reads ----------
+def list_versions(user_id):
+    """[(version, saved_at)] oldest first."""
+    with read() as cur:
+        cur.execute("SELECT version, saved_at FROM budget_versions WHERE user_id=? ORDER BY version",
+                    (user_id,))
+        return cur.fetchall()
+
+def _cutoff(when):
+    # A bare date means "by the end of that day"
+    if isinstance(when, datetime.datetime):
+        return when.isoformat(timespec="seconds")
+    if isinstance(when, datetime.date):
+        return when.isoformat() + "T23:59:59"
+    when = str(when)
+    return when + "T23:59:59" if len(when) == 10 else when
+
+def version_at(user_id, when):
+    """The version in effect at `when` (date, datetime or ISO string), or None if before the first save."""
+    with read() as cur:
+        cur.execute("""
+            SELECT version FROM budget_versions WHERE user_id=? AND saved_at <= ?
+            ORDER BY saved_at DESC, version DESC LIMIT 1
+        """, (user_id, _cutoff(when)))
+        row = cur.fetchone()
+    return row[0] if row else None
+
+def state_at(user_id, version):
+    """{"income": {...}, "expense": {...}, "profile": {...}} as saved in `version`."""
+    state = empty_state()
+    with read() as cur:
+        cur.execute(f"""
+            SELECT i.kind, i.name, {_AT_VERSION}
+            FROM budget_items i WHERE i.user_id=? ORDER BY i.id
+        """, (version, user_id))
+        for kind, name, amount in cur.fetchall():
+            # NULL: not added yet, or removed by then
+            if amount is not None:
+                state[kind][name] = _value(kind, name, amount)
+    return state
+
+def as_of(user_id, when):
+    """The budget state at `when`, or None if the user hadn't saved one yet."""
+    version = version_at(user_id, when)
+    return None if version is None else state_at(user_id, version)
+
+def diff(user_id, old_version, new_version):
+    """
+    {kind: {name: (amount in old_version, amount in new_version)}} for items
+    that differ (None = absent). Only items changed between the two versions
+    are looked at, found through the (user_id, version) index.
+    """
+    lo, hi = sorted((old_version, new_version))
+    out = {kind: {} for kind in KINDS}
+    with read() as cur:
+        cur.execute(f"""
+            SELECT i.kind, i.name, {_AT_VERSION}, {_AT_VERSION}
+            FROM budget_items i
+            WHERE i.id IN (SELECT item_id FROM budget_changes
+                           WHERE user_id=? AND version > ? AND version <= ?)
+        """, (lo, hi, user_id, lo, hi))
+        for kind, name, before, after in cur.fetchall():
+            before, after = _value(kind, name, before), _value(kind, name, after)
+            if before != after:
+                out[kind][name] = (before, after) if old_version <= new_version else (after, before)
+    return out
+
+def allocation_history(user_id, kind="expense"):
+    """
+    (saved_at per version, {name: [amount per version]}) for charting how a
+    user's allocations moved; an absent item is 0. Cached per data version.
+    """
+    key = (user_id, cache.data_version(user_id), kind)
+    result = _histories.get(key)
+    if result is not None:
+        return result
+    with read() as cur:
+        cur.execute("SELECT version, saved_at FROM budget_versions WHERE user_id=? ORDER BY version",
+                    (user_id,))
+        saved = cur.fetchall()
+        cur.execute("""
+            SELECT c.version, i.name, c.amount
+            FROM budget_changes c JOIN budget_items i ON i.id = c.item_id
+            WHERE c.user_id=? AND i.kind=? ORDER BY c.version
+        """, (user_id, kind))
+        changes = cur.fetchall()
+    position = {version: n for n, (version, _) in enumerate(saved)}
+    points = {}
+    for version, name, amount in changes:
+        points.setdefault(name, {})[position[version]] = amount or 0.0
+    # Each change holds from its version until the item's next change
+    series = {}
+    for name, changed in points.items():
+        values, current = [], 0.0
+        for n in range(len(saved)):
+            current = changed.get(n, current)
+            values.append(current)
+        series[name] = tuple(values)
+    result = (tuple(at for _, at in saved), series)
+    _histories.put(key, result)
+    return result
@@ -0,0 +1,22 @@
+import importlib
+import threading
+
+# Dashboard side of the charts: getting matplotlib loaded before it's needed.
+# Drawing, chart data and cached rendering live in backend.charts so headless
+# exports don't depend on the GUI package.
+
+# Heavy modules the dashboard and exports need; imported on first use or by warm_up()
+MATPLOTLIB_MODULES = [
+    "matplotlib.figure",
+    "matplotlib.backends.backend_agg",
+    "matplotlib.backends.backend_pdf",
+]
+
+def warm_up():
+    """Import matplotlib in a background thread so the dashboard opens without the wait."""
+    def load():
+        for name in MATPLOTLIB_MODULES:
+            importlib.import_module(name)
+    t = threading.Thread(target=load, name="matplotlib-warmup", daemon=True)
+    t.start()
+    return t
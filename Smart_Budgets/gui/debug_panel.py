@@ -0,0 +1,70 @@
+import tkinter as tk
+from tkinter import filedialog
+from backend import instrument
+
+# Hidden developer panel: Ctrl+Shift+D on the dashboard opens it. Shows what
+# backend.instrument has recorded and refreshes itself while open.
+
+REFRESH_MS = 1000
+
+class DebugPanel(tk.Toplevel):
+    def __init__(self, master):
+        super().__init__(master)
+        self.title("Debug — Instrumentation")
+        self.geometry("900x520")
+
+        bar = tk.Frame(self)
+        bar.pack(fill="x", padx=8, pady=6)
+        self.enabled_var = tk.BooleanVar(value=instrument.enabled)
+        tk.Checkbutton(bar, text="Record", variable=self.enabled_var,
+                       command=self._toggle).pack(side="left")
+        tk.Button(bar, text="Reset", width=10, command=self._reset).pack(side="left", padx=6)
+        tk.Button(bar, text="Dump…", width=10, command=self._dump).pack(side="left", padx=6)
+
+        self.text = tk.Text(self, font=("Courier", 9), wrap="none")
+        self.text.pack(fill="both", expand=True, padx=8, pady=(0, 8))
+        self._after_id = None
+        self._update()
+
+    def destroy(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
+
+    def _toggle(self):
+        if self.enabled_var.get():
+            instrument.enable()
+        else:
+            instrument.disable()
+        self._show()
+
+    def _reset(self):
+        instrument.reset()
+        self._show()
+
+    def _dump(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")],
+                                            initialfile="smart_budgets_instrument.json")
+        if path:
+            instrument.dump(path)
+
+    def _show(self):
+        top = self.text.yview()[0]
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", instrument.report())
+        self.text.yview_moveto(top)
+
+    def _update(self):
+        self._show()
+        self._after_id = self.after(REFRESH_MS, self._update)
+
+def toggle(master):
+    """Open the panel for master's window, or close it if already open."""
+    panel = getattr(master, "_debug_panel", None)
+    if panel is not None and panel.winfo_exists():
+        panel.destroy()
+        master._debug_panel = None
+    else:
+        master._debug_panel = DebugPanel(master)
@@ -1,11 +1,12 @@
 import tkinter as tk
 from tkinter import messagebox
 from backend import user, budget
+from gui import charts, tasks
 from gui.setup_wizard import SetupWizard
 from gui.welcome_window import WelcomeWindow
 
 class LoginWindow:
-    def __init__(self, master):
+    def __init__(self, master, preload=True):
         self.master = master
         master.title("Smart Budget - Login")
         master.geometry("360x260")
@@ -26,12 +27,25 @@ class LoginWindow:
         btns = tk.Frame(master)
         btns.pack(pady=10)
 
-        tk.Button(btns, text="Login", width=12, command=self.login).grid(row=0, column=0, padx=6)
-        tk.Button(btns, text="Sign Up", width=12, command=self.signup).grid(row=0, column=1, padx=6)
+        self.login_btn = tk.Button(btns, text="Login", width=12, command=self.login)
+        self.login_btn.grid(row=0, column=0, padx=6)
+        self.signup_btn = tk.Button(btns, text="Sign Up", width=12, command=self.signup)
+        self.signup_btn.grid(row=0, column=1, padx=6)
 
-    def _open_next(self, username, user_id):
+        self.tasks = tasks.runner_for(master)
+
+        # Load matplotlib while the user is typing, once the form is on screen
+        if preload:
+            master.after(300, charts.warm_up)
+
+    def _set_busy(self, busy):
+        state = "disabled" if busy else "normal"
+        self.login_btn.config(state=state)
+        self.signup_btn.config(state=state)
+
+    def _open_next(self, username, user_id, has_setup):
         self.master.destroy()
-        if budget.user_has_setup(user_id):
+        if has_setup:
             root = tk.Tk()
             WelcomeWindow(root, username, user_id)
             root.mainloop()
@@ -43,17 +57,36 @@ class LoginWindow:
     def login(self):
         username = self.username_entry.get().strip()
         password = self.password_entry.get().strip()
-        user_id = user.validate_login(username, password)
-        if user_id:
-            self._open_next(username, user_id)
-        else:
-            messagebox.showerror("Login Failed", "Invalid username or password.")
+
+        def check():
+            user_id = user.validate_login(username, password)
+            return user_id, user_id and budget.user_has_setup(user_id)
+
+        def done(result):
+            user_id, has_setup = result
+            if user_id:
+                self._open_next(username, user_id, has_setup)
+            else:
+                self._set_busy(False)
+                messagebox.showerror("Login Failed", "Invalid username or password.")
+
+        self._set_busy(True)
+        self.tasks.submit(check, on_done=done, on_error=self._failed)
 
     def signup(self):
         username = self.username_entry.get().strip()
         password = self.password_entry.get().strip()
-        uid = user.create_user(username, password)
-        if uid:
-            messagebox.showinfo("Sign Up", "Account created. Please log in.")
-        else:
-            messagebox.showerror("Sign Up Failed", "Username exists or invalid input.")
+
+        def done(uid):
+            self._set_busy(False)
+            if uid:
+                messagebox.showinfo("Sign Up", "Account created. Please log in.")
+            else:
+                messagebox.showerror("Sign Up Failed", "Username exists or invalid input.")
+
+        self._set_busy(True)
+        self.tasks.submit(user.create_user, username, password, on_done=done, on_error=self._failed)
+
+    def _failed(self, e):
+        self._set_busy(False)
+        messagebox.showerror("Error", f"Could not reach the database.\n{e}")
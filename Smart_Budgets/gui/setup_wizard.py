@@ -1,8 +1,12 @@
 import tkinter as tk
 from tkinter import messagebox
-from backend import budget
+from backend import budget, categories
+from gui import tasks
 from gui.welcome_window import WelcomeWindow
 
+# Running totals update at most this often while a slider is being dragged
+TOTALS_DELAY_MS = 120
+
 class SetupWizard:
     """
     Guided wizard with sliders and buttons:
@@ -23,16 +27,26 @@ class SetupWizard:
 
         # Data holders
         self.income_count_var = tk.IntVar(value=1)
-        self.income_names = []
-        self.income_scales = []
+        self.income_names = []       # one per income row ever created; the first
+        self.income_scales = []      # income_count_var of them are in use
+        self.income_rows = []
         self.ess_scales = {}
         self.life_scales = {}
         self.dependents_var = tk.IntVar(value=0)
         self.savings_pct_var = tk.IntVar(value=10)  # default 10%
 
+        # Running totals, kept up to date from variable traces (see _var_changed)
+        self._tracked = {}           # Tk variable name -> (group, index, variable)
+        self._counted = {}           # Tk variable name -> amount currently in _sums
+        self._sums = {"income": 0.0, "expense": 0.0}
+        self._dirty = set()
+        self._totals_job = None
+
         self.container = tk.Frame(master)
         self.container.pack(fill="both", expand=True, padx=16, pady=16)
 
+        self._build_totals_bar()
+
         self.nav = tk.Frame(master)
         self.nav.pack(fill="x", pady=6)
         self.back_btn = tk.Button(self.nav, text="◀ Back", width=10, command=self.prev_step, state="disabled")
@@ -40,14 +54,9 @@ class SetupWizard:
         self.back_btn.pack(side="left")
         self.next_btn.pack(side="right")
 
-        self.show_step()
-
-    # ---------- Step Handling ----------
-    def show_step(self):
-        for f in self.container.winfo_children():
-            f.destroy()
-
-        builders = [
+        # Step frames are built on first visit and kept, so Back/Next only
+        # swaps which one is packed and slider values survive navigation
+        self.builders = [
             self._build_income_count,
             self._build_income_amounts,
             self._build_essentials,
@@ -55,9 +64,29 @@ class SetupWizard:
             self._build_dependents_savings,
             self._build_review,
         ]
+        self.frames = {}
+        self.current_frame = None
+
+        self._track(self.income_count_var, "count")
+        self._track(self.savings_pct_var, "savings")
 
-        frame = builders[self.step]()
-        frame.pack(fill="both", expand=True)
+        self.show_step()
+
+    # ---------- Step Handling ----------
+    def show_step(self):
+        frame = self.frames.get(self.step)
+        if frame is None:
+            frame = self.frames[self.step] = self.builders[self.step]()
+        if self.step == 1:
+            self._sync_income_rows()
+        elif self.step == 5:
+            self._fill_review()
+
+        if frame is not self.current_frame:
+            if self.current_frame is not None:
+                self.current_frame.pack_forget()
+            frame.pack(fill="both", expand=True)
+            self.current_frame = frame
         self.back_btn.config(state="normal" if self.step > 0 else "disabled")
         self.next_btn.config(text="Save ▶" if self.step == 5 else "Next ▶")
 
@@ -96,17 +125,19 @@ class SetupWizard:
         f = tk.Frame(self.container)
         self._build_title(f, "Step 2: Set income amounts (per month)")
 
-        # Clear prior references
-        self.income_names = []
-        self.income_scales = []
+        self.income_grid = tk.Frame(f)
+        self.income_grid.pack(pady=6, fill="x")
 
-        cnt = self.income_count_var.get()
-        grid = tk.Frame(f)
-        grid.pack(pady=6, fill="x")
+        tk.Label(f, text="Use the sliders to set monthly amounts.").pack(pady=4)
+        return f
 
-        for i in range(cnt):
-            row = tk.Frame(grid)
-            row.pack(fill="x", pady=6)
+    def _sync_income_rows(self):
+        # Rows are created as the count grows and only hidden when it shrinks,
+        # so going back to change the count keeps amounts already entered
+        cnt = self.income_count_var.get()
+        while len(self.income_rows) < cnt:
+            i = len(self.income_rows)
+            row = tk.Frame(self.income_grid)
 
             name_var = tk.StringVar(value=f"Income {i+1}")
             self.income_names.append(name_var)
@@ -117,16 +148,20 @@ class SetupWizard:
                              tickinterval=25000, resolution=500, variable=val_var)
             scale.pack(side="left", padx=6)
             self.income_scales.append(val_var)
+            self._track(val_var, "income", i)
+            self.income_rows.append(row)
 
-        tk.Label(f, text="Use the sliders to set monthly amounts.").pack(pady=4)
-        return f
+        for i, row in enumerate(self.income_rows):
+            if i < cnt and not row.winfo_manager():
+                row.pack(fill="x", pady=6)
+            elif i >= cnt and row.winfo_manager():
+                row.pack_forget()
 
     def _build_essentials(self):
         f = tk.Frame(self.container)
         self._build_title(f, "Step 3: Essentials (Survival)")
 
-        self.ess_scales = {}
-        for cat in budget.ESSENTIALS:
+        for cat in categories.in_group("essentials"):
             row = tk.Frame(f)
             row.pack(fill="x", pady=6)
             tk.Label(row, text=cat, width=32, anchor="w").pack(side="left", padx=6)
@@ -134,6 +169,7 @@ class SetupWizard:
             tk.Scale(row, from_=0, to=100000, orient="horizontal", length=360,
                      tickinterval=25000, resolution=500, variable=var).pack(side="left", padx=6)
             self.ess_scales[cat] = var
+            self._track(var, "expense")
 
         tk.Label(f, text="Tip: Start with realistic essentials before non-essentials.").pack(pady=6)
         return f
@@ -141,8 +177,7 @@ class SetupWizard:
     def _build_lifestyle(self):
         f = tk.Frame(self.container)
         self._build_title(f, "Step 4: Lifestyle (Non-essential)")
-        self.life_scales = {}
-        for cat in budget.LIFESTYLE:
+        for cat in categories.in_group("lifestyle"):
             row = tk.Frame(f)
             row.pack(fill="x", pady=6)
             tk.Label(row, text=cat, width=32, anchor="w").pack(side="left", padx=6)
@@ -150,6 +185,7 @@ class SetupWizard:
             tk.Scale(row, from_=0, to=50000, orient="horizontal", length=360,
                      tickinterval=10000, resolution=250, variable=var).pack(side="left", padx=6)
             self.life_scales[cat] = var
+            self._track(var, "expense")
 
         tk.Label(f, text="These are optional. Keep them lean if funds are tight.").pack(pady=6)
         return f
@@ -178,8 +214,15 @@ class SetupWizard:
     def _build_review(self):
         f = tk.Frame(self.container)
         self._build_title(f, "Review & Save")
-        text = tk.Text(f, height=16, width=72)
-        text.pack(pady=6)
+        self.review_text = tk.Text(f, height=16, width=72)
+        self.review_text.pack(pady=6)
+        tk.Label(f, text="Click 'Save ▶' to store your budget and view your dashboard.").pack(pady=4)
+        return f
+
+    def _fill_review(self):
+        text = self.review_text
+        text.config(state="normal")
+        text.delete("1.0", "end")
 
         incomes = self._collect_incomes()
         essentials = self._collect_essentials()
@@ -209,15 +252,94 @@ class SetupWizard:
         balance = total_income - est_total_expenses
         line(f"Estimated Total Expenses: R{est_total_expenses:,.2f}")
         line(f"Estimated Remaining Balance: R{balance:,.2f}")
+        line("")
         text.config(state="disabled")
 
-        tk.Label(f, text="Click 'Save ▶' to store your budget and view your dashboard.").pack(pady=4)
-        return f
+        # Risk bands from a Monte Carlo run (income shocks, inflation, new dependents)
+        expenses = {**essentials, **lifestyle}
+        def show_outlook(result):
+            low, mid, high = (result.band(p)[0][-1] for p in (5, 50, 95))
+            saved_low, saved_high = result.band(5)[1][-1], result.band(95)[1][-1]
+            text.config(state="normal")
+            line(f"12-MONTH OUTLOOK ({result.n_scenarios:,} simulated scenarios)")
+            line(f"  Month-12 balance: R{low:,.2f} (bad case) / R{mid:,.2f} (typical) / R{high:,.2f} (good case)")
+            line(f"  Saved after 12 months: R{saved_low:,.2f} – R{saved_high:,.2f}")
+            line(f"  Chance of at least one short month: {result.shortfall_probability:.0%}")
+            text.config(state="disabled")
+
+        from backend import simulate
+        tasks.runner_for(self.master).submit(
+            simulate.simulate, incomes, expenses, sav_pct, dep,
+            key="review-outlook", on_done=show_outlook,
+            on_error=lambda e: None)  # the outlook is extra; the review works without it
+
+    # ---------- Running totals ----------
+    def _build_totals_bar(self):
+        bar = tk.Frame(self.master, bd=1, relief="groove")
+        bar.pack(fill="x", padx=16)
+        self.totals_labels = {}
+        for key, title in [("income", "Income"), ("expense", "Expenses"),
+                           ("savings", "Savings"), ("balance", "Remaining")]:
+            tk.Label(bar, text=f"{title}:", font=("Arial", 10, "bold")).pack(side="left", padx=(10, 2), pady=4)
+            lbl = tk.Label(bar, text="R0.00", width=12, anchor="w")
+            lbl.pack(side="left")
+            self.totals_labels[key] = lbl
+
+    def _track(self, var, group, index=None):
+        name = str(var)
+        self._tracked[name] = (group, index, var)
+        self._counted[name] = 0.0
+        var.trace_add("write", self._var_changed)
+
+    def _var_changed(self, name, *_):
+        # A slider drag writes its variable on every step; collect the changes
+        # and fold them into the totals once per TOTALS_DELAY_MS
+        self._dirty.add(name)
+        if self._totals_job is None:
+            self._totals_job = self.master.after(TOTALS_DELAY_MS, self._update_totals)
+
+    def _update_totals(self):
+        self._totals_job = None
+        dirty, self._dirty = self._dirty, set()
+        if any(self._tracked[name][0] == "count" for name in dirty if name in self._tracked):
+            # Rows hidden or shown: every income row may change whether it counts
+            dirty.update(name for name, (group, _, _) in self._tracked.items() if group == "income")
+
+        count = self._var_value(self.income_count_var)
+        for name in dirty:
+            group, index, var = self._tracked.get(name, (None, None, None))
+            if group not in self._sums:
+                continue
+            value = self._var_value(var)
+            if group == "income" and index >= count:
+                value = 0.0
+            self._sums[group] += value - self._counted[name]
+            self._counted[name] = value
+
+        income = self._sums["income"]
+        savings = round(income * (self._var_value(self.savings_pct_var) / 100.0), 2)
+        expense = self._sums["expense"] + savings
+        for key, value in [("income", income), ("expense", expense),
+                           ("savings", savings), ("balance", income - expense)]:
+            text = f"R{value:,.2f}"
+            lbl = self.totals_labels[key]
+            if lbl.cget("text") != text:
+                lbl.config(text=text)
+        self.totals_labels["balance"].config(fg="red" if income - expense < 0 else "black")
+
+    @staticmethod
+    def _var_value(var):
+        try:
+            return float(var.get())
+        except (tk.TclError, ValueError):
+            # Mid-edit (e.g. an empty spinbox); count it as zero for now
+            return 0.0
 
     # ---------- Collect & Validate ----------
     def _collect_incomes(self):
         incomes = {}
-        for name_var, val_var in zip(self.income_names, self.income_scales):
+        cnt = self.income_count_var.get()
+        for name_var, val_var in zip(self.income_names[:cnt], self.income_scales[:cnt]):
             name = (name_var.get() or "").strip() or "Income"
             incomes[name] = float(val_var.get())
         return incomes
@@ -230,7 +352,7 @@ class SetupWizard:
 
     def validate_step(self):
         if self.step == 1:
-            if all(v.get() == 0 for v in self.income_scales):
+            if all(v.get() == 0 for v in self.income_scales[:self.income_count_var.get()]):
                 messagebox.showerror("Income Required", "Please set at least one income above R0.")
                 return False
         return True
@@ -252,16 +374,22 @@ class SetupWizard:
         if savings_amt > 0:
             expenses[budget.SAVINGS_CAT] = savings_amt
 
-        try:
-            budget.replace_income(self.user_id, incomes)
-            budget.replace_expenses(self.user_id, expenses)
-            budget.upsert_profile(self.user_id, dep, sav_pct)
-        except Exception as e:
+        def done(_):
+            messagebox.showinfo("Saved", "Your budget has been saved.")
+            self.master.destroy()
+            root = tk.Tk()
+            WelcomeWindow(root, self.username, self.user_id)
+            root.mainloop()
+
+        def failed(e):
+            self.next_btn.config(state="normal")
+            self.back_btn.config(state="normal")
             messagebox.showerror("Save Failed", f"Could not save your setup.\n{e}")
-            return
 
-        messagebox.showinfo("Saved", "Your budget has been saved.")
-        self.master.destroy()
-        root = tk.Tk()
-        WelcomeWindow(root, self.username, self.user_id)
-        root.mainloop()
+        # Saving runs on a worker; keep the user from navigating away meanwhile
+        self.next_btn.config(state="disabled")
+        self.back_btn.config(state="disabled")
+        tasks.runner_for(self.master).submit(
+            budget.save_budget, self.user_id, incomes, expenses,
+            {"dependents": dep, "savings_percent": sav_pct},
+            on_done=done, on_error=failed)
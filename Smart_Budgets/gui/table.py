@@ -0,0 +1,229 @@
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+# Virtualized table on a ttk.Treeview. Rows live in Python (an ordered key
+# list plus a key -> values dict); the Treeview only ever holds one item per
+# visible line, and scrolling rewrites those items' values from the current
+# window of rows. Memory in Tk stays constant however many rows there are, and
+# scrolling or sorting 100k rows is a list operation plus one screenful of
+# item updates.
+
+WHEEL_ROWS = 3
+
+class VirtualTable(tk.Frame):
+    """
+    columns: [(name, heading, width, anchor)], optionally with a 5th element,
+    a formatter turning the raw value into display text. Clicking a heading
+    sorts by that column (again to reverse); rows are otherwise kept in
+    insertion order.
+    """
+
+    def __init__(self, master, columns, **kw):
+        kw.setdefault("height", 300)
+        super().__init__(master, **kw)
+        # The frame's size comes from its parent, not from the Treeview, so
+        # resizing the Treeview to fit can't feed back into another resize
+        self.pack_propagate(False)
+        self.columns = [c[0] for c in columns]
+        self.formatters = [c[4] if len(c) > 4 else str for c in columns]
+        self._order = []            # row keys in display order
+        self._values = {}           # key -> tuple of raw values
+        self._top = 0               # index of the first visible row
+        self._items = []            # Treeview items: one per visible line
+        self._sort = None           # (column index, descending) or None
+        self._key = None            # sort key for the current sort column
+        self._render_job = None
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings",
+                                 selectmode="none", height=1)
+        for i, (name, heading, width, anchor, *_) in enumerate(columns):
+            self.tree.heading(name, text=heading, command=lambda i=i: self.sort_by(i))
+            self.tree.column(name, width=width, anchor=anchor, stretch=(i == 0))
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scroll.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self._headings = [heading for _, heading, *_ in columns]
+        self._row_height = self._measure_row_height()
+        self.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_rows(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_rows(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_rows(WHEEL_ROWS))
+
+    def _measure_row_height(self):
+        height = ttk.Style(self).lookup("Treeview", "rowheight")
+        try:
+            return int(height)
+        except (TypeError, ValueError):
+            return tkfont.nametofont("TkDefaultFont").metrics("linespace") + 4
+
+    # ---------- Data ----------
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def keys(self):
+        return list(self._order)
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def set_rows(self, rows):
+        """Replace everything with [(key, values)]; keeps the current sort."""
+        self._values = {key: tuple(values) for key, values in rows}
+        self._order = list(self._values)
+        if self._sort is not None:
+            self._apply_sort()
+        self._top = min(self._top, self._max_top())
+        self._schedule_render()
+
+    def insert(self, key, values, index=None):
+        """
+        Add a row (or update it if the key exists). Sorted tables place it in
+        sort order; otherwise at `index` (default: the end).
+        """
+        if key in self._values:
+            self.update(key, values)
+            return
+        values = tuple(values)
+        self._values[key] = values
+        if self._sort is None:
+            self._order.insert(len(self._order) if index is None else index, key)
+        else:
+            self._place(key)
+        self._schedule_render()
+
+    def update(self, key, values):
+        values = tuple(values)
+        if self._values.get(key) == values:
+            return
+        self._values[key] = values
+        if self._sort is not None:
+            self._order.remove(key)
+            self._place(key)
+        self._schedule_render()
+
+    def delete(self, key):
+        if self._values.pop(key, None) is None:
+            return
+        self._order.remove(key)
+        self._top = min(self._top, self._max_top())
+        self._schedule_render()
+
+    def clear(self):
+        self.set_rows([])
+
+    # ---------- Sorting ----------
+    def _value_key(self, col):
+        """Sort key for a row's values, picked once per sort for speed."""
+        kinds = {type(v[col]) for v in self._values.values()}
+        if kinds <= {str}:
+            return lambda values: values[col].casefold()
+        if kinds <= {int, float}:
+            return lambda values: values[col]
+        # Mixed column: text and numbers never compare directly, so rank by type first
+        return lambda values: ((0, values[col].casefold()) if isinstance(values[col], str)
+                               else (1, values[col]))
+
+    def _apply_sort(self):
+        col, descending = self._sort
+        self._key = self._value_key(col)
+        values, key = self._values, self._key
+        self._order.sort(key=lambda k: key(values[k]), reverse=descending)
+
+    def _sort_position(self, new_values):
+        # Binary search on the sorted order for where the row belongs
+        descending = self._sort[1]
+        values, key = self._values, self._key
+        probe = key(new_values)
+        lo, hi = 0, len(self._order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = key(values[self._order[mid]])
+            if (k >= probe) if descending else (k <= probe):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _place(self, key):
+        """Insert key into the sorted order (its values are already stored)."""
+        try:
+            self._order.insert(self._sort_position(self._values[key]), key)
+        except (TypeError, AttributeError):
+            # Its value's type doesn't match the column's key; re-sort everything
+            self._order.append(key)
+            self._apply_sort()
+
+    def sort_by(self, col, descending=None):
+        """Sort by column index; descending=None toggles when re-sorting the same column."""
+        if descending is None:
+            descending = self._sort is not None and self._sort[0] == col and not self._sort[1]
+        if self._sort is not None and self._sort == (col, not descending):
+            # Same column, other direction: flipping the list is O(n), no compares
+            # (rows with equal values also flip, which nobody can see)
+            self._order.reverse()
+            self._sort = (col, descending)
+        else:
+            self._sort = (col, descending)
+            self._apply_sort()
+        for i, name in enumerate(self.columns):
+            arrow = (" ▼" if descending else " ▲") if i == col else ""
+            self.tree.heading(name, text=self._headings[i] + arrow)
+        self._top = 0
+        self._render()
+
+    # ---------- Scrolling and drawing ----------
+    def _max_top(self):
+        return max(0, len(self._order) - len(self._items))
+
+    def scroll_rows(self, n):
+        top = max(0, min(self._top + n, self._max_top()))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._top = max(0, min(int(float(amount) * len(self._order)), self._max_top()))
+            self._render()
+        else:
+            step = len(self._items) if unit == "pages" else 1
+            self.scroll_rows(int(amount) * step)
+
+    def _on_resize(self, event):
+        # One Treeview item per line that fits (the heading takes about one line)
+        visible = max(1, event.height // self._row_height - 1)
+        if visible == len(self._items):
+            return
+        self.tree.configure(height=visible)
+        while len(self._items) < visible:
+            self._items.append(self.tree.insert("", "end", values=()))
+        while len(self._items) > visible:
+            self.tree.delete(self._items.pop())
+        self._top = min(self._top, self._max_top())
+        self._render()
+
+    def _schedule_render(self):
+        # A burst of inserts/deletes redraws once, when Tk is next idle
+        if self._render_job is None:
+            self._render_job = self.after_idle(self._render)
+
+    def _render(self):
+        if self._render_job is not None:
+            self.after_cancel(self._render_job)
+            self._render_job = None
+        rows = self._order[self._top:self._top + len(self._items)]
+        for item, key in zip(self._items, rows):
+            values = self._values[key]
+            self.tree.item(item, values=[fmt(v) for fmt, v in zip(self.formatters, values)])
+        for item in self._items[len(rows):]:
+            self.tree.item(item, values=())
+        total = len(self._order)
+        if total:
+            self.scroll.set(self._top / total, min(1.0, (self._top + len(self._items)) / total))
+        else:
+            self.scroll.set(0.0, 1.0)
@@ -0,0 +1,138 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+# Runs backend work off the Tk event thread. Worker threads never touch Tk:
+# results, errors and progress go through a queue that the Tk loop drains with
+# after(), so every callback runs on the Tk thread.
+
+MAX_WORKERS = 4
+POLL_MS = 25
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="smart-budget")
+        return _pool
+
+class Task:
+    """Handle for submitted work. Workers may check `cancelled` and call progress()."""
+
+    def __init__(self, runner, key, on_done, on_error, on_progress):
+        self.key = key
+        self.cancelled = False
+        self.future = None
+        self._runner = runner
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+
+    def cancel(self):
+        self.cancelled = True
+        # If it never started, _run won't post anything; retire it here instead
+        if self.future is not None and self.future.cancel():
+            self._runner._post(self, "cancelled", None)
+
+    def progress(self, *args):
+        """Called from the worker; on_progress(*args) runs later on the Tk thread."""
+        if not self.cancelled and self._on_progress is not None:
+            self._runner._post(self, "progress", args)
+
+class TaskRunner:
+    def __init__(self, master):
+        self.master = master
+        self._queue = queue.Queue()
+        self._active = set()
+        self._latest = {}       # key -> newest Task for "latest request wins"
+        self._polling = False
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None,
+               key=None, with_task=False):
+        """
+        Run fn(*args) on a worker thread; on_done(result) / on_error(exc) run on the Tk thread.
+        key: a newer submit with the same key cancels this one (its callbacks never run).
+        with_task: pass the Task as fn's first argument, for progress() and cancellation checks.
+        """
+        task = Task(self, key, on_done, on_error, on_progress)
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._latest[key] = task
+        call_args = (task,) + args if with_task else args
+        self._active.add(task)
+        task.future = _get_pool().submit(self._run, task, fn, call_args)
+        self._start_polling()
+        return task
+
+    def cancel_all(self):
+        for task in list(self._active):
+            task.cancel()
+
+    def _run(self, task, fn, args):
+        if task.cancelled:
+            self._post(task, "cancelled", None)
+            return
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._post(task, "error", e)
+        else:
+            self._post(task, "done", result)
+
+    def _post(self, task, kind, payload):
+        self._queue.put((task, kind, payload))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.master.after(POLL_MS, self._drain)
+
+    def _drain(self):
+        while True:
+            try:
+                task, kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind != "progress":
+                self._finish(task)
+            if task.cancelled:
+                continue
+            if kind == "done" and task._on_done is not None:
+                task._on_done(payload)
+            elif kind == "error":
+                if task._on_error is not None:
+                    task._on_error(payload)
+                else:
+                    self.master._root().report_callback_exception(type(payload), payload, payload.__traceback__)
+            elif kind == "progress":
+                task._on_progress(*payload)
+        # A callback above may have destroyed the window
+        try:
+            alive = bool(self.master.winfo_exists())
+        except tk.TclError:
+            alive = False
+        if alive and self._active:
+            self.master.after(POLL_MS, self._drain)
+        else:
+            self._polling = False
+            if not alive:
+                self.cancel_all()
+
+    def _finish(self, task):
+        self._active.discard(task)
+        if task.key is not None and self._latest.get(task.key) is task:
+            del self._latest[task.key]
+
+def runner_for(widget):
+    """The TaskRunner for widget's toplevel window, created on first use."""
+    top = widget.winfo_toplevel()
+    runner = getattr(top, "_task_runner", None)
+    if runner is None:
+        runner = top._task_runner = TaskRunner(top)
+    return runner
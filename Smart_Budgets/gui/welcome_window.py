@@ -1,11 +1,13 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from backend import budget
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_pdf import PdfPages
+from backend import budget, charts, instrument
+from gui import debug_panel, table, tasks
 import csv
 
+CHART_PADX = 20
+CHART_WIDTH_STEP = 50     # px; chart widths snap to this so a drag-resize reuses renders
+RESIZE_DELAY_MS = 200     # re-render once the window has stopped resizing
+
 class WelcomeWindow(tk.Frame):
     def __init__(self, master, username, user_id):
         super().__init__(master)
@@ -59,6 +61,7 @@ class WelcomeWindow(tk.Frame):
         self.visual_canvas.create_window((0, 0), window=self.visual_tab, anchor="nw")
         
         self.visual_tab.bind("<Configure>", lambda e: self.visual_canvas.configure(scrollregion=self.visual_canvas.bbox("all")))
+        self.visual_canvas.bind("<Configure>", self._on_visual_resize)
 
         # Actions
         btns = tk.Frame(master)
@@ -66,141 +69,272 @@ class WelcomeWindow(tk.Frame):
         tk.Button(btns, text="Adjust Budget", width=16, command=self.open_wizard).pack(side="left", padx=6)
         tk.Button(btns, text="Export CSV", width=14, command=self.export_csv).pack(side="left", padx=6)
         tk.Button(btns, text="Export PDF", width=14, command=self.export_pdf).pack(side="left", padx=6)
+        tk.Button(btns, text="Import Statement", width=16, command=self.import_statement).pack(side="left", padx=6)
         tk.Button(btns, text="Close", width=12, command=self.master.destroy).pack(side="left", padx=6)
+        self.status_lbl = tk.Label(btns, text="", fg="gray")
+        self.status_lbl.pack(side="left", padx=12)
 
-        # Data containers
-        self.table_box = None
-        self.pie_canvas = None
-        self.bar_canvas = None
-        self.rec_box = None
+        self.tasks = tasks.runner_for(master)
 
-        self.refresh()
+        # Hidden instrumentation panel (see gui.debug_panel)
+        master.bind("<Control-D>", lambda e: debug_panel.toggle(master))
 
-    def refresh(self):
-        # Clear summary cards
-        for w in self.card_frame.winfo_children():
-            w.destroy()
+        # Dashboard widgets are built once here; refresh() only updates them
+        self._build_cards()
+        self._build_table()
+        self._build_charts()
+        self._build_recommendations()
+        self._build_outlook()
 
-        incomes = budget.get_income(self.user_id)
-        expenses = budget.get_expenses(self.user_id)
-
-        # Apply filters
-        exp_ess, exp_life, exp_save, exp_other = budget.split_expenses(expenses)
-        filtered_expenses = {}
-        if self.show_essentials.get():
-            filtered_expenses.update(exp_ess)
-        if self.show_lifestyle.get():
-            filtered_expenses.update(exp_life)
-        if self.show_savings.get():
-            filtered_expenses.update(exp_save)
-        filtered_expenses.update(exp_other)
-
-        total_income = sum(incomes.values())
-        total_expense = sum(filtered_expenses.values())
-        balance = total_income - total_expense
-
-        # Summary cards
-        def card(parent, title, value):
-            box = tk.Frame(parent, bd=1, relief="solid", padx=12, pady=8)
-            tk.Label(box, text=title, font=("Arial", 11, "bold")).pack()
-            tk.Label(box, text=value, font=("Arial", 12)).pack()
-            return box
-
-        c1 = card(self.card_frame, "Total Income", f"R{total_income:,.2f}")
-        c2 = card(self.card_frame, "Total Expenses (filtered)", f"R{total_expense:,.2f}")
-        c3 = card(self.card_frame, "Remaining Balance", f"R{balance:,.2f}")
-        c1.grid(row=0, column=0, padx=8, pady=6, sticky="ew")
-        c2.grid(row=0, column=1, padx=8, pady=6, sticky="ew")
-        c3.grid(row=0, column=2, padx=8, pady=6, sticky="ew")
-
-        # Table in table_tab
-        if self.table_box:
-            self.table_box.destroy()
+        self.refresh()
+
+    # ---------- One-time widget construction ----------
+    def _build_cards(self):
+        def card(col, title):
+            box = tk.Frame(self.card_frame, bd=1, relief="solid", padx=12, pady=8)
+            title_lbl = tk.Label(box, text=title, font=("Arial", 11, "bold"))
+            title_lbl.pack()
+            value_lbl = tk.Label(box, text="", font=("Arial", 12))
+            value_lbl.pack()
+            box.grid(row=0, column=col, padx=8, pady=6, sticky="ew")
+            return box, title_lbl, value_lbl
+
+        self.cards = {
+            "income": card(0, "Total Income"),
+            "expense": card(1, "Total Expenses (filtered)"),
+            "balance": card(2, "Remaining Balance"),
+            "month": card(3, ""),
+        }
+        # Only shown when the ledger has entries for this month
+        self.cards["month"][0].grid_remove()
+
+    def _build_table(self):
         self.table_box = tk.LabelFrame(self.table_tab, text="Your Budget (Filtered)", padx=8, pady=8)
         self.table_box.pack(fill="both", expand=True, padx=12, pady=8)
 
-        hdr = tk.Frame(self.table_box); hdr.pack(fill="x")
-        tk.Label(hdr, text="Category", width=40, anchor="w", font=("Arial", 10, "bold")).pack(side="left")
-        tk.Label(hdr, text="Amount", width=16, anchor="e", font=("Arial", 10, "bold")).pack(side="right")
-
-        def row(parent, k, v):
-            r = tk.Frame(parent); r.pack(fill="x")
-            tk.Label(r, text=k, width=40, anchor="w").pack(side="left")
-            tk.Label(r, text=f"R{v:,.2f}", width=16, anchor="e").pack(side="right")
-
-        row(self.table_box, "— Income —", 0)
-        for k, v in incomes.items():
-            row(self.table_box, f"  {k}", v)
-        row(self.table_box, "", 0)
-        row(self.table_box, "— Expenses (Filtered) —", 0)
-        for k, v in filtered_expenses.items():
-            row(self.table_box, f"  {k}", v)
-
-        # Clear visualization tab
-        for w in self.visual_tab.winfo_children():
-            w.destroy()
-
-        # Pie chart (stacked)
-        if filtered_expenses:
-            pie_frame = tk.Frame(self.visual_tab)
-            pie_frame.pack(fill="both", expand=True, padx=20, pady=6) 
-            
-            fig = Figure(figsize=(9, 6))
-            ax = fig.add_subplot(111)
-            labels = list(filtered_expenses.keys())
-            amounts = list(filtered_expenses.values())
-            
-            # Adjusted labeldistance to place labels further out, reducing overlap
-            ax.pie(amounts, labels=labels, autopct="%1.1f%%", startangle=90, 
-                    labeldistance=1.1, pctdistance=0.85)
-            
-            ax.axis('equal')
-            ax.set_title("Expense Distribution")
-            
-            self.pie_canvas = FigureCanvasTkAgg(fig, master=pie_frame)
-            self.pie_canvas.draw()
-            self.pie_canvas.get_tk_widget().pack(fill="both", expand=True)
-
-        # Bar chart (stacked)
-        bar_frame = tk.Frame(self.visual_tab)
-        bar_frame.pack(fill="both", expand=True, padx=20, pady=4)
-        total_savings = expenses.get(budget.SAVINGS_CAT, 0.0)
-        
-        fig2 = Figure(figsize=(9, 6))
-        ax2 = fig2.add_subplot(111)
-        ax2.bar(["Income", "Expenses", "Savings"], [total_income, total_expense, total_savings], color=['green', 'red', 'blue'])
-        ax2.set_title("Income vs Expenses vs Savings")
-        ax2.set_ylabel("Amount")
-        self.bar_canvas = FigureCanvasTkAgg(fig2, master=bar_frame)
-        self.bar_canvas.draw()
-        self.bar_canvas.get_tk_widget().pack(fill="both", expand=True)
-
-        # Recommendations below table
-        if self.rec_box:
-            self.rec_box.destroy()
+        # Virtualized: only the visible lines exist as Treeview items, so
+        # hundreds of categories cost no more than a dozen
+        money = lambda v: f"R{v:,.2f}"
+        self.table = table.VirtualTable(self.table_box, [
+            ("section", "Section", 110, "w"),
+            ("category", "Category", 320, "w"),
+            ("amount", "Amount", 140, "e", money),
+        ])
+        self.table.pack(fill="both", expand=True)
+
+    def _build_charts(self):
+        # Charts are shown as PNGs from the render cache (see backend.charts), so a
+        # repeat view of the same data never runs matplotlib
+        self.pie_frame = tk.Frame(self.visual_tab)
+        self.bar_frame = tk.Frame(self.visual_tab)
+        self.bar_frame.pack(fill="both", expand=True, padx=CHART_PADX, pady=4)
+        self.history_frame = tk.Frame(self.visual_tab)
+        self.chart_frames = {"pie": self.pie_frame, "bar": self.bar_frame, "history": self.history_frame}
+        self.chart_labels = {kind: tk.Label(frame) for kind, frame in self.chart_frames.items()}
+        for lbl in self.chart_labels.values():
+            lbl.pack(fill="both", expand=True)
+        self._chart_images = {}      # kind -> PhotoImage (Tk needs the reference kept)
+        self._chart_paths = {}       # kind -> PNG currently shown
+        self._chart_task = None
+        self._chart_wanted = {}      # kind -> data the in-flight render is drawing
+        self._chart_data = {}        # kind -> latest data, re-rendered when the tab is resized
+        self._chart_size = None      # (width, height) in inches the shown PNGs were drawn at
+        self._resize_after = None
+
+        # Charts render only while their tab is showing; refresh() just queues
+        # data, kind -> chart data (None hides that chart)
+        self._pending_charts = {}
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self._render_charts())
+
+    def _build_recommendations(self):
         self.rec_box = tk.LabelFrame(self.table_tab, text="Recommendations", padx=8, pady=8)
         self.rec_box.pack(fill="x", padx=12, pady=8)
-        recs = budget.recommendations(self.user_id)
-        if recs:
-            for r in recs:
-                tk.Label(self.rec_box, text="• " + r, anchor="w", justify="left").pack(fill="x")
+        self.rec_labels = []
+
+    def _build_outlook(self):
+        self.outlook_box = tk.LabelFrame(self.table_tab, text="Savings Outlook", padx=8, pady=8)
+        self.outlook_box.pack(fill="x", padx=12, pady=8)
+        self.outlook_lbl = tk.Label(self.outlook_box, anchor="w", justify="left")
+        self.outlook_lbl.pack(fill="x")
+
+    # ---------- Refresh ----------
+    def refresh(self):
+        # Rapid filter toggles coalesce: only the latest load reaches the UI
+        self.tasks.submit(self._load_view, self.user_id, *self._filter_flags(),
+                          key="refresh", on_done=self._apply_view, on_error=self._load_failed)
+        self.tasks.submit(self._load_outlook, self.user_id, key="outlook",
+                          on_done=lambda lines: self._set_text(self.outlook_lbl, "\n".join(lines)))
+        self.tasks.submit(self._load_history, self.user_id, key="history",
+                          on_done=self._update_history)
+
+    @staticmethod
+    def _load_view(user_id, *flags):
+        with instrument.phase("refresh.data"):
+            return budget.budget_view(user_id, *flags)
+
+    @staticmethod
+    def _load_outlook(user_id):
+        # Imported here so NumPy stays off the login path; projections are
+        # cached per budget version, so filter toggles don't recompute them
+        from backend import projection
+        return projection.outlook(user_id)
+
+    @staticmethod
+    def _load_history(user_id):
+        # Cached per data version, like the outlook
+        from backend import versions
+        return versions.allocation_history(user_id)
+
+    def _filter_flags(self):
+        return self.show_essentials.get(), self.show_lifestyle.get(), self.show_savings.get()
+
+    def _apply_view(self, view):
+        with instrument.phase("refresh.table"):
+            self._update_cards(view.snap, view.total_income, view.total_expense, view.balance)
+            self._update_table(view.incomes, view.filtered_expenses)
+        with instrument.phase("refresh.charts"):
+            self._update_charts(view.filtered_expenses, view.total_income,
+                                view.total_expense, view.total_savings)
+        with instrument.phase("refresh.recommendations"):
+            self._update_recommendations(view.recommendations)
+
+    def _load_failed(self, e):
+        messagebox.showerror("Load Failed", f"Could not load your budget.\n{e}")
+
+    @staticmethod
+    def _set_text(widget, text):
+        # Skip the Tk round-trip (and re-layout) when nothing changed
+        if widget.cget("text") != text:
+            widget.config(text=text)
+
+    def _update_cards(self, snap, total_income, total_expense, balance):
+        self._set_text(self.cards["income"][2], f"R{total_income:,.2f}")
+        self._set_text(self.cards["expense"][2], f"R{total_expense:,.2f}")
+        self._set_text(self.cards["balance"][2], f"R{balance:,.2f}")
+        month_box, month_title, month_value = self.cards["month"]
+        if snap.month_income or snap.month_expense:
+            self._set_text(month_title, f"Spent in {snap.month} (actual)")
+            self._set_text(month_value, f"R{snap.month_expense:,.2f}")
+            month_box.grid()
         else:
-            tk.Label(self.rec_box, text="No recommendations at this time.").pack()
+            month_box.grid_remove()
+
+    def _update_table(self, incomes, filtered_expenses):
+        rows = {f"inc:{k}": ("Income", k, v) for k, v in incomes.items()}
+        rows.update({f"exp:{k}": ("Expense", k, v) for k, v in filtered_expenses.items()})
+
+        # Incremental: drop rows whose category disappeared, add or update the rest
+        for key in [k for k in self.table.keys() if k not in rows]:
+            self.table.delete(key)
+        for i, (key, values) in enumerate(rows.items()):
+            self.table.insert(key, values, index=i)
+
+    def _update_charts(self, filtered_expenses, total_income, total_expense, total_savings):
+        self._queue_chart("bar", charts.bar_data(total_income, total_expense, total_savings))
+        self._queue_chart("pie", charts.pie_data(filtered_expenses)
+                          if filtered_expenses and sum(filtered_expenses.values()) > 0 else None)
+        self._render_charts()
+
+    def _update_history(self, history):
+        saved_at, series = history
+        # Worth a chart once the budget has been changed at least once
+        self._queue_chart("history", charts.history_data(saved_at, series)
+                          if len(saved_at) > 1 and series else None)
+        self._render_charts()
+
+    def _queue_chart(self, kind, data):
+        self._pending_charts[kind] = data
+        self._chart_data[kind] = data
+
+    def _chart_size_now(self):
+        # As wide as the tab (less padding), in the default chart's 3:2 shape
+        width = self.visual_canvas.winfo_width() - 2 * CHART_PADX
+        if width < CHART_WIDTH_STEP:
+            return charts.CHART_SIZE          # not laid out yet
+        width = width // CHART_WIDTH_STEP * CHART_WIDTH_STEP / charts.CHART_DPI
+        return (width, width * charts.CHART_SIZE[1] / charts.CHART_SIZE[0])
+
+    def _on_visual_resize(self, event):
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+        self._resize_after = self.after(RESIZE_DELAY_MS, self._resize_charts)
+
+    def destroy(self):
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+            self._resize_after = None
+        super().destroy()
+
+    def _resize_charts(self):
+        self._resize_after = None
+        if self._chart_size is None or self._chart_size_now() == self._chart_size:
+            return
+        self._pending_charts = {**self._chart_data, **self._pending_charts}
+        self._render_charts()
 
-    def export_csv(self):
-        incomes = budget.get_income(self.user_id)
-        expenses = budget.get_expenses(self.user_id)
-        exp_ess, exp_life, exp_save, exp_other = budget.split_expenses(expenses)
-        
-        filtered_expenses = {}
-        if self.show_essentials.get():
-            filtered_expenses.update(exp_ess)
-        if self.show_lifestyle.get():
-            filtered_expenses.update(exp_life)
-        if self.show_savings.get():
-            filtered_expenses.update(exp_save)
-        filtered_expenses.update(exp_other)
+    def _render_charts(self):
+        if not self._pending_charts:
+            return
+        if self.notebook.select() != str(self.visual_tab_parent):
+            return
+        wanted, self._pending_charts = self._pending_charts, {}
+
+        # An older render still in flight must not overwrite what we show next;
+        # whatever it was drawing that we have no newer data for is redone here
+        if self._chart_task is not None:
+            self._chart_task.cancel()
+            self._chart_task = None
+            wanted = {**self._chart_wanted, **wanted}
+        for kind in [k for k, data in wanted.items() if data is None]:
+            del wanted[kind]
+            self.chart_frames[kind].pack_forget()
+        self._chart_wanted = wanted
+        size = self._chart_size_now()
+        cached = {kind: charts.cached_chart(kind, data, size) for kind, data in wanted.items()}
+        if all(cached.values()):
+            self._show_charts(cached, size)
+            return
+
+        def render():
+            # On a worker, so it is timed apart from the refresh.charts phase
+            with instrument.phase("refresh.charts.render"):
+                return {kind: charts.render_chart(kind, data, size) for kind, data in wanted.items()}
+        self._chart_task = self.tasks.submit(render, key="charts",
+                                             on_done=lambda paths: self._show_charts(paths, size),
+                                             on_error=self._load_failed)
+
+    def _show_charts(self, paths, size):
+        self._chart_task = None
+        self._chart_wanted = {}
+        self._chart_size = size
+        for kind, path in paths.items():
+            if self._chart_paths.get(kind) != path:
+                img = tk.PhotoImage(file=path)
+                self.chart_labels[kind].config(image=img)
+                self._chart_images[kind] = img
+                self._chart_paths[kind] = path
+        # Pie chart (stacked)
+        if "pie" in paths:
+            self.pie_frame.pack(fill="both", expand=True, padx=CHART_PADX, pady=6, before=self.bar_frame)
+        if "history" in paths:
+            self.history_frame.pack(fill="both", expand=True, padx=CHART_PADX, pady=6, after=self.bar_frame)
+
+    def _update_recommendations(self, recs):
+        texts = ["• " + r for r in recs] if recs else ["No recommendations at this time."]
+        while len(self.rec_labels) < len(texts):
+            lbl = tk.Label(self.rec_box, anchor="w", justify="left")
+            lbl.pack(fill="x")
+            self.rec_labels.append(lbl)
+        while len(self.rec_labels) > len(texts):
+            self.rec_labels.pop().destroy()
+        for lbl, text in zip(self.rec_labels, texts):
+            self._set_text(lbl, text)
+
+    # ---------- Export ----------
+    # The file dialog runs here on the Tk thread; the data load and file writing
+    # run on a worker so a slow disk or a large report doesn't freeze the window.
 
+    def export_csv(self):
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
             filetypes=[("CSV files", "*.csv")],
@@ -208,36 +342,9 @@ class WelcomeWindow(tk.Frame):
         )
         if not file_path:
             return
-
-        try:
-            with open(file_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Category", "Amount"])
-                writer.writerow(["— Income —", ""])
-                for k, v in incomes.items():
-                    writer.writerow([k, v])
-                writer.writerow(["", ""])
-                writer.writerow(["— Expenses (Filtered) —", ""])
-                for k, v in filtered_expenses.items():
-                    writer.writerow([k, v])
-            messagebox.showinfo("Exported", f"Budget successfully exported to:\n{file_path}")
-        except Exception as e:
-            messagebox.showerror("Export Failed", f"Could not export CSV.\n{e}")
+        self._run_export(self._write_csv, file_path, "CSV")
 
     def export_pdf(self):
-        incomes = budget.get_income(self.user_id)
-        expenses = budget.get_expenses(self.user_id)
-        exp_ess, exp_life, exp_save, exp_other = budget.split_expenses(expenses)
-        
-        filtered_expenses = {}
-        if self.show_essentials.get():
-            filtered_expenses.update(exp_ess)
-        if self.show_lifestyle.get():
-            filtered_expenses.update(exp_life)
-        if self.show_savings.get():
-            filtered_expenses.update(exp_save)
-        filtered_expenses.update(exp_other)
-
         file_path = filedialog.asksaveasfilename(
             defaultextension=".pdf",
             filetypes=[("PDF files", "*.pdf")],
@@ -245,60 +352,81 @@ class WelcomeWindow(tk.Frame):
         )
         if not file_path:
             return
+        self._run_export(self._write_pdf, file_path, "PDF")
 
-        try:
-            with PdfPages(file_path) as pdf:
-                # Page 1: Table & Recommendations
-                fig1 = Figure(figsize=(8, 10))
-                ax1 = fig1.add_subplot(111)
-                ax1.axis("off")
-                text = "BUDGET REPORT\n\n— Income —\n"
-                for k, v in incomes.items():
-                    text += f"{k}: R{v:,.2f}\n"
-                text += "\n— Expenses (Filtered) —\n"
-                for k, v in filtered_expenses.items():
-                    text += f"{k}: R{v:,.2f}\n"
-                text += "\nRecommendations:\n"
-                recs = budget.recommendations(self.user_id)
-                if recs:
-                    for r in recs:
-                        text += f"• {r}\n"
-                else:
-                    text += "No recommendations at this time.\n"
-                ax1.text(0, 1, text, fontsize=12, va="top", ha="left")
-                pdf.savefig(fig1)
-
-                # Page 2: Pie chart
-                if filtered_expenses:
-                    # Updated figsize for PDF chart
-                    fig2 = Figure(figsize=(9, 6))
-                    ax2 = fig2.add_subplot(111)
-                    labels = list(filtered_expenses.keys())
-                    amounts = list(filtered_expenses.values())
-                    ax2.pie(amounts, labels=labels, autopct="%1.1f%%", startangle=90,
-                            labeldistance=1.1, pctdistance=0.85)
-                    ax2.set_title("Expense Distribution")
-                    pdf.savefig(fig2)
-
-                # Page 3: Bar chart
-                # Updated figsize for PDF chart
-                fig3 = Figure(figsize=(9, 6))
-                ax3 = fig3.add_subplot(111)
-                total_income = sum(incomes.values())
-                total_expense = sum(filtered_expenses.values())
-                total_savings = expenses.get(budget.SAVINGS_CAT, 0.0)
-                ax3.bar(["Income", "Expenses", "Savings"], [total_income, total_expense, total_savings], color=['green', 'red', 'blue'])
-                ax3.set_title("Income vs Expenses vs Savings")
-                ax3.set_ylabel("Amount")
-                pdf.savefig(fig3)
-
+    def _run_export(self, writer, file_path, kind):
+        def done(_):
+            self._set_text(self.status_lbl, "")
             messagebox.showinfo("Exported", f"Budget successfully exported to:\n{file_path}")
 
-        except Exception as e:
-            messagebox.showerror("Export Failed", f"Could not export PDF.\n{e}")
+        def failed(e):
+            self._set_text(self.status_lbl, "")
+            messagebox.showerror("Export Failed", f"Could not export {kind}.\n{e}")
+
+        def progress(step, total):
+            self._set_text(self.status_lbl, f"Exporting {kind}… {step}/{total}")
+
+        self._set_text(self.status_lbl, f"Exporting {kind}…")
+        self.tasks.submit(writer, file_path, self.user_id, self._filter_flags(),
+                          with_task=True, on_done=done, on_error=failed, on_progress=progress)
+
+    @staticmethod
+    def _write_csv(task, file_path, user_id, flags):
+        view = budget.budget_view(user_id, *flags)
+        with open(file_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Category", "Amount"])
+            writer.writerow(["— Income —", ""])
+            for k, v in view.incomes.items():
+                writer.writerow([k, v])
+            writer.writerow(["", ""])
+            writer.writerow(["— Expenses (Filtered) —", ""])
+            for k, v in view.filtered_expenses.items():
+                writer.writerow([k, v])
+
+    @staticmethod
+    def _write_pdf(task, file_path, user_id, flags):
+        from backend import reports
+        reports.write_report(file_path, budget.budget_view(user_id, *flags), progress=task.progress)
+
+    # ---------- Import ----------
+    def import_statement(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Bank statements", "*.csv *.ofx *.qfx *.qif *.gz"), ("All files", "*.*")],
+            title="Import Bank Statement"
+        )
+        if not file_path:
+            return
+
+        def done(result):
+            self._set_text(self.status_lbl, "")
+            messagebox.showinfo(
+                "Imported",
+                f"Imported {result['imported']:,} transactions "
+                f"({result['duplicates']:,} already present, {result['rejected']:,} unreadable) "
+                f"in {result['seconds']:.1f}s, {result['rows_per_sec']:,.0f} rows/s.")
+            self.refresh()
+
+        def failed(e):
+            self._set_text(self.status_lbl, "")
+            messagebox.showerror("Import Failed", f"Could not import the statement.\n{e}")
+
+        def progress(rows, done, total):
+            self._set_text(self.status_lbl, f"Importing… {rows:,} rows ({done / total if total else 1:.0%})")
+
+        self._set_text(self.status_lbl, "Importing…")
+        self.tasks.submit(self._import_file, file_path, self.user_id,
+                          with_task=True, on_done=done, on_error=failed, on_progress=progress)
+
+    @staticmethod
+    def _import_file(task, file_path, user_id):
+        from backend import importer
+        return importer.import_statement(user_id, file_path, progress=task.progress)
 
     def open_wizard(self):
         from gui.setup_wizard import SetupWizard
+        # Pending loads would otherwise land on destroyed widgets
+        self.tasks.cancel_all()
         for w in self.master.winfo_children():
             w.destroy()
         SetupWizard(self.master, self.username, self.user_id)
\ No newline at end of file
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Tests run from Smart_Budgets/ or the repo root; the app imports `backend` and `gui` as top-level packages
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import cache, database, user
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh, migrated database file for the test; the real one is never touched."""
+    saved = database.DB_NAME
+    database.DB_NAME = str(tmp_path / "test.db")
+    database.close_all()
+    cache.clear()
+    yield database.DB_NAME
+    database.close_all()
+    cache.clear()
+    database.DB_NAME = saved
+
+
+@pytest.fixture
+def uid(db):
+    return user.create_user("alice", "secret")
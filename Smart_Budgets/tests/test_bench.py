@@ -0,0 +1,30 @@
+from backend import bench, budget, versions
+
+
+def test_run_times_warm_cache_and_real_saves(db):
+    bench.generate(30)
+    accounts = bench.bench_users()
+    assert len(accounts) == 30
+    before = {uid: len(versions.list_versions(uid)) for _, uid in accounts}
+
+    out = bench.run(iterations=40, gui=False)
+    results = out["results"]
+    for case in ("get_income", "calculate_totals", "recommendations", "budget_view"):
+        assert results[case + ".warm"]["hit_rate"] == 1.0
+    # Every timed save (plus _time's untimed first call) wrote a new version
+    added = sum(len(versions.list_versions(uid)) - n for uid, n in before.items())
+    assert added == results["save_budget"]["n"] + 1
+
+
+def test_generate_is_idempotent_and_reproducible(db):
+    bench.generate(5, seed=3)
+    first = {name: budget.get_expenses(uid) for name, uid in bench.bench_users()}
+    bench.generate(5, seed=3)
+    assert len(bench.bench_users()) == 5
+    assert {name: budget.get_expenses(uid) for name, uid in bench.bench_users()} == first
+
+
+def test_compare_flags_only_slower_cases():
+    baseline = {"results": {"a": {"median_ms": 1.0}, "b": {"median_ms": 1.0}}}
+    current = {"results": {"a": {"median_ms": 1.5}, "b": {"median_ms": 1.1}, "c": {"median_ms": 9.0}}}
+    assert [case for case, *_ in bench.compare(current, baseline)] == ["a"]
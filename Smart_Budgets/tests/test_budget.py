@@ -0,0 +1,138 @@
+import dataclasses
+
+import pytest
+
+from backend import budget, cache
+
+PROFILE = {"dependents": 2, "savings_percent": 15}
+
+
+def _save(uid, incomes=None, expenses=None, profile=PROFILE):
+    budget.save_budget(uid, incomes or {"Salary": 18000.0, "Side Hustle": 2000.0},
+                       expenses or {"Groceries": 3000.0, "Rent/Mortgage": 7000.0}, profile)
+
+
+def test_snapshot_holds_the_whole_budget(uid):
+    _save(uid)
+    snap = budget.load_snapshot(uid)
+    assert dict(snap.income) == {"Salary": 18000.0, "Side Hustle": 2000.0}
+    assert dict(snap.expenses) == {"Groceries": 3000.0, "Rent/Mortgage": 7000.0}
+    assert dict(snap.profile) == PROFILE
+    assert (snap.total_income, snap.total_expense, snap.balance) == (20000.0, 10000.0, 10000.0)
+    assert budget.calculate_totals(uid) == budget.calculate_totals(snap) == (20000.0, 10000.0, 10000.0)
+
+
+def test_snapshot_is_read_only(uid):
+    _save(uid)
+    snap = budget.load_snapshot(uid)
+    with pytest.raises(TypeError):
+        snap.income["Salary"] = 1.0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snap.balance = 0.0
+    # The getters hand out copies
+    budget.get_income(uid)["Salary"] = 1.0
+    assert budget.get_income(uid)["Salary"] == 18000.0
+
+
+def test_new_user_has_empty_budget(uid):
+    assert not budget.user_has_setup(uid)
+    assert budget.get_profile(uid) == {"dependents": 0, "savings_percent": 0.0}
+    assert budget.calculate_totals(uid) == (0, 0, 0)
+
+
+
+def test_save_replaces_the_stored_budget(uid):
+    _save(uid)
+    _save(uid, {"Salary": 19000.0}, {"Groceries": 3200.0, "Dining Out": 500.0},
+          {"dependents": 1, "savings_percent": 5})
+    assert budget.get_income(uid) == {"Salary": 19000.0}
+    assert budget.get_expenses(uid) == {"Groceries": 3200.0, "Dining Out": 500.0}
+    assert budget.get_profile(uid) == {"dependents": 1, "savings_percent": 5.0}
+
+
+def test_partial_writers_leave_the_rest_alone(uid):
+    _save(uid)
+    budget.replace_income(uid, {"Salary": 21000.0})
+    budget.upsert_profile(uid, dependents=3, savings_percent=20)
+    assert budget.get_income(uid) == {"Salary": 21000.0}
+    assert budget.get_expenses(uid) == {"Groceries": 3000.0, "Rent/Mortgage": 7000.0}
+    budget.replace_expenses(uid, {})
+    assert budget.get_expenses(uid) == {}
+    assert budget.get_profile(uid) == {"dependents": 3, "savings_percent": 20.0}
+
+
+def test_failed_save_changes_nothing(uid, monkeypatch):
+    _save(uid)
+    before = budget.load_snapshot(uid)
+
+    def fail(*args):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(budget.versions, "record", fail)
+    with pytest.raises(RuntimeError):
+        _save(uid, {"Salary": 1.0}, {"Groceries": 1.0})
+    monkeypatch.undo()
+    assert budget.load_snapshot(uid) is before
+    # Rolled back in the database too, not just hidden by the cache
+    cache.clear()
+    assert budget.get_income(uid) == dict(before.income)
+    assert budget.get_expenses(uid) == dict(before.expenses)
+
+
+def test_save_budgets_in_batches(db):
+    from backend import user
+    ids = [user.create_user(f"u{i}", "pw") for i in range(7)]
+    count = budget.save_budgets(((uid, {"Salary": 1000.0 * uid}, {"Groceries": 10.0 * uid}, PROFILE)
+                                 for uid in ids), batch_size=3)
+    assert count == 7
+    for uid in ids:
+        assert budget.calculate_totals(uid) == (1000.0 * uid, 10.0 * uid, 990.0 * uid)
+
+
+def test_budget_view_totals_follow_the_filters(uid):
+    _save(uid, expenses={"Groceries": 3000.0, "Dining Out": 800.0, budget.SAVINGS_CAT: 2000.0,
+                         "Gym": 400.0})
+    view = budget.budget_view(uid)
+    assert (view.total_income, view.total_expense, view.total_savings) == (20000.0, 6200.0, 2000.0)
+    assert view.balance == 13800.0
+    assert dict(view.groups["other"]) == {"Gym": 400.0}
+    # Categories outside the three groups are always shown
+    only_lifestyle = budget.budget_view(uid, False, True, False)
+    assert dict(only_lifestyle.filtered_expenses) == {"Dining Out": 800.0, "Gym": 400.0}
+    assert only_lifestyle.recommendations == view.recommendations
+
+
+def test_budget_view_is_memoized_and_read_only(uid):
+    _save(uid)
+    view = budget.budget_view(uid, True, False, True)
+    # Truthy flags of any type share one entry
+    assert budget.budget_view(uid, 1, 0, "yes") is view
+    assert isinstance(view.recommendations, tuple)
+    with pytest.raises(TypeError):
+        view.filtered_expenses["Groceries"] = 0.0
+    with pytest.raises(TypeError):
+        view.groups["essentials"]["Groceries"] = 0.0
+
+
+def test_budget_view_for_a_snapshot_is_not_cached(uid):
+    _save(uid)
+    snap = budget.load_snapshot(uid)
+    size = cache.views.stats()["size"]
+    view = budget.budget_view(snap)
+    assert view.snap is snap
+    assert cache.views.stats()["size"] == size
+    assert view == budget.budget_view(uid)
+
+
+def test_budget_view_reruns_no_queries_when_memoized(uid):
+    from backend import instrument
+    _save(uid)
+    budget.budget_view(uid)
+    instrument.enable()
+    try:
+        before = instrument.query_count()
+        budget.budget_view(uid)
+        assert instrument.query_count() == before
+    finally:
+        instrument.disable()
+        instrument.reset()
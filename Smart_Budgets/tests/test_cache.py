@@ -0,0 +1,89 @@
+import threading
+
+from backend import budget, cache
+
+
+def test_lru_evicts_least_recently_used_and_counts():
+    lru = cache.LRUCache(maxsize=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1          # "b" is now the oldest
+    lru.put("c", 3)
+    assert lru.get("b") is None
+    assert (lru.get("a"), lru.get("c")) == (1, 3)
+    stats = lru.stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (2, 3, 1)
+    assert stats["hit_rate"] == 0.75
+    lru.discard("a")
+    lru.reset_stats()
+    assert lru.get("a", "gone") == "gone"
+    assert lru.stats()["misses"] == 1
+
+
+def test_data_version_changes_on_invalidate_and_clear():
+    v0 = cache.data_version(7)
+    cache.invalidate(7)
+    v1 = cache.data_version(7)
+    cache.clear()
+    assert len({v0, v1, cache.data_version(7)}) == 3
+
+
+def test_put_if_current_refuses_stale_values():
+    lru = cache.LRUCache()
+    version = cache.data_version(9)
+    cache.invalidate(9)
+    assert not cache.put_if_current(lru, 9, "stale", 9, version)
+    assert lru.get(9) is None
+    assert cache.put_if_current(lru, 9, "fresh", 9, cache.data_version(9))
+    assert lru.get(9) == "fresh"
+
+
+def test_put_if_current_is_atomic_with_invalidate():
+    # Whatever the interleaving, a snapshot read before an invalidate never stays cached
+    for _ in range(200):
+        version = cache.data_version(5)
+        writer = threading.Thread(target=cache.invalidate, args=(5,))
+        writer.start()
+        cache.put_if_current(cache.snapshots, 5, "read before the write", 5, version)
+        writer.join()
+        assert cache.snapshots.get(5) is None
+
+
+def _save(uid, groceries):
+    budget.save_budget(uid, {"Salary": 10000.0}, {"Groceries": groceries},
+                       {"dependents": 1, "savings_percent": 10})
+
+
+def test_snapshot_is_cached_until_saved(uid):
+    _save(uid, 2000.0)
+    snap = budget.load_snapshot(uid)
+    assert budget.load_snapshot(uid) is snap
+    _save(uid, 2500.0)
+    fresh = budget.load_snapshot(uid)
+    assert fresh is not snap
+    assert fresh.expenses["Groceries"] == 2500.0
+
+
+def test_snapshot_read_during_a_write_is_not_kept(uid, monkeypatch):
+    _save(uid, 2000.0)
+    cache.clear()
+    read_snapshot = budget._read_snapshot
+
+    def racing_read(user_id, month):
+        snap = read_snapshot(user_id, month)
+        cache.invalidate(user_id)       # a save commits while we were reading
+        return snap
+
+    monkeypatch.setattr(budget, "_read_snapshot", racing_read)
+    budget.load_snapshot(uid)
+    assert cache.snapshots.get(uid) is None
+
+
+def test_budget_view_is_shared_until_data_changes(uid):
+    _save(uid, 2000.0)
+    view = budget.budget_view(uid)
+    assert budget.budget_view(uid) is view
+    assert budget.budget_view(uid, show_essentials=False) is not view
+    assert "Groceries" not in budget.budget_view(uid, show_essentials=False).filtered_expenses
+    _save(uid, 2100.0)
+    assert budget.budget_view(uid).filtered_expenses["Groceries"] == 2100.0
@@ -0,0 +1,35 @@
+from backend import budget, categories, database
+
+
+def test_groups_come_from_the_seeded_table(db):
+    seeded = {}
+    for _, name, group in database._SEED_CATEGORIES:
+        seeded.setdefault(group, []).append(name)
+    for group in categories.GROUPS:
+        assert categories.in_group(group) == seeded.get(group, [])
+    assert categories.group_of_name(budget.SAVINGS_CAT) == "savings"
+
+
+def test_new_categories_join_their_group(db):
+    ids = categories.ensure(["Pet Care"], group="essentials")
+    assert categories.in_group("essentials")[-1] == "Pet Care"
+    assert categories.name_of(ids["Pet Care"]) == "Pet Care"
+    assert categories.group_of(ids["Pet Care"]) == "essentials"
+    # Unknown names fall into "other" until stored
+    assert categories.id_of("Yacht") is None
+    assert categories.group_of_name("Yacht") == "other"
+
+
+def test_split_expenses_uses_the_stored_groups(db):
+    essentials, lifestyle, savings, other = budget.split_expenses(
+        {"Groceries": 1.0, "Dining Out": 2.0, budget.SAVINGS_CAT: 3.0, "Yacht": 4.0})
+    assert (essentials, lifestyle, savings, other) == (
+        {"Groceries": 1.0}, {"Dining Out": 2.0}, {budget.SAVINGS_CAT: 3.0}, {"Yacht": 4.0})
+
+
+def test_expenses_round_trip_through_category_ids(uid):
+    budget.save_budget(uid, {"Salary": 9000.0}, {"Groceries": 800.0, "Pet Care": 150.0},
+                       {"dependents": 0, "savings_percent": 0})
+    assert budget.get_expenses(uid) == {"Groceries": 800.0, "Pet Care": 150.0}
+    assert budget.group_totals(uid)["essentials"] == 800.0
+    assert budget.group_totals(uid)["other"] == 150.0
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("matplotlib")
+from matplotlib.figure import Figure
+
+from backend import charts
+
+
+def _pie():
+    return charts.PieChart(Figure().add_subplot(111))
+
+
+def test_pie_moves_wedges_like_a_fresh_pie():
+    labels = ["Groceries", "Rent/Mortgage", "Dining Out"]
+    moved = _pie()
+    moved.update(labels, [1, 1, 1])
+    wedges = list(moved.wedges)
+    moved.update(labels, [300.0, 6000.0, 700.0])
+    assert moved.wedges == wedges                  # same artists, re-pointed
+
+    fresh = _pie()
+    fresh.update(labels, [300.0, 6000.0, 700.0])
+    for a, b in zip(moved.wedges, fresh.wedges):
+        assert (a.theta1, a.theta2) == pytest.approx((b.theta1, b.theta2))
+    for a, b in zip(moved.texts + moved.autotexts, fresh.texts + fresh.autotexts):
+        assert a.get_position() == pytest.approx(b.get_position())
+        assert a.get_text() == b.get_text()
+    assert [t.get_horizontalalignment() for t in moved.texts] == \
+           [t.get_horizontalalignment() for t in fresh.texts]
+
+
+def test_pie_rebuilds_when_categories_change():
+    pie = _pie()
+    pie.update(["A", "B"], [1, 2])
+    old = list(pie.wedges)
+    pie.update(["A", "B", "C"], [1, 2, 3])
+    assert len(pie.wedges) == 3 and pie.wedges[0] is not old[0]
+
+
+def test_bar_chart_updates_heights_and_scale():
+    bar = charts.BarChart(Figure().add_subplot(111))
+    bar.update([20000, 15000, 2000])
+    assert [b.get_height() for b in bar.bars] == [20000, 15000, 2000]
+    assert bar.ax.get_ylim()[1] >= 20000
+
+
+def test_history_chart_plots_one_step_line_per_category():
+    ax = Figure().add_subplot(111)
+    chart = charts.HistoryChart(ax)
+    saved_at = ["2024-01-01T10:00:00", "2024-02-01T10:00:00", "2024-03-01T10:00:00"]
+    chart.update(*charts.history_data(saved_at, {"Groceries": (1.0, 2.0, 3.0), "Gym": (0.0, 1.0, 1.0)}))
+    assert [line.get_label() for line in ax.get_lines()] == ["Groceries", "Gym"]
+    assert [t.get_text() for t in ax.get_xticklabels()] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+
+
+def test_history_data_keeps_the_latest_versions():
+    saved_at = [f"2024-01-{d:02d}" for d in range(1, 11)]
+    kept, series = charts.history_data(saved_at, {"Gym": tuple(range(10))}, max_versions=4)
+    assert kept == saved_at[-4:]
+    assert series == [["Gym", [6.0, 7.0, 8.0, 9.0]]]
@@ -0,0 +1,72 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend import budget, categories, columnar, user
+
+PROFILE = {"dependents": 0, "savings_percent": 0}
+
+
+@pytest.fixture
+def three_users(db):
+    ids = [user.create_user(name, "pw") for name in ("a", "b", "c")]
+    budget.save_budgets([
+        (ids[0], {"Salary": 10000.10}, {"Groceries": 1200.25, "Dining Out": 300.0}, PROFILE),
+        (ids[1], {"Salary": 5000.0, "Dividends": 250.5}, {}, PROFILE),
+        (ids[2], {"Salary": 8000.0}, {"Rent/Mortgage": 4000.0, budget.SAVINGS_CAT: 800.0,
+                                      "Gym": 450.0}, PROFILE),
+    ])
+    return ids
+
+
+def test_load_expenses_groups_rows_by_user(three_users):
+    a, b, c = three_users
+    cols = columnar.load_expenses(chunk_size=2)        # several fetchmany chunks
+    assert len(cols) == 5
+    assert cols.users.tolist() == [a, c]
+    assert cols.user(a).as_dict() == budget.get_expenses(a)
+    assert cols.user(c).as_dict() == budget.get_expenses(c)
+    assert len(cols.user(b)) == 0
+    assert cols.totals().tolist() == [150025, 525000]
+    assert [ub.user_id for ub in cols] == [a, c]
+    assert cols.user(a).total == 1500.25
+
+
+def test_user_views_share_memory(three_users):
+    cols = columnar.load_expenses()
+    view = cols.user(three_users[2])
+    assert np.shares_memory(view.cents, cols.cents)
+    assert cols.nbytes > 0
+
+
+def test_group_totals_match_split_expenses(three_users):
+    a, _, c = three_users
+    cols = columnar.load_expenses([a, c])
+    matrix = cols.group_totals()
+    for row, uid in zip(matrix, cols.users.tolist()):
+        split = budget.split_expenses(budget.get_expenses(uid))
+        assert row.tolist() == [round(sum(g.values()) * 100) for g in split]
+    assert dict(zip(categories.GROUPS, matrix[1].tolist()))["other"] == 45000
+
+
+def test_load_income_totals(three_users):
+    a, b, c = three_users
+    uids, cents = columnar.load_income_totals([b, a])
+    assert uids.tolist() == [a, b]
+    assert cents.tolist() == [1000010, 525050]
+
+
+def test_empty_columns(db):
+    cols = columnar.load_expenses()
+    assert len(cols) == 0 and len(cols.totals()) == 0
+    assert cols.group_totals().shape == (0, len(categories.GROUPS))
+
+
+def test_unknown_category_ids_count_as_other(db):
+    rent = categories.id_of("Rent/Mortgage")
+    boat = categories.ensure(["Boat"], group="lifestyle")["Boat"]     # the highest known id
+    cols = columnar.BudgetColumns(np.array([1, 1, 1, 1], dtype=np.int64),
+                                  np.array([rent, boat, boat + 5, -1], dtype=np.intc),
+                                  np.array([100, 4000, 20, 3], dtype=np.int64))
+    totals = dict(zip(categories.GROUPS, cols.group_totals()[0].tolist()))
+    assert totals == {"essentials": 100, "lifestyle": 4000, "savings": 0, "other": 23}
@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+
+import pytest
+
+from backend import database
+from backend.database import read, transaction
+
+
+def test_new_database_is_migrated(db):
+    conn = database.get_connection()
+    assert database.schema_version(conn) == database.SCHEMA_VERSION
+    with read() as cur:
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        tables = {row[0] for row in cur.fetchall()}
+    assert {"users", "income", "expenses", "profile", "transactions", "categories",
+            "budget_versions", "budget_changes"} <= tables
+
+
+def test_connection_is_pooled_per_thread(db):
+    conn = database.get_connection()
+    assert database.get_connection() is conn
+    other = []
+    t = threading.Thread(target=lambda: other.append(database.get_connection()))
+    t.start()
+    t.join()
+    assert other[0] is not conn
+
+
+def test_nested_blocks_share_one_transaction(db):
+    with pytest.raises(RuntimeError):
+        with transaction() as cur:
+            cur.execute("INSERT INTO users (username, password) VALUES ('a', 'b')")
+            with transaction() as inner:
+                inner.execute("INSERT INTO users (username, password) VALUES ('c', 'd')")
+            raise RuntimeError("roll back both")
+    with read() as cur:
+        cur.execute("SELECT COUNT(*) FROM users")
+        assert cur.fetchone()[0] == 0
+
+
+def test_close_all_leaves_other_threads_queries_alone(db):
+    with transaction() as cur:
+        cur.executemany("INSERT INTO users (username, password) VALUES (?, 'x')",
+                        [(f"u{i}",) for i in range(100)])
+    in_block, closed = threading.Event(), threading.Event()
+    seen = {}
+
+    def reader():
+        with read() as cur:
+            seen["old"] = database.get_connection()
+            cur.execute("SELECT username FROM users ORDER BY id")
+            first = cur.fetchmany(10)
+            in_block.set()
+            closed.wait(5)
+            # Still usable: close_all() on another thread must not have closed it
+            seen["rows"] = len(first) + len(cur.fetchall())
+        seen["new"] = database.get_connection()
+
+    t = threading.Thread(target=reader)
+    t.start()
+    assert in_block.wait(5)
+    mine = database.get_connection()
+    database.close_all()
+    closed.set()
+    t.join()
+
+    assert seen["rows"] == 100
+    assert seen["new"] is not seen["old"]
+    # The retired connection was closed by its own thread once its block ended
+    with pytest.raises(sqlite3.ProgrammingError):
+        seen["old"].execute("SELECT 1")
+    with pytest.raises(sqlite3.ProgrammingError):
+        mine.execute("SELECT 1")
+    assert database.get_connection() is not mine
+
+
+def test_configure_applies_settings_and_rejects_unknown(db, monkeypatch):
+    monkeypatch.setitem(database.SETTINGS, "cache_size", database.SETTINGS["cache_size"])
+    database.configure(cache_size=-2000)
+    assert database.get_connection().execute("PRAGMA cache_size").fetchone()[0] == -2000
+    with pytest.raises(ValueError):
+        database.configure(page_size=4096)
+
+
+@pytest.fixture
+def legacy_db(db):
+    """A database as the app created it before migrations existed (no user_version)."""
+    conn = sqlite3.connect(db)
+    database._m001_base_schema(conn.cursor())
+    conn.execute("INSERT INTO users (username, password) VALUES ('old', 'pw')")
+    conn.executemany("INSERT INTO income (user_id, stream_name, amount) VALUES (1, ?, ?)",
+                     [("Salary", 12000.0), ("Dividends", 300.0)])
+    conn.executemany("INSERT INTO expenses (user_id, category, amount) VALUES (1, ?, ?)",
+                     [("Groceries", 2500.0), ("Gym", 400.0)])
+    conn.execute("INSERT INTO profile (user_id, dependents, savings_percent) VALUES (1, 2, 10)")
+    conn.commit()
+    conn.close()
+    return db
+
+
+def test_legacy_database_is_upgraded_in_place(legacy_db):
+    from backend import budget, categories, versions
+    assert database.schema_version(database.get_connection()) == database.SCHEMA_VERSION
+    assert budget.get_income(1) == {"Salary": 12000.0, "Dividends": 300.0}
+    assert budget.get_expenses(1) == {"Groceries": 2500.0, "Gym": 400.0}
+    assert categories.group_of_name("Gym") == "other"
+    # The existing budget is version 1 of its history
+    assert [v for v, _ in versions.list_versions(1)] == [1]
+    assert versions.state_at(1, 1)["profile"] == {"dependents": 2, "savings_percent": 10.0}
+
+
+def test_per_user_lookups_use_covering_indexes(db):
+    with read() as cur:
+        for sql in ("SELECT stream_name, amount FROM income WHERE user_id=?",
+                    "SELECT category_id, amount FROM expenses WHERE user_id=?"):
+            cur.execute("EXPLAIN QUERY PLAN " + sql, (1,))
+            assert "COVERING INDEX" in " ".join(row[-1] for row in cur.fetchall())
+
+
+def test_newer_schema_is_refused(db):
+    conn = sqlite3.connect(db)
+    conn.execute(f"PRAGMA user_version={database.SCHEMA_VERSION + 1}")
+    conn.close()
+    with pytest.raises(RuntimeError):
+        database.migrate(sqlite3.connect(db, isolation_level=None))
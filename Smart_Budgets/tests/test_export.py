@@ -0,0 +1,50 @@
+import csv
+import gzip
+import io
+
+from backend import budget, export, ledger, user
+
+PROFILE = {"dependents": 0, "savings_percent": 0}
+
+
+def _two_users():
+    a, b = user.create_user("ann", "pw"), user.create_user("ben", "pw")
+    budget.save_budget(a, {"Salary": 9000.0}, {"Groceries": 1000.0, "Dining Out": 250.0}, PROFILE)
+    budget.save_budget(b, {"Salary": 7000.0}, {"Rent/Mortgage": 3000.0}, PROFILE)
+    return a, b
+
+
+def test_one_user_in_display_order(db):
+    a, _ = _two_users()
+    out = io.StringIO()
+    assert export.export_csv(out, user_id=a) == 3
+    assert list(csv.reader(io.StringIO(out.getvalue()))) == [
+        export.ALLOCATION_HEADER,
+        [str(a), "ann", "income", "Salary", "9000.0"],
+        [str(a), "ann", "expense", "Groceries", "1000.0"],
+        [str(a), "ann", "expense", "Dining Out", "250.0"],
+    ]
+
+
+def test_all_users_gzip_in_small_chunks(db, tmp_path):
+    _two_users()
+    path = tmp_path / "all.csv.gz"
+    assert export.export_csv(str(path), chunk_size=1) == 5
+    with gzip.open(path, "rt", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == export.ALLOCATION_HEADER
+    assert sorted(r[1] for r in rows[1:]) == ["ann", "ann", "ann", "ben", "ben"]
+
+
+def test_ledger_export_from_the_command_line(db, tmp_path, capsys):
+    a, _ = _two_users()
+    ledger.add_transaction(a, "2024-05-02", "expense", "Groceries", 80.0, "spar")
+    ledger.add_transaction(a, "2024-05-01", "income", "Salary", 9000.0)
+    path = tmp_path / "ledger.csv"
+    export.main(["--user", str(a), "--ledger", "-o", str(path), "--db", db])
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows == [export.LEDGER_HEADER,
+                    [str(a), "ann", "2024-05-01", "income", "Salary", "9000.0", ""],
+                    [str(a), "ann", "2024-05-02", "expense", "Groceries", "80.0", "spar"]]
+    assert "Exported 2 rows" in capsys.readouterr().err
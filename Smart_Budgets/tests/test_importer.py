@@ -0,0 +1,76 @@
+import pytest
+
+from backend import importer, ledger
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("12.50", 12.5),
+    ("-7", -7.0),
+    ("1,234.56", 1234.56),
+    ("-1,234.56", -1234.56),
+    ("1.234,56", 1234.56),
+    ("(1.234,00)", -1234.0),
+    ("(45.00)", -45.0),
+    ("45.00-", -45.0),
+    ("R 1 234,56", 1234.56),
+    ("1,5", 1.5),
+    ("1,234,567", 1234567.0),
+    ("1.234.567,89", 1234567.89),
+])
+def test_parse_amount(text, expected):
+    assert importer.parse_amount(text) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("text", ["1,234", "1.234", "", "abc", "1,23,4.00", "1.234.56", "12-34"])
+def test_parse_amount_rejects_unreadable_and_ambiguous(text):
+    with pytest.raises(ValueError):
+        importer.parse_amount(text)
+
+
+def _write(path, lines):
+    path.write_text("Date,Description,Amount\n" + "".join(line + "\n" for line in lines))
+    return path
+
+
+def test_import_categorizes_and_rejects(uid, tmp_path):
+    csv_path = _write(tmp_path / "s.csv", [
+        "2024-01-02,PAYROLL ACME,15000.00",
+        "2024-01-03,CHECKERS HYPER,-850.40",
+        "2024-01-04,???,\"1,234\"",      # ambiguous amount
+        "not a date,SPAR,-10.00",
+    ])
+    result = importer.import_statement(uid, csv_path)
+    assert (result["read"], result["imported"], result["rejected"]) == (4, 2, 2)
+    rows = [(on, kind, cat, amount) for _, on, kind, cat, amount, _ in ledger.get_transactions(uid)]
+    assert rows == [("2024-01-02", "income", "Salary", 15000.0),
+                    ("2024-01-03", "expense", "Groceries", 850.4)]
+
+
+def test_reimport_skips_existing_lines(uid, tmp_path):
+    lines = ["2024-01-03,COFFEE,-30.00", "2024-01-03,COFFEE,-30.00", "2024-01-04,SPAR,-12.00"]
+    first = importer.import_statement(uid, _write(tmp_path / "a.csv", lines))
+    assert first["imported"] == 3
+    # An overlapping statement: the same three lines plus a third coffee
+    again = importer.import_statement(uid, _write(tmp_path / "b.csv", lines + ["2024-01-03,COFFEE,-30.00"]))
+    assert (again["imported"], again["duplicates"]) == (1, 3)
+    assert len(ledger.get_transactions(uid)) == 4
+
+
+def test_identical_lines_in_unsorted_file_are_all_kept(uid, tmp_path):
+    # The second coffee comes after a different day's line
+    lines = ["2024-01-03,COFFEE,-30.00", "2024-01-04,SPAR,-12.00", "2024-01-03,COFFEE,-30.00"]
+    result = importer.import_statement(uid, _write(tmp_path / "a.csv", lines), batch_size=2)
+    assert (result["imported"], result["duplicates"]) == (3, 0)
+    # The same statement sorted by date hashes to the same lines
+    sorted_lines = [lines[0], lines[2], lines[1]]
+    again = importer.import_statement(uid, _write(tmp_path / "b.csv", sorted_lines))
+    assert (again["imported"], again["duplicates"]) == (0, 3)
+
+
+def test_ofx_uses_bank_ids(uid, tmp_path):
+    body = "".join(f"<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105<TRNAMT>-99.00"
+                   f"<FITID>{fitid}<NAME>NETFLIX</STMTTRN>" for fitid in ("A1", "A2"))
+    path = tmp_path / "s.ofx"
+    path.write_text(f"OFXHEADER:100\n<OFX><BANKTRANLIST>{body}</BANKTRANLIST></OFX>")
+    assert importer.import_statement(uid, path)["imported"] == 2
+    assert importer.import_statement(uid, path)["imported"] == 0
@@ -0,0 +1,36 @@
+import pytest
+
+from backend import instrument, user
+
+
+@pytest.fixture
+def recording(db):
+    instrument.reset()
+    instrument.enable()
+    yield
+    instrument.disable()
+    instrument.reset()
+
+
+def test_normalize_groups_literals():
+    assert (instrument.normalize("SELECT * FROM users WHERE id = 12 AND name='bob'")
+            == instrument.normalize("SELECT  *  FROM users WHERE id = 7 AND name='o''neil'"))
+
+
+def test_statements_and_phases_are_counted(recording):
+    with instrument.phase("login"):
+        user.create_user("bob", "hunter2")
+        user.validate_login("bob", "hunter2")
+    snap = instrument.snapshot()
+    assert snap["timings"]["login"]["queries"] >= 2
+    assert any(sql.startswith("SELECT id FROM users") for sql in snap["statements"])
+
+
+def test_slow_log_never_holds_literals(recording, monkeypatch):
+    monkeypatch.setattr(instrument, "SLOW_MS", 0.0)
+    user.create_user("bob", "hunter2")
+    user.validate_login("bob", "hunter2")
+    slow = instrument.snapshot()["slow_queries"]
+    assert slow
+    assert not any("hunter2" in q["sql"] or "bob" in q["sql"] for q in slow)
+    assert "hunter2" not in instrument.report()
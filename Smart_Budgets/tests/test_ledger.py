@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+
+from backend import budget, ledger
+from backend.database import read, transaction
+
+
+def _rollup_matches_ledger(uid):
+    with read() as cur:
+        cur.execute("""
+            SELECT substr(occurred_on, 1, 7), kind, category, SUM(amount), COUNT(*)
+            FROM transactions WHERE user_id=? GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+        """, (uid,))
+        expected = cur.fetchall()
+        cur.execute("""
+            SELECT month, kind, category, total, tx_count FROM monthly_rollup
+            WHERE user_id=? AND tx_count > 0 ORDER BY 1, 2, 3
+        """, (uid,))
+        return cur.fetchall() == expected
+
+
+def test_rollup_follows_inserts_updates_and_deletes(uid):
+    ledger.add_transactions([
+        (uid, "2024-01-05", "expense", "Groceries", 400.0),
+        (uid, datetime.date(2024, 1, 20), "expense", "Groceries", 350.0, "weekly shop"),
+        (uid, "2024-01-25", "income", "Salary", 15000.0),
+        (uid, "2024-02-03", "expense", "Dining Out", 120.0),
+    ])
+    assert ledger.monthly_totals(uid, "2024-01") == {"income": {"Salary": 15000.0},
+                                                     "expense": {"Groceries": 750.0}}
+    assert _rollup_matches_ledger(uid)
+
+    first = ledger.get_transactions(uid)[0][0]
+    with transaction() as cur:
+        cur.execute("UPDATE transactions SET occurred_on='2024-02-01', amount=410.0 WHERE id=?", (first,))
+    assert _rollup_matches_ledger(uid)
+    assert ledger.delete_transaction(first) == 1
+    assert ledger.delete_transaction(first) == 0
+    assert _rollup_matches_ledger(uid)
+    assert ledger.monthly_history(uid) == [("2024-01", 15000.0, 350.0), ("2024-02", 0.0, 120.0)]
+    assert ledger.monthly_history(uid, months=1) == [("2024-02", 0.0, 120.0)]
+
+
+def test_get_transactions_date_range(uid):
+    tx = ledger.add_transaction(uid, "2024-03-10", "expense", "Groceries", 99.5, "spar")
+    ledger.add_transaction(uid, "2024-03-31", "expense", "Groceries", 10.0)
+    assert ledger.get_transactions(uid, start="2024-03-01", end="2024-03-10") == [
+        (tx, "2024-03-10", "expense", "Groceries", 99.5, "spar")]
+    assert len(ledger.get_transactions(uid, start=datetime.date(2024, 3, 11))) == 1
+
+
+def test_bad_rows_are_rejected(uid):
+    with pytest.raises(ValueError):
+        ledger.add_transaction(uid, "2024-03-10", "refund", "Groceries", 1.0)
+    with pytest.raises(ValueError):
+        ledger.add_transaction(uid, "10/03/2024", "expense", "Groceries", 1.0)
+
+
+def test_snapshot_carries_this_months_ledger_totals(uid):
+    month = ledger.month_key()
+    budget.load_snapshot(uid)
+    ledger.add_transaction(uid, f"{month}-01", "expense", "Groceries", 250.0)
+    ledger.add_transaction(uid, f"{month}-02", "income", "Salary", 1000.0)
+    snap = budget.load_snapshot(uid)
+    assert (snap.month, snap.month_income, snap.month_expense) == (month, 1000.0, 250.0)
+    assert budget.calculate_totals(uid, month) == (1000.0, 250.0, 750.0)
@@ -0,0 +1,73 @@
+import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend import budget, projection
+
+
+def _loop_balance(initial, contribution, annual_rate, months):
+    balance = initial
+    for _ in range(months):
+        balance = balance * (1 + annual_rate / 12) + contribution
+    return balance
+
+
+def test_project_matches_month_by_month_compounding():
+    rates, contributions = (0.0, 0.06, 0.10), (500.0, 2000.0)
+    balances = projection.project(contributions, rates, years=5, initial=1000.0)
+    assert balances.shape == (3, 2, 6)
+    for r, rate in enumerate(rates):
+        for c, contribution in enumerate(contributions):
+            for year in range(6):
+                assert balances[r, c, year] == pytest.approx(
+                    _loop_balance(1000.0, contribution, rate, year * 12))
+
+
+def test_project_rejects_out_of_range_years():
+    with pytest.raises(ValueError):
+        projection.project([100.0], years=0)
+    with pytest.raises(ValueError):
+        projection.project([100.0], years=projection.MAX_YEARS + 1)
+
+
+def test_months_to_goal():
+    assert projection.months_to_goal(12000, 1000, 0.0) == 12
+    n = int(projection.months_to_goal(100000, 1000, 0.08))
+    assert _loop_balance(0, 1000, 0.08, n) >= 100000 > _loop_balance(0, 1000, 0.08, n - 1)
+    assert projection.months_to_goal(500, 100, 0.05, initial=800) == 0
+    assert np.isinf(projection.months_to_goal(1000, 0, 0.0))
+    # Broadcasts over arrays
+    assert projection.months_to_goal(12000, [1000, 2000], 0.0).tolist() == [12, 6]
+
+
+def test_goal_date():
+    start = datetime.date(2024, 11, 15)
+    assert projection.goal_date(3000, 1000, 0.0, start=start) == datetime.date(2025, 2, 1)
+    assert projection.goal_date(3000, 0, 0.0, start=start) is None
+
+
+def test_project_user_is_cached_per_budget_version(uid):
+    budget.save_budget(uid, {"Salary": 20000.0}, {budget.SAVINGS_CAT: 2000.0},
+                       {"dependents": 0, "savings_percent": 10})
+    contributions, balances = projection.project_user(uid, multipliers=(1.0, 2.0))
+    assert contributions.tolist() == [2000.0, 4000.0]
+    assert not balances.flags.writeable
+    assert projection.project_user(uid, multipliers=(1.0, 2.0))[1] is balances
+    budget.save_budget(uid, {"Salary": 20000.0}, {budget.SAVINGS_CAT: 3000.0},
+                       {"dependents": 0, "savings_percent": 15})
+    assert projection.project_user(uid, multipliers=(1.0, 2.0))[0].tolist() == [3000.0, 6000.0]
+
+
+def test_outlook_lines(uid):
+    budget.save_budget(uid, {"Salary": 20000.0}, {"Groceries": 2000.0},
+                       {"dependents": 0, "savings_percent": 0})
+    assert projection.outlook(uid) == [
+        "No monthly savings set — adjust your budget to see a projection."]
+    budget.save_budget(uid, {"Salary": 20000.0}, {budget.SAVINGS_CAT: 5000.0},
+                       {"dependents": 0, "savings_percent": 25})
+    lines = projection.outlook(uid)
+    assert lines[0] == "Saving R5,000.00/month at 8% a year:"
+    assert len(lines) == 2 + len(projection.OUTLOOK_YEARS)
+    assert "reached by" in lines[-1]
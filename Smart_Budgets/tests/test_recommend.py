@@ -0,0 +1,52 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend import budget, recommend, user
+
+PROFILE = {"dependents": 0, "savings_percent": 10}
+
+
+def test_rules_fire_per_user(uid):
+    budget.save_budget(uid, {"Salary": 10000.0},
+                       {"Rent/Mortgage": 4000.0, "Groceries": 1000.0, budget.SAVINGS_CAT: 500.0},
+                       PROFILE)
+    assert budget.recommendations(uid) == [
+        "Housing exceeds 30% of income. Consider downsizing or negotiating.",
+        "Try saving at least 10% of income monthly.",
+        "You can still allocate R4500.00 to savings or debt repayment.",
+    ]
+
+
+def test_thresholds_scale_with_dependents(uid):
+    # Groceries at 17% of income: too high alone, fine with a dependent (15% + 3%)
+    expenses = {"Groceries": 1700.0, budget.SAVINGS_CAT: 8300.0}
+    budget.save_budget(uid, {"Salary": 10000.0}, expenses, PROFILE)
+    assert "Groceries look high; try weekly planning and bulk buys." in budget.recommendations(uid)
+    budget.save_budget(uid, {"Salary": 10000.0}, expenses, {"dependents": 1, "savings_percent": 10})
+    assert budget.recommendations(uid) == [budget.FALLBACK_TIP]
+
+
+def test_batch_matches_one_at_a_time(db):
+    ids = [user.create_user(f"u{i}", "pw") for i in range(4)]
+    budget.save_budgets([
+        (ids[0], {"Salary": 10000.0}, {"Rent/Mortgage": 12000.0}, PROFILE),
+        (ids[1], {"Salary": 10000.0}, {"Entertainment & Subscriptions": 1500.0,
+                                       budget.SAVINGS_CAT: 8500.0}, PROFILE),
+        (ids[2], {}, {"Dining Out": 100.0}, PROFILE),
+        (ids[3], {"Salary": 5000.0}, {budget.SAVINGS_CAT: 5000.0}, PROFILE),
+    ])
+    batch = budget.recommendations_all()
+    assert sorted(batch) == ids
+    for uid in ids:
+        assert batch[uid] == budget.recommendations(uid)
+    assert budget.recommendations_all([ids[3]]) == {ids[3]: [budget.FALLBACK_TIP]}
+
+
+def test_evaluate_handles_zero_income():
+    rules = recommend.as_rules([("ratio", "Groceries", ">", 0.15, 0.0, False, "x")])
+    inputs = recommend.Inputs(
+        user_ids=np.array([1]), categories=["Groceries"], amounts=np.array([[100.0]]),
+        total_income=np.array([0.0]), total_expense=np.array([100.0]),
+        dependents=np.array([0.0]), savings_percent=np.array([0.0]))
+    assert recommend.evaluate(rules, inputs).tolist() == [[True]]
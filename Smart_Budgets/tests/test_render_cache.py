@@ -0,0 +1,37 @@
+import os
+
+from backend import render_cache
+
+
+def test_key_depends_on_every_part():
+    key = render_cache.RenderCache.key
+    assert key("chart", "pie", [1, 2]) == key("chart", "pie", [1, 2])
+    assert key("chart", "pie", [1, 2]) != key("chart", "pie", [2, 1])
+    assert key("chart", {"b": 1, "a": 2}) == key("chart", {"a": 2, "b": 1})
+
+
+def test_store_and_lookup(tmp_path):
+    cache = render_cache.RenderCache(str(tmp_path))
+    key = cache.key("x")
+    assert cache.lookup(key, ".png") is None
+    path = cache.store(key, ".png", b"data")
+    assert cache.lookup(key, ".png") == path
+    assert (cache.hits, cache.misses) == (1, 1)
+    src = tmp_path / "report.pdf"
+    src.write_bytes(b"%PDF")
+    copied = cache.store_file(cache.key("y"), ".pdf", str(src))
+    with open(copied, "rb") as f:
+        assert f.read() == b"%PDF"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = render_cache.RenderCache(str(tmp_path), max_bytes=250)
+    a = cache.store(cache.key("a"), ".png", b"x" * 100)
+    b = cache.store(cache.key("b"), ".png", b"x" * 100)
+    # "a" was stored first but used more recently
+    os.utime(b, (1000, 1000))
+    os.utime(a, (2000, 2000))
+    c = cache.store(cache.key("c"), ".png", b"x" * 100)
+    assert not os.path.exists(b)
+    assert os.path.exists(a) and os.path.exists(c)
+    assert cache.stats()["bytes"] == 200
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from backend import budget, charts, render_cache, reports
+
+pytest.importorskip("matplotlib")
+
+
+@pytest.fixture
+def renders(tmp_path):
+    return render_cache.RenderCache(str(tmp_path / "renders"))
+
+
+def test_backend_does_not_import_the_gui():
+    code = "import sys, backend.reports; print(any(m.split('.')[0] == 'gui' for m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=reports.__file__.rsplit("backend", 1)[0])
+    assert out.stdout.strip() == "False"
+
+
+def test_render_chart_is_cached(renders):
+    data = charts.pie_data({"Groceries": 1200.0, "Rent/Mortgage": 6000.0})
+    assert charts.cached_chart("pie", data, cache=renders) is None
+    path = charts.render_chart("pie", data, cache=renders)
+    with open(path, "rb") as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+    assert charts.cached_chart("pie", data, cache=renders) == path
+    assert charts.chart_key("pie", data, size=(4, 3)) != charts.chart_key("pie", data)
+
+
+def test_write_report_reuses_identical_render(uid, renders, tmp_path):
+    budget.save_budget(uid, {"Salary": 20000.0}, {"Groceries": 3000.0}, {"dependents": 0, "savings_percent": 0})
+    view = budget.budget_view(uid)
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    reports.write_report(str(first), view, cache=renders)
+    assert renders.hits == 0
+    reports.write_report(str(second), view, cache=renders)
+    assert renders.hits == 1
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes().startswith(b"%PDF")
+
+
+def test_generate_reports_writes_one_pdf_per_user(db, tmp_path, monkeypatch):
+    from backend import user
+    # Inherited by the spawned workers, so they render into a throwaway cache
+    monkeypatch.setenv("SMART_BUDGETS_CACHE", str(tmp_path / "cache"))
+    profile = {"dependents": 0, "savings_percent": 10}
+    ids = [user.create_user(name, "x") for name in ("a", "b", "c")]
+    for i, uid in enumerate(ids):
+        budget.save_budget(uid, {"Salary": 10000.0 + i}, {"Groceries": 2000.0}, profile)
+    seen = []
+    out = reports.generate_reports(reports.all_user_ids(), str(tmp_path / "out"), workers=2,
+                                   on_result=lambda uid, path, error: seen.append(uid))
+    assert out["written"] == 3 and out["failed"] == {}
+    assert sorted(seen) == ids
+    for uid in ids:
+        assert (tmp_path / "out" / f"budget_report_{uid}.pdf").read_bytes().startswith(b"%PDF")
+    assert len(list((tmp_path / "cache").glob("*/*.pdf"))) == 3
+
+
+def _crashing_render(user_id, out_dir):
+    # Runs in the spawned worker, which finds it by importing this module
+    if str(user_id) == os.environ["POISONED_USER"]:
+        os._exit(1)
+    return reports._render_user(user_id, out_dir)     # the real one, in the worker
+
+
+def test_worker_crash_only_fails_that_user(db, tmp_path, monkeypatch):
+    from backend import user
+    monkeypatch.setenv("SMART_BUDGETS_CACHE", str(tmp_path / "cache"))
+    ids = [user.create_user(f"u{i}", "x") for i in range(8)]
+    for uid in ids:
+        budget.save_budget(uid, {"Salary": 10000.0 + uid}, {"Groceries": 2000.0},
+                           {"dependents": 0, "savings_percent": 10})
+    poisoned = ids[2]
+    monkeypatch.setenv("POISONED_USER", str(poisoned))
+    monkeypatch.setattr(reports, "_render_user", _crashing_render)
+    out = reports.generate_reports(ids, str(tmp_path / "out"), workers=2)
+    assert out["failed"] == {poisoned: "worker process crashed"}
+    assert out["written"] == len(ids) - 1
+    for uid in ids:
+        if uid != poisoned:
+            assert (tmp_path / "out" / f"budget_report_{uid}.pdf").exists()
@@ -0,0 +1,123 @@
+from gui import setup_wizard
+
+
+class _Var:
+    """Stands in for a Tk variable; str() is its Tcl name, like the real one."""
+    count = 0
+
+    def __init__(self, value):
+        _Var.count += 1
+        self.name = f"PY_VAR{_Var.count}"
+        self.value = value
+
+    def __str__(self):
+        return self.name
+
+    def get(self):
+        if self.value == "":
+            raise ValueError("mid-edit")
+        return self.value
+
+    def trace_add(self, mode, callback):
+        pass
+
+
+class _Label:
+    def __init__(self):
+        self.options = {"text": "R0.00"}
+        self.updates = 0
+
+    def cget(self, key):
+        return self.options[key]
+
+    def config(self, **options):
+        self.updates += "text" in options
+        self.options.update(options)
+
+
+class _Master:
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+        return len(self.pending)
+
+    def run_pending(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+
+def _wizard(incomes, expenses, savings_pct=10):
+    # Only the running-totals logic is exercised; no display is needed
+    wiz = setup_wizard.SetupWizard.__new__(setup_wizard.SetupWizard)
+    wiz.master = _Master()
+    wiz._tracked, wiz._counted = {}, {}
+    wiz._sums = {"income": 0.0, "expense": 0.0}
+    wiz._dirty, wiz._totals_job = set(), None
+    wiz.totals_labels = {key: _Label() for key in ("income", "expense", "savings", "balance")}
+    wiz.income_count_var = _Var(len(incomes))
+    wiz.savings_pct_var = _Var(savings_pct)
+    wiz._track(wiz.income_count_var, "count")
+    wiz._track(wiz.savings_pct_var, "savings")
+    wiz.income_scales = [_Var(v) for v in incomes]
+    for i, var in enumerate(wiz.income_scales):
+        wiz._track(var, "income", i)
+    wiz.ess_scales = {name: _Var(v) for name, v in expenses.items()}
+    for var in wiz.ess_scales.values():
+        wiz._track(var, "expense")
+    for name in wiz._tracked:
+        wiz._var_changed(name)
+    wiz.master.run_pending()
+    return wiz
+
+
+def _text(wiz):
+    return {key: lbl.cget("text") for key, lbl in wiz.totals_labels.items()}
+
+
+def _set(wiz, var, value):
+    var.value = value
+    wiz._var_changed(str(var))
+
+
+def test_totals_start_from_every_tracked_value():
+    wiz = _wizard([10000, 2000], {"Groceries": 3000, "Transport": 1000})
+    assert _text(wiz) == {"income": "R12,000.00", "expense": "R5,200.00",
+                          "savings": "R1,200.00", "balance": "R6,800.00"}
+
+
+def test_slider_drag_is_folded_in_once():
+    wiz = _wizard([10000], {"Groceries": 3000})
+    groceries = wiz.ess_scales["Groceries"]
+    for value in range(3000, 3500, 10):
+        _set(wiz, groceries, value)
+    assert len(wiz.master.pending) == 1          # one update for the whole drag
+    wiz.master.run_pending()
+    assert _text(wiz)["expense"] == "R4,490.00"
+    assert wiz.totals_labels["income"].updates == 1   # unchanged labels are left alone
+
+
+def test_hidden_income_rows_stop_counting():
+    wiz = _wizard([10000, 2000], {}, savings_pct=0)
+    _set(wiz, wiz.income_count_var, 1)
+    wiz.master.run_pending()
+    assert _text(wiz)["income"] == "R10,000.00"
+    # A hidden row's value still changes, but only counts once shown again
+    _set(wiz, wiz.income_scales[1], 3000)
+    wiz.master.run_pending()
+    assert _text(wiz)["income"] == "R10,000.00"
+    _set(wiz, wiz.income_count_var, 2)
+    wiz.master.run_pending()
+    assert _text(wiz)["income"] == "R13,000.00"
+
+
+def test_overspending_and_mid_edit_values():
+    wiz = _wizard([1000], {"Rent/Mortgage": 1500}, savings_pct=0)
+    assert _text(wiz)["balance"] == "R-500.00"
+    assert wiz.totals_labels["balance"].cget("fg") == "red"
+    _set(wiz, wiz.ess_scales["Rent/Mortgage"], "")    # spinbox cleared while typing
+    wiz.master.run_pending()
+    assert _text(wiz)["balance"] == "R1,000.00"
+    assert wiz.totals_labels["balance"].cget("fg") == "black"
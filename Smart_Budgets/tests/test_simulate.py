@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from backend import budget, simulate
+
+INCOMES = {"Salary": 20000.0}
+EXPENSES = {"Rent/Mortgage": 6000.0, "Groceries": 3000.0, "Dining Out": 1000.0,
+            budget.SAVINGS_CAT: 2000.0}
+
+
+def _quiet(**kwargs):
+    # No randomness at all: every scenario is the deterministic budget
+    return dict(income_volatility=0.0, shock_probability=0.0, dependent_probability=0.0,
+                inflation={g: (0.0, 0.0) for g in simulate.DEFAULT_INFLATION}, **kwargs)
+
+
+def test_without_noise_every_scenario_is_the_budget(db):
+    result = simulate.simulate(INCOMES, EXPENSES, 10, months=6, n_scenarios=50, **_quiet())
+    balance, savings = result.band(50)
+    # Savings/Investments is replaced by savings_percent of income
+    assert balance == pytest.approx([20000 - 10000 - 2000] * 6)
+    assert savings == pytest.approx([2000 * m for m in range(1, 7)])
+    assert result.shortfall_probability == 0.0
+    assert result.balance.shape == (len(simulate.PERCENTILES), 6)
+
+
+def test_savings_are_cut_to_what_is_left(db):
+    result = simulate.simulate({"Salary": 10000.0}, {"Rent/Mortgage": 9500.0}, 20,
+                               months=3, n_scenarios=10, **_quiet())
+    balance, savings = result.band(50)
+    assert balance == pytest.approx([0.0] * 3)
+    assert savings == pytest.approx([500.0, 1000.0, 1500.0])
+
+
+def test_same_seed_same_result_and_percentiles_ordered(db):
+    a = simulate.simulate(INCOMES, EXPENSES, 10, n_scenarios=2000, seed=42)
+    b = simulate.simulate(INCOMES, EXPENSES, 10, n_scenarios=2000, seed=42)
+    assert np.array_equal(a.balance, b.balance)
+    assert (np.diff(a.balance, axis=0) >= 0).all()
+    assert 0.0 <= a.shortfall_probability <= 1.0
+
+
+def test_shocks_raise_shortfall_probability(db):
+    tight = {"Rent/Mortgage": 15000.0}
+    calm = simulate.simulate(INCOMES, tight, 0, n_scenarios=5000, seed=1, shock_probability=0.0)
+    shocked = simulate.simulate(INCOMES, tight, 0, n_scenarios=5000, seed=1, shock_probability=0.2)
+    assert shocked.shortfall_probability > calm.shortfall_probability
+
+
+def test_simulate_user_reads_the_saved_budget(uid):
+    budget.save_budget(uid, INCOMES, EXPENSES, {"dependents": 1, "savings_percent": 10})
+    result = simulate.simulate_user(uid, months=4, n_scenarios=20, **_quiet())
+    assert result.band(50)[0] == pytest.approx([8000.0] * 4)
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import main
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(code):
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True, cwd=APP_DIR)
+    return out.stdout.split()
+
+
+def test_login_path_does_not_import_heavy_modules():
+    code = ("import sys, importlib, main\n"
+            "for name in main.STARTUP_MODULES: importlib.import_module(name)\n"
+            "print(*sorted({m.split('.')[0] for m in sys.modules} & {'matplotlib', 'numpy'}))")
+    assert _loaded_after(code) == []
+
+
+def test_warm_up_imports_matplotlib_in_the_background():
+    pytest.importorskip("matplotlib")
+    code = ("import sys\n"
+            "from gui import charts\n"
+            "charts.warm_up().join()\n"
+            "print(all(m in sys.modules for m in charts.MATPLOTLIB_MODULES))")
+    assert _loaded_after(code) == ["True"]
+
+
+def test_timed_imports():
+    timings = main._timed_imports(["json", "backend.cache"])
+    assert [name for name, _ in timings] == ["json", "backend.cache"]
+    assert all(ms >= 0 for _, ms in timings)
+
+
+def test_main_leaves_the_app_modules_to_the_timed_imports():
+    code = ("import sys, main\n"
+            "print(*sorted(m for m in main.STARTUP_MODULES if m in sys.modules))")
+    assert _loaded_after(code) == []
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from gui.table import VirtualTable
+
+
+def _table(rows=(), sort=None):
+    # The row bookkeeping is plain Python; skip the Tk widget and its redraws
+    table = VirtualTable.__new__(VirtualTable)
+    table.columns = ["section", "category", "amount"]
+    table._order, table._values, table._top, table._items = [], {}, 0, []
+    table._sort, table._key, table._render_job = None, None, None
+    table._schedule_render = lambda: None
+    table.set_rows(rows)
+    if sort is not None:
+        table._sort = sort
+        table._apply_sort()
+    return table
+
+
+def _amounts(table):
+    return [table.get(k)[2] for k in table.keys()]
+
+
+def test_unsorted_rows_keep_insertion_order():
+    table = _table([("a", ("Income", "Salary", 10.0)), ("b", ("Expense", "Rent", 5.0))])
+    table.insert("c", ("Expense", "Food", 1.0), index=1)
+    assert table.keys() == ["a", "c", "b"]
+    table.insert("a", ("Income", "Salary", 11.0))          # existing key: updated in place
+    assert table.keys() == ["a", "c", "b"] and table.get("a")[2] == 11.0
+    table.delete("c")
+    table.delete("missing")
+    assert table.keys() == ["a", "b"] and "c" not in table and len(table) == 2
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_inserts_and_updates_land_in_order(descending):
+    rng = random.Random(7)
+    table = _table([(i, ("Expense", f"c{i}", rng.randint(0, 50))) for i in range(40)],
+                   sort=(2, descending))
+    for i in range(40, 80):
+        table.insert(i, ("Expense", f"c{i}", rng.randint(0, 50)))
+    for i in range(0, 80, 3):
+        table.update(i, ("Expense", f"c{i}", rng.uniform(0, 50)))
+    assert _amounts(table) == sorted(_amounts(table), reverse=descending)
+    assert len(table) == 80
+
+
+def test_sort_position_after_equal_values():
+    # Equal values keep arrival order: a new row goes after its equals
+    table = _table([("a", ("", "x", 1.0)), ("b", ("", "y", 2.0)), ("c", ("", "z", 2.0))],
+                   sort=(2, False))
+    assert table._sort_position(("", "w", 2.0)) == 3
+    assert table._sort_position(("", "w", 0.5)) == 0
+    table._sort = (2, True)
+    table._apply_sort()
+    assert table.keys() == ["b", "c", "a"]
+    assert table._sort_position(("", "w", 2.0)) == 2
+
+
+def test_text_sorts_case_insensitively():
+    table = _table([("1", ("", "banana", 0)), ("2", ("", "Apple", 0)), ("3", ("", "cherry", 0))],
+                   sort=(1, False))
+    assert [table.get(k)[1] for k in table.keys()] == ["Apple", "banana", "cherry"]
+
+
+def test_mixed_column_ranks_text_before_numbers():
+    table = _table([("1", ("", 5, 0)), ("2", ("", "b", 0)), ("3", ("", 1.5, 0))], sort=(1, False))
+    assert [table.get(k)[1] for k in table.keys()] == ["b", 1.5, 5]
+    # A row whose type the current key can't handle triggers a full re-sort
+    table = _table([("1", ("", 5, 0)), ("2", ("", 2, 0))], sort=(1, False))
+    table.insert("3", ("", "a", 0))
+    assert [table.get(k)[1] for k in table.keys()] == ["a", 2, 5]
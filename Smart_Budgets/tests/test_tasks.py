@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from gui import tasks
+
+
+class _Master:
+    """Stands in for the Tk root: after() callbacks run when the test pumps them."""
+
+    def __init__(self):
+        self.pending = []
+        self.alive = True
+        self.reported = []
+
+    def after(self, ms, fn):
+        self.pending.append(fn)
+
+    def winfo_exists(self):
+        return self.alive
+
+    def _root(self):
+        return self
+
+    def report_callback_exception(self, exc_type, exc, tb):
+        self.reported.append(exc)
+
+    def pump(self, until, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not until():
+            assert time.monotonic() < deadline, "timed out"
+            calls, self.pending = self.pending, []
+            for fn in calls:
+                fn()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def runner():
+    return tasks.TaskRunner(_Master())
+
+
+def test_results_and_errors_arrive_on_the_polling_thread(runner):
+    results, errors, threads = [], [], []
+    runner.submit(lambda x: x * 2, 21, on_done=lambda r: (results.append(r),
+                                                          threads.append(threading.current_thread())))
+    runner.submit(lambda: 1 / 0, on_error=errors.append)
+    runner.master.pump(lambda: results and errors)
+    assert results == [42]
+    assert isinstance(errors[0], ZeroDivisionError)
+    assert threads == [threading.current_thread()]
+
+
+def test_unhandled_errors_are_reported(runner):
+    runner.submit(lambda: [][1])
+    runner.master.pump(lambda: runner.master.reported)
+    assert isinstance(runner.master.reported[0], IndexError)
+
+
+def test_latest_request_with_a_key_wins(runner):
+    gate = threading.Event()
+    done = []
+    runner.submit(gate.wait, 5, key="refresh", on_done=lambda r: done.append("old"))
+    runner.submit(lambda: "new", key="refresh", on_done=done.append)
+    gate.set()
+    runner.master.pump(lambda: not runner._active)
+    assert done == ["new"]
+
+
+def test_progress_and_cooperative_cancel(runner):
+    seen, gate = [], threading.Event()
+
+    def work(task):
+        for i in range(3):
+            task.progress(i)
+        gate.wait(5)
+        return "cancelled" if task.cancelled else "finished"
+
+    task = runner.submit(work, with_task=True, on_progress=seen.append, on_done=seen.append)
+    runner.master.pump(lambda: len(seen) == 3)
+    task.cancel()
+    gate.set()
+    runner.master.pump(lambda: not runner._active)
+    assert seen == [0, 1, 2]
+
+
+def test_closed_window_cancels_outstanding_work(runner):
+    gate = threading.Event()
+    task = runner.submit(gate.wait, 5)
+    runner.master.alive = False
+    runner.master.pump(lambda: task.cancelled)
+    gate.set()
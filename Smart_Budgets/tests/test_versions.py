@@ -0,0 +1,87 @@
+import pytest
+
+from backend import budget, versions
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Saves are stamped with the next of these times, in order."""
+    times = iter(["2024-01-10T09:00:00", "2024-02-10T09:00:00", "2024-03-10T09:00:00",
+                  "2024-04-10T09:00:00"])
+    monkeypatch.setattr(versions, "now", lambda: next(times))
+
+
+def _save(uid, salary, expenses, dependents=0):
+    budget.save_budget(uid, {"Salary": salary}, expenses,
+                       {"dependents": dependents, "savings_percent": 10})
+
+
+def test_each_real_change_is_a_version(uid, clock):
+    _save(uid, 10000.0, {"Groceries": 1500.0})
+    _save(uid, 10000.0, {"Groceries": 1500.0})          # identical: no version
+    _save(uid, 12000.0, {"Groceries": 1500.0, "Dining Out": 400.0})
+    assert versions.list_versions(uid) == [(1, "2024-01-10T09:00:00"), (2, "2024-03-10T09:00:00")]
+
+
+def test_state_at_and_as_of(uid, clock):
+    _save(uid, 10000.0, {"Groceries": 1500.0, "Dining Out": 300.0}, dependents=1)
+    _save(uid, 11000.0, {"Groceries": 1600.0})
+    assert versions.state_at(uid, 1) == {
+        "income": {"Salary": 10000.0},
+        "expense": {"Groceries": 1500.0, "Dining Out": 300.0},
+        "profile": {"dependents": 1, "savings_percent": 10.0},
+    }
+    assert versions.state_at(uid, 2)["expense"] == {"Groceries": 1600.0}
+    assert versions.as_of(uid, "2024-01-01") is None
+    assert versions.as_of(uid, "2024-01-10")["income"] == {"Salary": 10000.0}   # end of that day
+    assert versions.as_of(uid, "2024-02-09T23:00:00")["income"] == {"Salary": 10000.0}
+    assert versions.version_at(uid, "2030-01-01") == 2
+
+
+def test_diff_between_versions(uid, clock):
+    _save(uid, 10000.0, {"Groceries": 1500.0, "Dining Out": 300.0})
+    _save(uid, 10000.0, {"Groceries": 1600.0})
+    _save(uid, 10000.0, {"Groceries": 1600.0, "Education/Tuition": 900.0}, dependents=2)
+    assert versions.diff(uid, 1, 3) == {
+        "income": {},
+        "expense": {"Groceries": (1500.0, 1600.0), "Dining Out": (300.0, None),
+                    "Education/Tuition": (None, 900.0)},
+        "profile": {"dependents": (0, 2)},
+    }
+    # Reversed arguments swap each pair
+    assert versions.diff(uid, 3, 1)["expense"]["Groceries"] == (1600.0, 1500.0)
+    assert versions.diff(uid, 2, 2) == {"income": {}, "expense": {}, "profile": {}}
+
+
+def test_diff_states():
+    old = {"income": {"Salary": 1.0}, "expense": {"Rent/Mortgage": 5.0}}
+    new = {"income": {"Salary": 2.0}, "expense": {}, "profile": {"dependents": 1}}
+    assert sorted(versions.diff_states(old, new)) == [
+        ("expense", "Rent/Mortgage", 5.0, None),
+        ("income", "Salary", 1.0, 2.0),
+        ("profile", "dependents", None, 1),
+    ]
+
+
+def test_allocation_history_fills_forward(uid, clock):
+    _save(uid, 10000.0, {"Groceries": 1500.0})
+    _save(uid, 10000.0, {"Groceries": 1500.0, "Dining Out": 300.0})
+    _save(uid, 10000.0, {"Dining Out": 350.0})
+    saved_at, series = versions.allocation_history(uid)
+    assert len(saved_at) == 3
+    assert series == {"Groceries": (1500.0, 1500.0, 0.0), "Dining Out": (0.0, 300.0, 350.0)}
+    # Cached until the next save
+    assert versions.allocation_history(uid) is versions.allocation_history(uid)
+    _save(uid, 10000.0, {"Dining Out": 400.0})
+    assert versions.allocation_history(uid)[1]["Dining Out"][-1] == 400.0
+
+
+def test_one_version_per_user_per_batch(db, clock):
+    from backend import user
+    a, b = user.create_user("a", "x"), user.create_user("b", "x")
+    profile = {"dependents": 0, "savings_percent": 0}
+    budget.save_budgets([(a, {"Salary": 1.0}, {}, profile), (b, {"Salary": 2.0}, {}, profile),
+                         (a, {"Salary": 3.0}, {}, profile)])
+    assert [v for v, _ in versions.list_versions(a)] == [1]
+    assert versions.state_at(a, 1)["income"] == {"Salary": 3.0}
+    assert versions.state_at(b, 1)["income"] == {"Salary": 2.0}
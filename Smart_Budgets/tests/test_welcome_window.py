@@ -0,0 +1,176 @@
+import struct
+
+import pytest
+
+from backend import charts, render_cache
+from gui import welcome_window
+from gui.table import VirtualTable
+
+
+class _Canvas:
+    def __init__(self, width):
+        self.width = width
+
+    def winfo_width(self):
+        return self.width
+
+
+def _window(width):
+    # Only the sizing logic is exercised; no display is needed
+    win = welcome_window.WelcomeWindow.__new__(welcome_window.WelcomeWindow)
+    win.visual_canvas = _Canvas(width)
+    return win
+
+
+def test_chart_size_follows_the_tab_width():
+    w, h = _window(1000)._chart_size_now()
+    assert w * charts.CHART_DPI == 950          # 1000 - padding, snapped down to 50 px
+    assert w / h == pytest.approx(charts.CHART_SIZE[0] / charts.CHART_SIZE[1])
+    # Small drags land on the same size, so they reuse the cached render
+    assert _window(1010)._chart_size_now() == (w, h)
+    assert _window(1100)._chart_size_now() != (w, h)
+
+
+def test_chart_size_before_layout_is_the_default():
+    assert _window(1)._chart_size_now() == charts.CHART_SIZE
+
+
+def test_png_is_rendered_at_the_requested_size(tmp_path):
+    pytest.importorskip("matplotlib")
+    size = _window(540)._chart_size_now()
+    path = charts.render_chart("bar", charts.bar_data(100, 60, 20), size,
+                               cache=render_cache.RenderCache(str(tmp_path)))
+    with open(path, "rb") as f:
+        width, height = struct.unpack(">II", f.read(24)[16:24])
+    assert (width, height) == (500, 333)
+
+
+def test_charts_reuse_one_figure_per_kind_and_size(tmp_path):
+    pytest.importorskip("matplotlib")
+    renders = render_cache.RenderCache(str(tmp_path))
+    paths = {charts.render_chart("pie", charts.pie_data({"A": float(n), "B": 1.0}), (4, 3), cache=renders)
+             for n in range(1, 4)}
+    assert len(paths) == 3
+    assert [key for key in charts._templates if key[:2] == ("pie", (4, 3))] == [("pie", (4, 3), charts.CHART_DPI)]
+
+
+class _Notebook:
+    def __init__(self, selected):
+        self.selected = selected
+
+    def select(self):
+        return self.selected
+
+
+def test_charts_wait_for_their_tab():
+    win = _window(1000)
+    win.visual_tab_parent = "visual"
+    win.notebook = _Notebook("table")
+    win._pending_charts = {"bar": charts.bar_data(1, 2, 3)}
+    win._render_charts()
+    # Nothing rendered or dropped while the table tab is showing
+    assert win._pending_charts == {"bar": [1.0, 2.0, 3.0]}
+
+
+class _Label:
+    """Counts the config() calls a real label would turn into Tk round-trips."""
+    def __init__(self, *args, **options):
+        self.options = {"text": ""}
+        self.configs = 0
+        self.destroyed = False
+
+    def cget(self, key):
+        return self.options[key]
+
+    def config(self, **options):
+        self.configs += 1
+        self.options.update(options)
+
+    def pack(self, **options):
+        pass
+
+    def grid(self):
+        self.options["shown"] = True
+
+    def grid_remove(self):
+        self.options["shown"] = False
+
+    def destroy(self):
+        self.destroyed = True
+
+
+class _Snapshot:
+    month = "2024-05"
+    month_income = 0.0
+    month_expense = 0.0
+
+
+def test_cards_only_touch_changed_values():
+    win = _window(1000)
+    win.cards = {key: (_Label(), _Label(), _Label()) for key in ("income", "expense", "balance", "month")}
+    win._update_cards(_Snapshot(), 1000.0, 400.0, 600.0)
+    values = [win.cards[key][2] for key in ("income", "expense", "balance")]
+    assert [lbl.cget("text") for lbl in values] == ["R1,000.00", "R400.00", "R600.00"]
+    assert win.cards["month"][0].cget("shown") is False
+    win._update_cards(_Snapshot(), 1000.0, 450.0, 550.0)
+    assert [lbl.configs for lbl in values] == [1, 2, 2]
+
+
+class _Table(VirtualTable):
+    # VirtualTable's bookkeeping without the widget; records every row change
+    def __init__(self):
+        self.columns = ["section", "category", "amount"]
+        self._order, self._values, self._top, self._items = [], {}, 0, []
+        self._sort, self._key, self._render_job = None, None, None
+        self.changes = []
+
+    def _schedule_render(self):
+        pass
+
+    def insert(self, key, values, index=None):
+        if self._values.get(key) != tuple(values):
+            self.changes.append(("set", key))
+        super().insert(key, values, index)
+
+    def delete(self, key):
+        self.changes.append(("delete", key))
+        super().delete(key)
+
+
+def test_table_changes_only_the_rows_that_changed():
+    win = _window(1000)
+    win.table = _Table()
+    incomes, expenses = {"Salary": 10000.0}, {"Groceries": 2000.0, "Transport": 800.0}
+    win._update_table(incomes, expenses)
+    assert win.table.keys() == ["inc:Salary", "exp:Groceries", "exp:Transport"]
+    win.table.changes.clear()
+
+    win._update_table(incomes, dict(expenses))
+    assert win.table.changes == []
+    win._update_table(incomes, {**expenses, "Gym": 300.0})
+    assert win.table.changes == [("set", "exp:Gym")]
+    assert win.table.keys()[-1] == "exp:Gym"
+    win.table.changes.clear()
+    win._update_table(incomes, {"Groceries": 2000.0, "Gym": 300.0})
+    assert win.table.changes == [("delete", "exp:Transport")]
+    assert win.table.keys() == ["inc:Salary", "exp:Groceries", "exp:Gym"]
+
+
+def test_recommendation_labels_are_reused(monkeypatch):
+    monkeypatch.setattr(welcome_window.tk, "Label", _Label)
+    win = _window(1000)
+    win.rec_box, win.rec_labels = None, []
+    win._update_recommendations(["Cut dining out", "Raise savings"])
+    first = list(win.rec_labels)
+    assert [lbl.cget("text") for lbl in first] == ["• Cut dining out", "• Raise savings"]
+
+    win._update_recommendations(["Cut dining out", "Raise savings"])
+    assert win.rec_labels == first and [lbl.configs for lbl in first] == [1, 1]
+    win._update_recommendations(["Cut dining out", "Raise savings", "Review insurance"])
+    assert win.rec_labels[:2] == first and [lbl.configs for lbl in first] == [1, 1]
+    assert win.rec_labels[2].cget("text") == "• Review insurance"
+    win._update_recommendations(["Cut dining out"])
+    assert win.rec_labels == first[:1] and first[1].destroyed
+    win._update_recommendations([])
+    assert win.rec_labels == first[:1]
+    assert first[0].cget("text") == "No recommendations at this time."